@@ -0,0 +1,130 @@
+# audio_buffer.py
+
+import numpy as np
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity int16 ring buffer feeding the Eagle frame loops.
+
+    The capacity is a whole number of frames and reads always advance by
+    one frame, so a frame never straddles the wrap point and can be handed
+    out as a view into the ring without copying. Views stay valid until the
+    next write; copy a frame if it has to outlive that.
+    """
+
+    def __init__(self, frame_length: int, capacity_frames: int = 256):
+        if frame_length <= 0 or capacity_frames <= 0:
+            raise ValueError("frame_length and capacity_frames must be positive")
+
+        self.frame_length = frame_length
+        self.capacity = frame_length * capacity_frames
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self._read = 0
+        self._size = 0
+        self.dropped_samples = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def available_frames(self) -> int:
+        return self._size // self.frame_length
+
+    def clear(self):
+        self._read = 0
+        self._size = 0
+
+    def write(self, pcm_int16: np.ndarray):
+        """Append samples, dropping the oldest whole frames on overflow."""
+        self._write(pcm_int16, None)
+
+    def write_float32(self, pcm_f32: np.ndarray, scale: float = 32767.0):
+        """
+        Append float PCM in [-1, 1], converting straight into the ring
+        storage (no intermediate int16 array).
+        """
+        self._write(pcm_f32, scale)
+
+    def _store(self, dst: slice, src: np.ndarray, scale):
+        if scale is None:
+            self._data[dst] = src
+        else:
+            np.multiply(src, scale, out=self._data[dst], casting="unsafe")
+
+    def _write(self, pcm: np.ndarray, scale):
+        n = len(pcm)
+        if n == 0:
+            return
+
+        if n > self.capacity:
+            # Only the newest audio can fit; keep the tail, frame-aligned
+            self.dropped_samples += self._size + n - self.capacity
+            pcm = pcm[n - self.capacity:]
+            n = self.capacity
+            self._read = 0
+            self._size = 0
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            fl = self.frame_length
+            drop = -(-overflow // fl) * fl
+            if drop >= self._size:
+                self.dropped_samples += self._size
+                self.clear()
+            else:
+                self._read = (self._read + drop) % self.capacity
+                self._size -= drop
+                self.dropped_samples += drop
+
+        start = (self._read + self._size) % self.capacity
+        first = min(n, self.capacity - start)
+        self._store(slice(start, start + first), pcm[:first], scale)
+        if first < n:
+            self._store(slice(0, n - first), pcm[first:], scale)
+        self._size += n
+
+    def peek_frame(self) -> np.ndarray:
+        """Zero-copy view of the oldest full frame (does not consume)."""
+        if self._size < self.frame_length:
+            raise IndexError("no full frame buffered")
+        return self._data[self._read:self._read + self.frame_length]
+
+    def pop_frame(self) -> np.ndarray:
+        """Consume the oldest full frame and return a view of it."""
+        frame = self.peek_frame()
+        self._advance(1)
+        return frame
+
+    def drain_frames(self) -> np.ndarray:
+        """
+        Consume every full frame up to the physical end of the ring and
+        return them as a (n_frames, frame_length) view. Call again to pick
+        up frames that wrapped; an empty block means nothing is left.
+        """
+        fl = self.frame_length
+        contiguous = (self.capacity - self._read) // fl
+        n = min(self.available_frames, contiguous)
+        block = self._data[self._read:self._read + n * fl].reshape(n, fl)
+        self._advance(n)
+        return block
+
+    def frames(self):
+        """Yield and consume every buffered full frame as a view."""
+        fl = self.frame_length
+        data = self._data
+        while self._size >= fl:
+            start = self._read
+            self._read = (start + fl) % self.capacity
+            self._size -= fl
+            yield data[start:start + fl]
+        if self._size == 0:
+            self._read = 0
+
+    def _advance(self, n_frames: int):
+        step = n_frames * self.frame_length
+        self._read = (self._read + step) % self.capacity
+        self._size -= step
+        if self._size == 0:
+            # Rewind so the next burst is laid out contiguously
+            self._read = 0
@@ -0,0 +1,132 @@
+# audio_features.py
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from config import CLIP_LEVEL, ENERGY_VAD_THRESHOLD, PAUSE_MIN_MS, SAMPLE_RATE
+
+
+class FrameFeatures(NamedTuple):
+    """Per-frame features; arrays are views into the extractor's buffers."""
+    rms: np.ndarray      # normalised to [0, 1]
+    peak: np.ndarray     # normalised to [0, 1]
+    zcr: np.ndarray      # zero crossings per sample
+    clipped: np.ndarray  # bool, peak at or above CLIP_LEVEL
+
+
+class FrameFeatureExtractor:
+    """
+    Computes RMS, peak, zero-crossing rate and clipping for a block of
+    frames in one vectorised pass. All work and output arrays are allocated
+    once and reused, so results are only valid until the next `compute()`.
+    """
+
+    def __init__(self, frame_length: int, max_frames: int = 64, clip_level: int = CLIP_LEVEL):
+        self.frame_length = frame_length
+        self.clip_level = clip_level / 32768.0
+        self._allocate(max_frames)
+
+    def _allocate(self, max_frames: int):
+        fl = self.frame_length
+        self.max_frames = max_frames
+        self._work = np.empty((max_frames, fl), dtype=np.float32)
+        self._sign = np.empty((max_frames, fl), dtype=bool)
+        self._cross = np.empty((max_frames, fl - 1), dtype=bool)
+        self._rms = np.empty(max_frames, dtype=np.float32)
+        self._peak = np.empty(max_frames, dtype=np.float32)
+        self._zcr = np.empty(max_frames, dtype=np.float32)
+        self._clipped = np.empty(max_frames, dtype=bool)
+
+    def compute(self, frames: np.ndarray) -> FrameFeatures:
+        """`frames` is an int16 (n_frames, frame_length) block."""
+        n = len(frames)
+        if n > self.max_frames:
+            self._allocate(n)
+
+        w = self._work[:n]
+        np.multiply(frames, 1.0 / 32768.0, out=w)
+
+        sign = np.signbit(w, out=self._sign[:n])
+        cross = np.not_equal(sign[:, 1:], sign[:, :-1], out=self._cross[:n])
+        zcr = self._zcr[:n]
+        zcr[:] = np.count_nonzero(cross, axis=1)
+        zcr /= self.frame_length
+
+        np.abs(w, out=w)
+        peak = np.max(w, axis=1, out=self._peak[:n])
+        clipped = np.greater_equal(peak, self.clip_level, out=self._clipped[:n])
+
+        np.square(w, out=w)
+        rms = np.mean(w, axis=1, out=self._rms[:n])
+        np.sqrt(rms, out=rms)
+
+        return FrameFeatures(rms, peak, zcr, clipped)
+
+
+class UtteranceStats:
+    """
+    Running aggregates over the frames of one utterance, so end-of-utterance
+    gates never rescan the audio. Also tracks in-utterance pauses (runs of
+    quiet frames of at least `pause_min_ms`) for hesitation analysis.
+    """
+
+    def __init__(
+        self,
+        frame_length: int,
+        sample_rate: int = SAMPLE_RATE,
+        quiet_rms: float = ENERGY_VAD_THRESHOLD,
+        pause_min_ms: float = PAUSE_MIN_MS,
+    ):
+        self.frame_ms = frame_length * 1000.0 / sample_rate
+        self.quiet_rms = quiet_rms
+        self.pause_min_frames = max(1, int(round(pause_min_ms / self.frame_ms)))
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self._sumsq = 0.0
+        self.peak = 0.0
+        self.clipped_frames = 0
+        self.pause_count = 0
+        self.longest_pause_frames = 0
+        self._quiet_run = 0
+
+    def add(self, rms: float, peak: float, clipped: bool):
+        self.frames += 1
+        self._sumsq += rms * rms
+        if peak > self.peak:
+            self.peak = peak
+        if clipped:
+            self.clipped_frames += 1
+
+        if rms < self.quiet_rms:
+            self._quiet_run += 1
+        else:
+            # A pause only counts once speech resumes after it
+            if self._quiet_run >= self.pause_min_frames:
+                self.pause_count += 1
+                self.longest_pause_frames = max(self.longest_pause_frames, self._quiet_run)
+            self._quiet_run = 0
+
+    @property
+    def rms(self) -> float:
+        return math.sqrt(self._sumsq / self.frames) if self.frames else 0.0
+
+    @property
+    def duration_sec(self) -> float:
+        return self.frames * self.frame_ms / 1000.0
+
+    @property
+    def longest_pause_ms(self) -> float:
+        return self.longest_pause_frames * self.frame_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "rms": round(self.rms, 4),
+            "peak": round(self.peak, 4),
+            "clipped_frames": self.clipped_frames,
+            "pause_count": self.pause_count,
+            "longest_pause_ms": round(self.longest_pause_ms),
+        }
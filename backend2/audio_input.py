@@ -0,0 +1,187 @@
+# audio_input.py
+
+from math import gcd
+from typing import Mapping, NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import RESAMPLER_ZERO_CROSSINGS, SAMPLE_RATE, WIRE_MAX_SAMPLE_RATE
+ENCODINGS = ("float32", "int16", "opus")
+OPUS_RATE = 48000
+
+
+class WireFormat(NamedTuple):
+    encoding: str = "float32"
+    sample_rate: int = SAMPLE_RATE
+    channels: int = 1
+
+    @property
+    def native(self) -> bool:
+        """Already what the frame loop wants: no downmix, no resampling."""
+        return self.sample_rate == SAMPLE_RATE and self.channels == 1
+
+    def to_dict(self) -> dict:
+        return {
+            "encoding": self.encoding,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+        }
+
+
+def parse_wire_format(params: Mapping[str, str]) -> WireFormat:
+    """
+    Format requested on connect (`?encoding=int16&rate=48000&channels=2`).
+    Missing fields keep the original float32 / 16 kHz / mono protocol.
+    """
+    encoding = params.get("encoding", "float32").lower()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    try:
+        rate = int(params.get("rate", OPUS_RATE if encoding == "opus" else SAMPLE_RATE))
+        channels = int(params.get("channels", 1))
+    except ValueError:
+        raise ValueError("rate and channels must be integers")
+
+    if not 8000 <= rate <= WIRE_MAX_SAMPLE_RATE:
+        raise ValueError(f"Unsupported sample rate: {rate}")
+    if channels not in (1, 2):
+        raise ValueError("Only mono or stereo input is supported")
+    if encoding == "opus" and rate not in (8000, 12000, 16000, 24000, 48000):
+        raise ValueError("Opus sample rate must be 8, 12, 16, 24 or 48 kHz")
+
+    return WireFormat(encoding, rate, channels)
+
+
+def _design_lowpass(up: int, down: int, zero_crossings: int) -> np.ndarray:
+    """Kaiser-windowed sinc at the upsampled rate, length a multiple of `up`."""
+    factor = max(up, down)
+    length = 2 * zero_crossings * factor
+    length += (-length) % up
+    n = np.arange(length) - (length - 1) / 2.0
+    cutoff = 0.5 / factor * 0.94  # cycles/sample, a little inside Nyquist
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+    return (h * up / h.sum()).astype(np.float32)
+
+
+class StreamingResampler:
+    """
+    Rational (up/down) polyphase FIR resampler that can be fed arbitrary
+    block sizes; filter history carries across calls, so block boundaries
+    are seamless. Only the output samples actually kept are computed.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int = SAMPLE_RATE,
+        zero_crossings: int = RESAMPLER_ZERO_CROSSINGS,
+    ):
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+
+        h = _design_lowpass(self.up, self.down, zero_crossings)
+        self.taps = len(h) // self.up
+        # phases[p, q] = h[p + up*q], reversed to dot with ascending windows
+        self._phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1])
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._t = 0  # next output position at the upsampled rate, relative to the next block
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        span = self.up * len(x)
+        buf = np.concatenate((self._history, x.astype(np.float32, copy=False)))
+        self._history = buf[len(buf) - (self.taps - 1):].copy()
+
+        if span <= self._t:
+            self._t -= span
+            return np.empty(0, dtype=np.float32)
+
+        count = -(-(span - self._t) // self.down)
+        t = self._t + self.down * np.arange(count)
+        self._t = int(t[-1]) + self.down - span
+
+        windows = sliding_window_view(buf, self.taps)[t // self.up]
+        return np.einsum("ij,ij->i", windows, self._phases[t % self.up])
+
+    def reset(self):
+        self._history[:] = 0
+        self._t = 0
+
+
+class _OpusPackets:
+    """Raw Opus packets (one per websocket message) via PyAV's libopus."""
+
+    def __init__(self, channels: int):
+        import av
+
+        self.codec = av.CodecContext.create("libopus", "r")
+        self.codec.sample_rate = OPUS_RATE
+        self.codec.layout = "stereo" if channels == 2 else "mono"
+        self.channels = channels
+        self._av = av
+
+    def decode(self, data: bytes) -> np.ndarray:
+        chunks = [
+            frame.to_ndarray()
+            for frame in self.codec.decode(self._av.Packet(data))
+        ]
+        if not chunks:
+            return np.empty(0, dtype=np.float32)
+        pcm = np.concatenate(chunks, axis=1)
+        if pcm.dtype == np.int16:
+            # Packed s16 comes back as (1, samples * channels)
+            pcm = pcm.reshape(-1, self.channels).T.astype(np.float32) / 32768.0
+        # Planar (channels, samples) -> mono
+        return pcm.mean(axis=0, dtype=np.float32) if pcm.shape[0] > 1 else pcm[0]
+
+
+class AudioDecoder:
+    """
+    Turns websocket binary messages in the negotiated WireFormat into
+    16 kHz mono int16 in the session's PCMRingBuffer.
+
+    Native float32/int16 input is written straight from the message bytes
+    (a view, no intermediate array); anything else is downmixed and run
+    through a StreamingResampler first.
+    """
+
+    def __init__(self, fmt: WireFormat = WireFormat()):
+        self.format = fmt
+        self._opus = _OpusPackets(fmt.channels) if fmt.encoding == "opus" else None
+        in_rate = OPUS_RATE if self._opus else fmt.sample_rate
+        self._resampler = (
+            StreamingResampler(in_rate) if in_rate != SAMPLE_RATE else None
+        )
+        self.bytes_in = 0
+
+    def feed(self, data: bytes, buffer) -> int:
+        """Decode one message into `buffer`; returns samples written."""
+        self.bytes_in += len(data)
+        fmt = self.format
+
+        if self._opus is not None:
+            pcm, scale = self._opus.decode(data), 32767.0
+        else:
+            pcm = np.frombuffer(data, dtype=np.int16 if fmt.encoding == "int16" else np.float32)
+            scale = 1.0 if fmt.encoding == "int16" else 32767.0
+
+            if fmt.native:
+                if fmt.encoding == "int16":
+                    buffer.write(pcm)
+                else:
+                    buffer.write_float32(pcm)
+                return len(pcm)
+
+            if fmt.channels > 1:
+                usable = len(pcm) - len(pcm) % fmt.channels
+                pcm = pcm[:usable].reshape(-1, fmt.channels).mean(axis=1, dtype=np.float32)
+
+        if self._resampler is not None:
+            pcm = self._resampler.process(pcm)
+
+        # Filter overshoot must saturate, not wrap, in the int16 ring
+        np.clip(pcm, -32768.0 / scale, 32767.0 / scale, out=pcm)
+        buffer.write_float32(pcm, scale)
+        return len(pcm)
@@ -0,0 +1,160 @@
+# benchmarks/bench_hesitation.py
+#
+# Cost and accuracy of the old per-keyword substring scan versus the
+# compiled HesitationAnalyzer. The corpus is a text file with one
+# transcript per line, optionally prefixed "1<TAB>" (struggling) or
+# "0<TAB>" (fluent). Accuracy only means something on real speech: pull
+# the registered speaker's transcripts out of a server log, label them by
+# hand, then score them. Run from backend2/:
+#
+#   python benchmarks/bench_hesitation.py --extract server.log > transcripts.tsv
+#   python benchmarks/bench_hesitation.py transcripts.tsv
+#
+# Without a file a seeded synthetic corpus is generated. It is only good
+# for timing and as a smoke test: its fluent sentences are clean text,
+# so precision there says little about real, messier transcripts.
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PICOVOICE_ACCESS_KEY", "bench")
+
+from config import STRUGGLE_THRESHOLD  # noqa: E402
+from hesitation import HesitationAnalyzer  # noqa: E402
+
+# The scan ws_conversation used before hesitation.py
+OLD_KEYWORDS = {
+    "uh", "um", "umm", "hmm", "ha", "ah",
+    "i", "i i", "i uh", "i um",
+    "i think", "maybe", "like", "you know", "uh"
+}
+OLD_THRESHOLD = 3
+
+SENTENCES = [
+    "I work as a software engineer in Bangalore",
+    "Yesterday I visited my friend and we watched a film",
+    "I would like to improve my pronunciation before the interview",
+    "My favourite dish is biryani with raita",
+    "I think the meeting is scheduled for Friday afternoon",
+    "We are planning a trip to the mountains in winter",
+    "I have been learning English for about six months",
+    "The traffic in the city was terrible this morning",
+    "I finished reading an interesting book about history",
+    "Could you explain the difference between these two words",
+    # Fluent uses of words that are also hedges
+    "I like the new office because it is close to home",
+    "Do you know a good place to buy shoes",
+    "It looks like it will rain later today",
+    "You know my brother, he moved to Pune last year",
+]
+FILLERS = ["um", "uh", "umm", "hmm", "ah", "erm", "like,", "you know,"]
+
+# ws_conversation's log line: "[TRANSCRIPT] <speaker> (<confidence>): <text>"
+TRANSCRIPT_RE = re.compile(r"\[TRANSCRIPT\] (\S+) \([0-9.]+\): (.+)")
+
+
+def synthetic_corpus(n=5000, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        words = rng.choice(SENTENCES).split()
+        struggling = rng.random() < 0.3
+        if struggling:
+            for _ in range(rng.randint(3, 5)):
+                pos = rng.randrange(len(words))
+                if rng.random() < 0.6:
+                    words.insert(pos, rng.choice(FILLERS))
+                else:
+                    words.insert(pos, words[pos])  # stutter
+        corpus.append((" ".join(words), struggling))
+    return corpus
+
+
+def extract(log_path, out=sys.stdout):
+    """Unlabelled transcripts of registered speakers, ready for "0/1<TAB>" labels."""
+    with open(log_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = TRANSCRIPT_RE.search(line)
+            if m and m.group(1) != "unregistered_user":
+                print(m.group(2).strip(), file=out)
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            label, sep, text = line.partition("\t")
+            if sep and label in ("0", "1"):
+                corpus.append((text, label == "1"))
+            else:
+                corpus.append((line, None))
+    return corpus
+
+
+def old_score(text):
+    norm = text.lower()
+    return sum(norm.count(k) for k in OLD_KEYWORDS)
+
+
+def timed(fn, texts, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6, results
+
+
+def accuracy(flags, labels):
+    pairs = [(f, l) for f, l in zip(flags, labels) if l is not None]
+    if not pairs:
+        return "unlabelled"
+    tp = sum(1 for f, l in pairs if f and l)
+    fp = sum(1 for f, l in pairs if f and not l)
+    fn = sum(1 for f, l in pairs if not f and l)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return f"precision={precision:.2f}  recall={recall:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", nargs="?", help="transcripts, optionally 0/1<TAB> labelled")
+    parser.add_argument("--extract", metavar="LOG", help="print transcripts found in a server log")
+    args = parser.parse_args()
+
+    if args.extract:
+        extract(args.extract)
+        return
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        print("No corpus given: synthetic sentences, accuracy is indicative only\n")
+        corpus = synthetic_corpus()
+    texts = [t for t, _ in corpus]
+    labels = [l for _, l in corpus]
+    analyzer = HesitationAnalyzer()
+
+    old_us, old_scores = timed(old_score, texts)
+    new_us, reports = timed(analyzer.analyze, texts)
+
+    old_flags = [s >= OLD_THRESHOLD for s in old_scores]
+    new_flags = [r.score >= STRUGGLE_THRESHOLD for r in reports]
+
+    print(f"{len(texts)} transcripts, {sum(l for l in labels if l)} labelled struggling\n")
+    print(f"{'scorer':<22} {'us/transcript':>14} {'triggered':>10}   accuracy")
+    print(f"{'keyword substring':<22} {old_us:>14.2f} {sum(old_flags):>10}   {accuracy(old_flags, labels)}")
+    print(f"{'HesitationAnalyzer':<22} {new_us:>14.2f} {sum(new_flags):>10}   {accuracy(new_flags, labels)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_ring_buffer.py
+#
+# Per-frame cost of the old concatenate/slice ingest versus PCMRingBuffer,
+# across client chunk sizes and with the frame loop running behind (where
+# concatenate re-copies the whole backlog per message). Run from backend2/:
+#
+#   python benchmarks/bench_ring_buffer.py
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_buffer import PCMRingBuffer  # noqa: E402
+
+FRAME_LENGTH = 512
+TOTAL_SAMPLES = 16000 * 60  # one minute of audio
+CHUNK_SIZES = [512, 2048, 8192, 32768, 131072]
+BACKLOG_FRAMES = [0, 64, 256, 1024]
+RING_FRAMES = 2048
+
+
+def concat_ingest(chunks, backlog_frames=0):
+    # Mirrors the old handlers: concatenate per message, slice per frame,
+    # leaving `backlog_frames` pending as if the loop had fallen behind.
+    buffer = np.zeros(backlog_frames * FRAME_LENGTH, dtype=np.int16)
+    frames = 0
+    for chunk in chunks:
+        buffer = np.concatenate([buffer, chunk])
+        while len(buffer) >= FRAME_LENGTH * (backlog_frames + 1):
+            _ = buffer[:FRAME_LENGTH]
+            buffer = buffer[FRAME_LENGTH:]
+            frames += 1
+    return frames
+
+
+def ring_ingest(chunks, backlog_frames=0):
+    buffer = PCMRingBuffer(FRAME_LENGTH, capacity_frames=RING_FRAMES)
+    buffer.write(np.zeros(backlog_frames * FRAME_LENGTH, dtype=np.int16))
+    frames = 0
+    for chunk in chunks:
+        buffer.write(chunk)
+        while buffer.available_frames > backlog_frames:
+            _ = buffer.pop_frame()
+            frames += 1
+    return frames
+
+
+def ring_drain_all(chunks, backlog_frames=0):
+    buffer = PCMRingBuffer(FRAME_LENGTH, capacity_frames=RING_FRAMES)
+    frames = 0
+    for chunk in chunks:
+        buffer.write(chunk)
+        for frame in buffer.frames():
+            frames += 1
+    return frames
+
+
+def time_per_frame(fn, chunks, backlog_frames=0, repeat=3):
+    best = float("inf")
+    frames = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = fn(chunks, backlog_frames)
+        best = min(best, time.perf_counter() - start)
+    return best / max(frames, 1) * 1e6
+
+
+def split(audio, size):
+    return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+
+def main():
+    audio = np.random.randint(-32768, 32767, TOTAL_SAMPLES, dtype=np.int16)
+
+    print("Drain everything after each message (normal operation)")
+    print(f"{'chunk':>8} | {'concat us/frame':>16} | {'ring us/frame':>14}")
+    print("-" * 45)
+    for size in CHUNK_SIZES:
+        chunks = split(audio, size)
+        concat_us = time_per_frame(concat_ingest, chunks)
+        ring_us = time_per_frame(ring_drain_all, chunks)
+        print(f"{size:>8} | {concat_us:>16.2f} | {ring_us:>14.2f}")
+
+    print()
+    print("Loop behind by N frames (4096-sample messages)")
+    print(f"{'backlog':>8} | {'concat us/frame':>16} | {'ring us/frame':>14}")
+    print("-" * 45)
+    chunks = split(audio, 4096)
+    for backlog in BACKLOG_FRAMES:
+        concat_us = time_per_frame(concat_ingest, chunks, backlog)
+        ring_us = time_per_frame(ring_ingest, chunks, backlog)
+        print(f"{backlog:>8} | {concat_us:>16.2f} | {ring_us:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
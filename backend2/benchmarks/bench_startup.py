@@ -0,0 +1,111 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start cost of the backend, each sample in a fresh interpreter:
+#
+#   * import config / import main
+#   * import main, app startup and the first HTTP request (GET /, then /api/ready)
+#   * import torch, for reference (config imported it before the device
+#     probe moved to model load time)
+#
+# With --models, also loads the real models: warm_up() time, and the first
+# 1 s transcription with and without a prior warm-up. That downloads the
+# models on first run. Run from backend2/:
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --repeats 10 --models
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBES = {
+    "import config": "import config",
+    "import main": "import main",
+    "import + startup + 1st request": """
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    assert client.get("/").status_code == 200
+    client.get("/api/ready")
+""",
+    "import torch (reference)": "import torch",
+}
+
+MODEL_PROBES = {
+    "warm_up(PRELOAD_MODELS)": """
+from config import PRELOAD_MODELS
+from model_pool import registry
+registry.warm_up(PRELOAD_MODELS)
+""",
+    "first transcription, lazy": """
+import numpy as np
+from transcription import RealtimeSTT
+RealtimeSTT().transcribe(np.zeros(16000, dtype=np.int16))
+""",
+}
+
+# Timed part of each probe runs between these two lines
+CHILD = """
+import json, os, sys, time
+sys.path.insert(0, {backend!r})
+os.environ.setdefault("PICOVOICE_ACCESS_KEY", "bench")
+os.environ["MODEL_PRELOAD"] = "off"
+{setup}
+start = time.perf_counter()
+{body}
+print(json.dumps(time.perf_counter() - start))
+"""
+
+WARM_SETUP = """
+import numpy as np
+from model_pool import registry
+from transcription import RealtimeSTT
+registry.warm_up(["whisper"])
+"""
+
+
+def sample(body, setup=""):
+    code = CHILD.format(backend=BACKEND, setup=setup, body=body)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--models", action="store_true", help="also time real model loading")
+    args = parser.parse_args()
+
+    probes = [(name, body, "") for name, body in PROBES.items()]
+    if args.models:
+        probes += [(name, body, "") for name, body in MODEL_PROBES.items()]
+        probes.append((
+            "first transcription, warmed",
+            "RealtimeSTT().transcribe(np.zeros(16000, dtype=np.int16))",
+            WARM_SETUP,
+        ))
+
+    print(f"{'phase':<30} {'median ms':>10} {'min ms':>10}")
+    for name, body, setup in probes:
+        times = []
+        for _ in range(args.repeats):
+            seconds, error = sample(body, setup)
+            if error:
+                print(f"{name:<30} {'failed':>10}   {error}")
+                break
+            times.append(seconds * 1000)
+        else:
+            print(f"{name:<30} {statistics.median(times):>10.0f} {min(times):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
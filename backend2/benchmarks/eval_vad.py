@@ -0,0 +1,141 @@
+# benchmarks/eval_vad.py
+#
+# Offline evaluation of the SpeechGate over WAV files (16 kHz mono int16).
+# Reports CPU time per second of audio and, when a label file is present,
+# frame accuracy/precision/recall and endpoint error against the labels.
+#
+# A label file sits next to the WAV with the same stem and a .txt suffix
+# and holds one "start_sec end_sec" speech segment per line.
+#
+#   python benchmarks/eval_vad.py recordings/*.wav --backend webrtc energy
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SAMPLE_RATE  # noqa: E402
+from vad_engine import EnergyVAD, SpeechGate, WebRtcVAD  # noqa: E402
+
+FRAME_LENGTH = 512  # Eagle frame
+
+
+def load_labels(wav_path, n_frames):
+    path = os.path.splitext(wav_path)[0] + ".txt"
+    if not os.path.exists(path):
+        return None, []
+    ref = np.zeros(n_frames, dtype=bool)
+    segments = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            start, end = float(parts[0]), float(parts[1])
+            segments.append((start, end))
+            a = int(start * SAMPLE_RATE) // FRAME_LENGTH
+            b = int(np.ceil(end * SAMPLE_RATE / FRAME_LENGTH))
+            ref[a:b] = True
+    return ref, segments
+
+
+def segments_from_mask(mask):
+    frame_sec = FRAME_LENGTH / SAMPLE_RATE
+    segments = []
+    start = None
+    for i, v in enumerate(mask):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            segments.append((start * frame_sec, i * frame_sec))
+            start = None
+    if start is not None:
+        segments.append((start * frame_sec, len(mask) * frame_sec))
+    return segments
+
+
+def endpoint_error(pred, ref):
+    """Mean distance (s) from each reference boundary to the nearest predicted one."""
+    if not pred or not ref:
+        return None
+    pred_points = np.array([p for seg in pred for p in seg])
+    errors = [np.min(np.abs(pred_points - p)) for seg in ref for p in seg]
+    return float(np.mean(errors))
+
+
+def make_detector(backend, aggressiveness):
+    if backend == "webrtc":
+        return WebRtcVAD(aggressiveness=aggressiveness)
+    if backend == "energy":
+        return EnergyVAD()
+    raise ValueError(backend)
+
+
+def evaluate(path, backend, aggressiveness):
+    pcm, sr = sf.read(path, dtype="int16")
+    if sr != SAMPLE_RATE:
+        raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz, got {sr}")
+    if pcm.ndim > 1:
+        pcm = pcm[:, 0]
+
+    n_frames = len(pcm) // FRAME_LENGTH
+    frames = pcm[:n_frames * FRAME_LENGTH].reshape(n_frames, FRAME_LENGTH)
+
+    gate = SpeechGate(make_detector(backend, aggressiveness), FRAME_LENGTH)
+    mask = np.zeros(n_frames, dtype=bool)
+
+    start = time.process_time()
+    for i, frame in enumerate(frames):
+        mask[i], _ = gate.process(frame)
+    cpu = time.process_time() - start
+
+    audio_sec = len(pcm) / SAMPLE_RATE
+    result = {
+        "file": os.path.basename(path),
+        "backend": backend,
+        "cpu_ms_per_audio_sec": cpu * 1000 / max(audio_sec, 1e-9),
+        "speech_ratio": float(mask.mean()) if n_frames else 0.0,
+    }
+
+    ref, ref_segments = load_labels(path, n_frames)
+    if ref is not None:
+        tp = int(np.sum(mask & ref))
+        fp = int(np.sum(mask & ~ref))
+        fn = int(np.sum(~mask & ref))
+        result["accuracy"] = float(np.mean(mask == ref))
+        result["precision"] = tp / (tp + fp) if tp + fp else 0.0
+        result["recall"] = tp / (tp + fn) if tp + fn else 0.0
+        result["endpoint_err_sec"] = endpoint_error(segments_from_mask(mask), ref_segments)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate VAD endpointing on WAV files")
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--backend", nargs="+", default=["webrtc", "energy"])
+    parser.add_argument("--aggressiveness", type=int, default=2)
+    args = parser.parse_args()
+
+    for backend in args.backend:
+        for path in args.wavs:
+            r = evaluate(path, backend, args.aggressiveness)
+            line = (
+                f"{r['file']:<28} {r['backend']:<7} "
+                f"cpu={r['cpu_ms_per_audio_sec']:.2f}ms/s speech={r['speech_ratio']:.2f}"
+            )
+            if "accuracy" in r:
+                err = r["endpoint_err_sec"]
+                line += (
+                    f" acc={r['accuracy']:.3f} p={r['precision']:.3f} r={r['recall']:.3f}"
+                    f" endpoint_err={'n/a' if err is None else f'{err:.3f}s'}"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/fake_ollama.py
+#
+# Stand-in for Ollama's /api/chat with fixed latencies: time to first
+# token, then paced tokens, as NDJSON when streaming. Optionally fails
+# every Nth request with a 503 to exercise client retries. load_test.py
+# starts it in-process for `--fake llm`; to use it with a real server:
+#
+#   python benchmarks/fake_ollama.py --port 11435
+#   OLLAMA_URL=http://127.0.0.1:11435 uvicorn main:app
+
+import argparse
+import asyncio
+import itertools
+import json
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def create_app(
+    first_token: float = 0.3,
+    per_token: float = 0.02,
+    tokens: int = 20,
+    fail_every: int = 0,
+) -> Starlette:
+    counter = itertools.count(1)
+
+    def message(model, content, done):
+        return {
+            "model": model,
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+
+        if fail_every and next(counter) % fail_every == 0:
+            return JSONResponse({"error": "fake overload"}, status_code=503)
+
+        words = [f"tok{i} " for i in range(tokens)]
+
+        if not body.get("stream", True):
+            await asyncio.sleep(first_token + per_token * max(0, tokens - 1))
+            return JSONResponse(message(model, "".join(words), True))
+
+        async def lines():
+            await asyncio.sleep(first_token)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(per_token)
+                yield json.dumps(message(model, word, False)) + "\n"
+            yield json.dumps(message(model, "", True)) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return Starlette(routes=[Route("/api/chat", chat, methods=["POST"])])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--fail-every", type=int, default=0, help="503 every Nth request")
+    args = parser.parse_args()
+
+    app = create_app(
+        args.first_token_ms / 1000, args.token_ms / 1000, args.tokens, args.fail_every
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+# benchmarks/load_test.py
+#
+# Replays WAV files over N concurrent websocket clients against an
+# in-process server and reports:
+#
+#   * per-message processing time on the server (receive -> next receive)
+#   * end-of-speech -> transcript / first response chunk / full response
+#   * late frames (client fell behind its real-time schedule), samples
+#     dropped by the session ring buffers, and event-loop lag
+#
+# Eagle, faster-whisper and Ollama can each be replaced by fixed-latency
+# fakes (the default), so the numbers isolate the server's own overhead.
+# The Ollama fake is a local HTTP server (fake_ollama.py), so the real
+# async client, its connection pool and concurrency limits stay in play.
+# With no WAV given, a synthetic 1.5 s speech-like burst is used. Each
+# replay is treated as one utterance followed by --gap seconds of silence;
+# end of speech is when its last sample was sent. Run from backend2/:
+#
+#   python benchmarks/load_test.py --clients 8 --duration 30
+#   python benchmarks/load_test.py speech.wav --endpoint conversation --fake stt llm
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PICOVOICE_ACCESS_KEY", "load-test")
+os.environ.setdefault("MODEL_PRELOAD", "off")  # real models load on first use, if not faked
+
+from config import SAMPLE_RATE  # noqa: E402
+
+FRAME_LENGTH = 512  # Eagle frame
+
+
+# ---------------- fakes ----------------
+
+class FakeRecognizer:
+    """
+    Eagle stand-in: loud frames belong to the first enrolled speaker, or
+    to an unknown guest for the `guest_share` of sessions that are guests.
+    """
+
+    frame_length = FRAME_LENGTH
+    sample_rate = SAMPLE_RATE
+    latency = 0.0
+    guest_share = 0.0
+    sessions = 0
+
+    def __init__(self, speaker_ids=None, store=None):
+        self.speaker_ids = list(speaker_ids or ["default"])
+        FakeRecognizer.sessions += 1
+        n = FakeRecognizer.sessions
+        self.guest = int(n * self.guest_share) > int((n - 1) * self.guest_share)
+
+    def identify(self, frame):
+        if self.latency:
+            time.sleep(self.latency)
+        x = frame.astype(np.float32)
+        if np.sqrt(np.dot(x, x) / len(x)) / 32768.0 > 0.02 and not self.guest:
+            return self.speaker_ids[0], 0.95
+        return None, 0.1
+
+    def process_frame(self, frame):
+        speaker, score = self.identify(frame)
+        return speaker is not None, score
+
+    def delete(self):
+        pass
+
+
+class FakeProfiles:
+    def has(self, user_id=None):
+        return True
+
+    def users(self):
+        return ["default"]
+
+    def load(self):
+        return 1
+
+
+class FakeSTT:
+    """faster-whisper stand-in with a fixed decode time per call."""
+
+    TEXT = "um I think uh maybe this is like a load test"
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.decodes = {"registered": 0, "guest": 0}  # utterances decoded
+
+    def _count(self, trusted, n=1):
+        self.decodes["registered" if trusted else "guest"] += n
+
+    def transcribe(self, pcm, trusted=True, prompt=None):
+        self._count(trusted)
+        time.sleep(self.latency)
+        return self.TEXT
+
+    def transcribe_batch(self, pcms, trusted=True):
+        self._count(trusted, len(pcms))
+        time.sleep(self.latency)
+        return [self.TEXT for _ in pcms]
+
+    def transcribe_words(self, pcm, trusted=True, prompt=None):
+        self._count(trusted)
+        time.sleep(self.latency)
+        words = self.TEXT.split()
+        step = len(pcm) / SAMPLE_RATE / len(words)
+        return [(w, i * step, (i + 1) * step) for i, w in enumerate(words)]
+
+
+class FakeMemory:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def retrieve(self, query, k=5):
+        return []
+
+    def store(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def install_fakes(args):
+    """Patch the chosen components in the already-imported app modules."""
+    import llm_engine
+    import main
+    from fake_ollama import create_app
+    from ollama_client import llm_client
+    from vad_engine import create_vad
+
+    rings, servers = [], []
+
+    class TrackedRing(main.PCMRingBuffer):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            rings.append(self)
+
+    main.PCMRingBuffer = TrackedRing
+
+    if "eagle" in args.fake:
+        FakeRecognizer.latency = args.eagle_ms / 1000
+        FakeRecognizer.guest_share = args.guest_share
+        main.EagleRecognizer = FakeRecognizer
+        main.profile_store = FakeProfiles()
+
+    if "stt" in args.fake:
+        stt = FakeSTT(args.stt_ms / 1000)
+        main.stt_engine = stt
+        main.stt_scheduler.engine = stt
+
+    if "llm" in args.fake:
+        fake = create_app(args.llm_ms / 1000, args.token_ms / 1000, args.tokens, args.llm_fail_every)
+        server, _, _, port = serve_in_thread(fake)
+        servers.append(server)
+        llm_client.host = f"http://127.0.0.1:{port}"
+        llm_engine.MemorySystem = FakeMemory
+
+    if args.vad:
+        main.create_vad = lambda: create_vad(args.vad)
+
+    return rings, servers
+
+
+# ---------------- server side instrumentation ----------------
+
+class ServerProbe:
+    """Per-message processing time and event-loop lag, measured in the server loop."""
+
+    def __init__(self):
+        self.message_ms = []
+        self.loop_lag_ms = []
+        self.running = True
+
+    def patch_receive(self):
+        from starlette.websockets import WebSocket
+
+        original = WebSocket.receive
+        probe = self
+
+        async def receive(ws):
+            started = getattr(ws, "_probe_got", None)
+            if started is not None:
+                probe.message_ms.append((time.perf_counter() - started) * 1000)
+            msg = await original(ws)
+            ws._probe_got = time.perf_counter() if msg.get("bytes") else None
+            return msg
+
+        WebSocket.receive = receive
+
+    async def monitor_loop(self, interval=0.01):
+        while self.running:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag_ms.append((time.perf_counter() - start - interval) * 1000)
+
+
+def serve_in_thread(app, probe=None):
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    loop = asyncio.new_event_loop()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        if probe is not None:
+            loop.create_task(probe.monitor_loop())
+        loop.run_until_complete(server.serve())
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, loop, thread, port
+
+
+# ---------------- clients ----------------
+
+def load_audio(paths):
+    import soundfile as sf
+
+    clips = []
+    for path in paths:
+        pcm, sr = sf.read(path, dtype="float32", always_2d=True)
+        pcm = pcm.mean(axis=1)
+        if sr != SAMPLE_RATE:
+            from audio_input import StreamingResampler
+            pcm = StreamingResampler(sr).process(pcm)
+        clips.append(pcm.astype(np.float32))
+    if not clips:
+        # Harmonic buzz with a syllable-rate envelope plus a little noise
+        t = np.arange(int(1.5 * SAMPLE_RATE)) / SAMPLE_RATE
+        f0 = 140 + 20 * np.sin(2 * np.pi * 3 * t)
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+        envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2.5 * t))
+        rng = np.random.default_rng(0)
+        clip = 0.15 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+        clips.append(clip.astype(np.float32))
+    return clips
+
+
+def encode(chunk, encoding):
+    if encoding == "int16":
+        return (np.clip(chunk, -1, 1) * 32767).astype(np.int16).tobytes()
+    return chunk.astype(np.float32).tobytes()
+
+
+class ClientStats:
+    def __init__(self):
+        self.frames_sent = 0
+        self.late_frames = 0
+        self.transcript_ms = []
+        self.first_response_ms = []
+        self.response_ms = []
+        self.messages = 0
+
+
+async def run_client(idx, port, args, clips, deadline, stats):
+    import websockets
+
+    chunk = int(SAMPLE_RATE * args.chunk_ms / 1000)
+    url = (
+        f"ws://127.0.0.1:{port}/ws/{args.endpoint}"
+        f"?user=load{idx}&encoding={args.encoding}&rate={SAMPLE_RATE}"
+    )
+    silence = np.zeros(int(args.gap * SAMPLE_RATE), dtype=np.float32)
+    eos = {"t": None, "transcript": False, "first": False}
+
+    async with websockets.connect(url, max_size=None) as ws:
+
+        async def reader():
+            async for raw in ws:
+                stats.messages += 1
+                msg = json.loads(raw)
+                kind = msg.get("type")
+                now = time.perf_counter()
+                if eos["t"] is None:
+                    continue
+                elapsed = (now - eos["t"]) * 1000
+                if kind == "transcription" and not eos["transcript"]:
+                    eos["transcript"] = True
+                    stats.transcript_ms.append(elapsed)
+                elif kind == "response_delta" and not eos["first"]:
+                    eos["first"] = True
+                    stats.first_response_ms.append(elapsed)
+                elif kind in ("response_done", "response", "coach"):
+                    if not eos["first"]:
+                        stats.first_response_ms.append(elapsed)
+                    stats.response_ms.append(elapsed)
+                    eos["t"] = None
+
+        read_task = asyncio.create_task(reader())
+
+        # Stagger clients so they don't all speak in lock-step
+        await asyncio.sleep(idx * args.chunk_ms / 1000 / max(args.clients, 1) * 7)
+        start = time.perf_counter()
+        sent_samples = 0
+        n = idx
+
+        try:
+            while time.perf_counter() < deadline:
+                clip = clips[n % len(clips)]
+                n += 1
+                for source, is_speech in ((clip, True), (silence, False)):
+                    for pos in range(0, len(source), chunk):
+                        due = start + sent_samples / SAMPLE_RATE
+                        delay = due - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        elif -delay > args.chunk_ms / 1000:
+                            stats.late_frames += 1
+                        await ws.send(encode(source[pos:pos + chunk], args.encoding))
+                        stats.frames_sent += 1
+                        sent_samples += len(source[pos:pos + chunk])
+                    if is_speech:
+                        eos.update(t=time.perf_counter(), transcript=False, first=False)
+        finally:
+            await asyncio.sleep(args.drain)
+            read_task.cancel()
+
+
+# ---------------- report ----------------
+
+def percentiles(values):
+    if not values:
+        return "n/a"
+    a = np.asarray(values)
+    p50, p90, p99 = np.percentile(a, [50, 90, 99])
+    return f"p50={p50:8.2f}  p90={p90:8.2f}  p99={p99:8.2f}  max={a.max():8.2f}  n={len(a)}"
+
+
+def report(args, clients, probe, rings, wall):
+    merged = ClientStats()
+    for s in clients:
+        for name in ("frames_sent", "late_frames", "messages"):
+            setattr(merged, name, getattr(merged, name) + getattr(s, name))
+        merged.transcript_ms += s.transcript_ms
+        merged.first_response_ms += s.first_response_ms
+        merged.response_ms += s.response_ms
+
+    import main
+
+    dropped = sum(r.dropped_samples for r in rings)
+    decodes = getattr(main.stt_engine, "decodes", None)
+    result = {
+        "endpoint": args.endpoint,
+        "clients": args.clients,
+        "seconds": round(wall, 1),
+        "frames_sent": merged.frames_sent,
+        "late_frames": merged.late_frames,
+        "dropped_samples": dropped,
+        "messages_received": merged.messages,
+    }
+    if decodes is not None:
+        result["stt_decodes"] = dict(decodes)
+
+    if args.json:
+        for name, values in (
+            ("message_ms", probe.message_ms),
+            ("eos_to_transcript_ms", merged.transcript_ms),
+            ("eos_to_first_response_ms", merged.first_response_ms),
+            ("eos_to_response_ms", merged.response_ms),
+            ("loop_lag_ms", probe.loop_lag_ms),
+        ):
+            if values:
+                p = np.percentile(values, [50, 90, 99])
+                result[name] = {
+                    "p50": round(float(p[0]), 3),
+                    "p90": round(float(p[1]), 3),
+                    "p99": round(float(p[2]), 3),
+                    "max": round(float(np.max(values)), 3),
+                    "n": len(values),
+                }
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"\n/ws/{args.endpoint}  clients={args.clients}  {wall:.1f}s  fakes={','.join(args.fake) or 'none'}")
+    print(f"  message processing (ms)   {percentiles(probe.message_ms)}")
+    print(f"  EOS -> transcript (ms)    {percentiles(merged.transcript_ms)}")
+    print(f"  EOS -> first reply (ms)   {percentiles(merged.first_response_ms)}")
+    print(f"  EOS -> full reply (ms)    {percentiles(merged.response_ms)}")
+    print(f"  event-loop lag (ms)       {percentiles(probe.loop_lag_ms)}")
+    print(
+        f"  frames sent={merged.frames_sent}  late={merged.late_frames}"
+        f"  dropped samples={dropped}  messages received={merged.messages}"
+    )
+    if decodes is not None:
+        print(f"  STT decodes  registered={decodes['registered']}  guest={decodes['guest']}")
+
+
+async def run_clients(args, port, clips):
+    deadline = time.perf_counter() + args.duration
+    stats = [ClientStats() for _ in range(args.clients)]
+    results = await asyncio.gather(
+        *(run_client(i, port, args, clips, deadline, stats[i]) for i in range(args.clients)),
+        return_exceptions=True,
+    )
+    for i, r in enumerate(results):
+        if isinstance(r, Exception):
+            print(f"[LOAD] client {i} failed: {r!r}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Websocket load test for the VoxSentinel backend")
+    parser.add_argument("wavs", nargs="*", help="speech clips to replay (any rate, mixed down to mono)")
+    parser.add_argument("--endpoint", choices=["talk", "conversation"], default="conversation")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of replay per client")
+    parser.add_argument("--chunk-ms", type=float, default=20.0, help="audio per websocket message")
+    parser.add_argument("--gap", type=float, default=1.5, help="silence after each clip (s)")
+    parser.add_argument("--drain", type=float, default=3.0, help="wait for replies after replay (s)")
+    parser.add_argument("--encoding", choices=["float32", "int16"], default="float32")
+    parser.add_argument("--fake", nargs="*", default=["eagle", "stt", "llm"],
+                        choices=["eagle", "stt", "llm"], help="components replaced by fakes")
+    parser.add_argument("--vad", choices=["webrtc", "energy", "off"], default=None)
+    parser.add_argument("--eagle-ms", type=float, default=0.3, help="fake Eagle time per frame")
+    parser.add_argument("--stt-ms", type=float, default=150.0, help="fake Whisper time per decode")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="fake Ollama time to first token")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="fake Ollama time per token")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--guest-share", type=float, default=0.0,
+                        help="fraction of sessions whose speech is an unenrolled guest (fake Eagle)")
+    parser.add_argument("--llm-fail-every", type=int, default=0, help="fake Ollama 503s every Nth request")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    import main as app_main  # patched below, before any session starts
+
+    rings, fake_servers = install_fakes(args)
+    clips = load_audio(args.wavs)
+
+    probe = ServerProbe()
+    probe.patch_receive()
+    server, loop, thread, port = serve_in_thread(app_main.app, probe)
+
+    started = time.perf_counter()
+    try:
+        stats = asyncio.run(run_clients(args, port, clips))
+    finally:
+        probe.running = False
+        server.should_exit = True
+        thread.join(timeout=10)
+        for fake in fake_servers:
+            fake.should_exit = True
+
+    report(args, stats, probe, rings, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# coach_speculator.py
+
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from config import (
+    COACH_SPECULATE_MAX_AGE_SEC,
+    COACH_SPECULATE_MAX_DRIFT_WORDS,
+    COACH_SPECULATE_MIN_NEW_WORDS,
+    COACH_SPECULATE_SCORE,
+)
+from hesitation import Word, analyzer as hesitation
+
+_PUNCT = ".,!?;:\"()-"
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in (t.strip(_PUNCT) for t in text.lower().split()) if w]
+
+
+def coach_prompt(user_text: str, guest_context: str = "") -> str:
+    prompt = "User is struggling. Suggest one confident sentence."
+    if guest_context:
+        prompt += f"\nOther speaker said: {guest_context}"
+    return prompt + f"\nUser said: {user_text}"
+
+
+class _Draft:
+    def __init__(self, words: List[str], guest_version: int, task: asyncio.Task):
+        self.words = words
+        self.guest_version = guest_version
+        self.task = task
+        self.created = time.monotonic()
+
+
+class SpeculativeCoach:
+    """
+    Keeps one coaching hint drafted ahead of the struggle trigger.
+
+    While the registered speaker talks, `observe()` is fed the committed
+    partial text; once it looks hesitant it drafts a hint in the
+    background for the current conversation state (the guest context's
+    `version` plus the user's words so far). When coaching fires, `take()` serves
+    the draft if it still fits: same guest context, the final text
+    extends the drafted words by at most `max_drift_words`, and it is not
+    older than `max_age`. It waits for a fitting draft that is still in
+    flight; otherwise it returns None and the caller asks the LLM as usual.
+    """
+
+    def __init__(
+        self,
+        draft: Callable[[str], Awaitable[str]],
+        context=None,
+        min_score: float = COACH_SPECULATE_SCORE,
+        min_new_words: int = COACH_SPECULATE_MIN_NEW_WORDS,
+        max_drift_words: int = COACH_SPECULATE_MAX_DRIFT_WORDS,
+        max_age: float = COACH_SPECULATE_MAX_AGE_SEC,
+    ):
+        self.draft = draft  # user text -> hint
+        self.context = context  # anything with a `version`, e.g. GuestContext
+        self.min_score = min_score
+        self.min_new_words = min_new_words
+        self.max_drift_words = max_drift_words
+        self.max_age = max_age
+
+        self._current: Optional[_Draft] = None
+        self.counters: Counter = Counter()
+
+    @property
+    def guest_version(self) -> int:
+        return self.context.version if self.context is not None else 0
+
+    def _fits(self, draft: _Draft, words: List[str]) -> bool:
+        n = len(draft.words)
+        return (
+            draft.guest_version == self.guest_version
+            and words[:n] == draft.words
+            and len(words) - n <= self.max_drift_words
+            and time.monotonic() - draft.created <= self.max_age
+        )
+
+    # ---------------- drafting ----------------
+
+    def observe(self, user_text: str, words: Optional[Sequence[Word]] = None) -> bool:
+        """Start a background draft for `user_text` if worthwhile; True if started."""
+        tokens = _words(user_text)
+        current = self._current
+        if current is not None and self._fits(current, tokens):
+            if not current.task.done():
+                return False  # let the fitting draft finish
+            if len(tokens) - len(current.words) < self.min_new_words:
+                return False
+
+        if hesitation.analyze(user_text, words).score < self.min_score:
+            return False
+
+        self.discard()
+        task = asyncio.create_task(self.draft(user_text))
+        # A draft nobody takes must not log "exception never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._current = _Draft(tokens, self.guest_version, task)
+        self.counters["drafted"] += 1
+        return True
+
+    async def take(self, user_text: str) -> Optional[str]:
+        """The drafted hint for `user_text`, or None if there is none that fits."""
+        current, self._current = self._current, None
+        if current is None:
+            return None
+        if not self._fits(current, _words(user_text)):
+            current.task.cancel()
+            self.counters["stale"] += 1
+            return None
+        try:
+            hint = await current.task
+        except Exception as e:
+            print(f"[COACH] Draft failed: {e!r}")
+            self.counters["failed"] += 1
+            return None
+        if not hint:
+            return None
+        self.counters["served"] += 1
+        return hint
+
+    def discard(self):
+        if self._current is not None:
+            self._current.task.cancel()
+            self._current = None
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -13,39 +13,134 @@ ACCESS_KEY: str = _ACCESS_KEY
 
 
 DATA_DIR = "data"
-PROFILE_PATH = os.path.join(DATA_DIR, "speaker_profile.pv")
+PROFILE_PATH = os.path.join(DATA_DIR, "speaker_profile.pv")  # legacy single profile
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+ENROLL_UPLOAD_DIR = os.path.join(DATA_DIR, "uploads")
+ENROLL_MAX_JOBS = 100  # finished jobs kept for polling
+DEFAULT_USER_ID = "default"
 
 
+SAMPLE_RATE = 16000  # Eagle, the VADs and Whisper all take 16 kHz mono
 VERIFY_THRESHOLD = 0.70
 GRACE_PERIOD_FRAMES = 20
 MIN_TRANSCRIPTION_LENGTH_SEC = 0.5
+AUDIO_BUFFER_FRAMES = 256  # ring capacity in Eagle frames (~8 s at 16 kHz)
+WIRE_MAX_SAMPLE_RATE = 96000    # highest client rate accepted on the websockets
+RESAMPLER_ZERO_CROSSINGS = 8    # filter half-length, in zero crossings of the sinc
+
+# Status messages: send on label change, otherwise at most this often
+STATUS_COALESCE = True
+STATUS_MAX_RATE_HZ = 5.0
+STATUS_AGGREGATE = True  # include min/max/mean confidence of the window
+
+# Completed utterances waiting for STT/LLM per session; oldest dropped when full
+UTTERANCE_QUEUE_SIZE = 4
+
+# Voice activity detection in front of Eagle/STT: "webrtc", "energy" or "off"
+VAD_BACKEND = "webrtc"
+VAD_AGGRESSIVENESS = 2       # webrtcvad 0 (lenient) .. 3 (strict)
+VAD_FRAME_MS = 30
+VAD_HANGOVER_MS = 200        # keep the gate open this long after speech
+VAD_PREROLL_MS = 150         # audio kept from before speech onset
+ENERGY_VAD_THRESHOLD = 0.006
+
+# Per-frame signal features
+CLIP_LEVEL = 32000           # int16 peak counted as clipping
+PAUSE_MIN_MS = 250           # quiet run inside an utterance counted as a pause
 
 HESITATION_THRESHOLD_MS = 800
 VOLUME_THRESHOLD_RMS = 0.005  # Adjust based on normalization
 SPEECH_RATE_THRESHOLD_FAST = 160
 SPEECH_RATE_THRESHOLD_SLOW = 110
-
-import torch
-
-# ... (rest of imports)
-
-# ... (code)
-
-# Auto-detect compute device
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"[CONFIG] Hardware Acceleration: {DEVICE.upper()}")
-
+STRUGGLE_THRESHOLD = 3.0     # hesitation score (hesitation.py) that triggers coaching
+
+# Speculative coaching: draft a hint from partial text before the trigger fires
+COACH_SPECULATIVE = True
+COACH_SPECULATE_SCORE = 1.5          # partial hesitation score that starts a draft
+COACH_SPECULATE_MIN_NEW_WORDS = 4    # new committed words before redrafting
+COACH_SPECULATE_MAX_DRIFT_WORDS = 12 # words the final text may add to a draft
+COACH_SPECULATE_MAX_AGE_SEC = 20.0
+
+# Guest (unregistered) speech is only context for coaching
+GUEST_STT_POLICY = os.getenv("GUEST_STT_POLICY", "deferred")  # "deferred" | "eager" | "off"
+GUEST_CONTEXT_SEC = 30.0             # guest audio/text kept per session
+GUEST_CONTEXT_UTTERANCES = 3         # recent guest utterances in coach prompts
+GUEST_BEAM_SIZE = 1                  # greedy decoding for guests
+GUEST_WHISPER_MODEL_SIZE = os.getenv("GUEST_WHISPER_MODEL", "")  # e.g. "tiny.en"; empty shares the main model
+
+# Compute device. "auto" is resolved when Whisper loads (model_pool), via
+# CTranslate2's CUDA probe, so importing config never pulls in torch.
 WHISPER_MODEL_SIZE = "base.en"
-WHISPER_DEVICE = DEVICE
-WHISPER_COMPUTE = "float16" if DEVICE == "cuda" else "int8"
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")    # "auto" | "cuda" | "cpu"
+WHISPER_COMPUTE = os.getenv("WHISPER_COMPUTE", "auto")  # "auto": float16 on CUDA, int8 on CPU
+
+# Heavy models load in a warm-up step instead of at import or first request
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "background")  # "background" | "startup" | "off"
+PRELOAD_MODELS = ("whisper", "embedding", "chroma")
+
+# Per-workload thread pools and admission control
+_CPU_COUNT = os.cpu_count() or 2
+STT_WORKERS = int(os.getenv("STT_WORKERS", max(1, min(4, _CPU_COUNT // 2))))
+STT_CPU_THREADS = max(1, _CPU_COUNT // STT_WORKERS)  # CTranslate2 threads per worker
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", 8))  # memory retrieval ahead of LLM calls
+BACKGROUND_WORKERS = 2
+STT_MAX_QUEUE = 16   # STT backlog at which new sessions are degraded (rejected at 2x)
+LLM_MAX_QUEUE = 16   # requests waiting on LLM slots at which optional coaching is shed
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 64))
+
+# Cross-session STT batching: wait this long for other sessions' utterances
+STT_BATCH_WINDOW_MS = 40
+STT_MAX_BATCH = 8
+
+# Streaming partial transcripts for the registered speaker
+STREAMING_STT = True
+STREAMING_INTERVAL_MS = 600      # re-decode the open utterance this often
+STREAMING_MAX_WINDOW_SEC = 12.0  # force a commit if agreement never comes
 
 OLLAMA_MODEL = "gemini-3-flash-preview:cloud"
 # Use host.docker.internal for Docker (Windows/Mac) or default to local
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434")
+LLM_STREAMING = True  # send response_delta chunks instead of one final message
+
+# Async Ollama client: one pooled connection set shared by chat and extraction
+LLM_CONNECT_TIMEOUT = 5.0
+LLM_READ_TIMEOUT = 30.0      # longest silence between streamed chunks
+LLM_REQUEST_TIMEOUT = 120.0  # whole reply, streamed or not, retries included
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))  # in flight per model
+LLM_MAX_CONNECTIONS = 32
+LLM_RETRIES = 2              # extra attempts on connect errors, timeouts, 429/5xx
+LLM_RETRY_BACKOFF = 0.25     # seconds, doubled per attempt, full jitter
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 
 MAX_MEMORY_ITEMS = 200
+EMBEDDING_CACHE_SIZE = 1024   # normalised query -> embedding
+RETRIEVAL_CACHE_SIZE = 512    # (collection, version, query, k) -> documents
+MEMORY_WRITE_BATCH = 8        # buffered facts per collection.add
+MEMORY_EVICTION_POLICY = "lru"  # "lru" (least recently retrieved) or "oldest"
+MEMORY_DEDUP_SIMILARITY = 0.92  # cosine at or above which facts are merged
+
+# Background memory extraction: one LLM call per batch of utterances
+MEMORY_BATCH_SIZE = 4
+MEMORY_BATCH_WINDOW_SEC = 20.0
+MEMORY_MIN_WORDS = 4         # shorter utterances never reach the LLM
+MEMORY_RECENT_DEDUP = 32     # recent utterances remembered per user for dedup
 MAX_MEMORY_INJECTION_CHARS = 600
 
+# Prompt assembly (prompt_builder.py); tokens are estimated, ~4 chars each
+PROMPT_TOKEN_BUDGET = 1536    # system + summary + history + memories + user message
+PROMPT_HISTORY_TOKENS = 768   # past this, the oldest turns are folded into the summary
+PROMPT_SUMMARY_TOKENS = 160
+PROMPT_FOLD_TURNS = 2         # turns folded per summary update
+PROMPT_TOKEN_BUCKETS = (64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096)
+
+# Prometheus-style /metrics
+METRICS_PREFIX = "voxsentinel"
+METRICS_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
 SYSTEM_PROMPT = """
 You are an English communication coach designed to help introverted users speak clearly and confidently.
 
@@ -1,38 +1,45 @@
 # eagle_engine.py 
-import os
+from typing import Optional, Sequence, Tuple
+
 import pveagle
-from config import ACCESS_KEY, PROFILE_PATH, VERIFY_THRESHOLD
+from config import ACCESS_KEY, VERIFY_THRESHOLD
+from profile_store import profile_store
 
 
 class EagleRecognizer:
-    def __init__(self):
-        if not os.path.exists(PROFILE_PATH):
+    """
+    One Eagle instance per session, scoring each frame against the chosen
+    enrolled speakers (all of them by default). Profiles come from the
+    in-memory ProfileStore, so creating one does no file I/O.
+    """
+
+    def __init__(self, speaker_ids: Optional[Sequence[str]] = None, store=profile_store):
+        self.speaker_ids, profiles = store.select(speaker_ids)
+        if not profiles:
             raise FileNotFoundError("Speaker profile missing")
 
-        with open(PROFILE_PATH, "rb") as f:
-            profile_bytes = f.read()
-
-        profile = pveagle.EagleProfile.from_bytes(profile_bytes)
-
         self.eagle = pveagle.create_recognizer(
             access_key=ACCESS_KEY,
-            speaker_profiles=[profile]
+            speaker_profiles=profiles
         )
 
         self.frame_length = self.eagle.frame_length
         self.sample_rate = self.eagle.sample_rate
-        self._last_verified = None
 
-        print("[EAGLE] Ready")
+        print(f"[EAGLE] Ready ({len(self.speaker_ids)} speaker(s))")
 
-    def process_frame(self, pcm_frame):
-        score = self.eagle.process(pcm_frame)[0]
-        verified = score >= VERIFY_THRESHOLD
-
-        if verified != self._last_verified:
-            self._last_verified = verified
+    def identify(self, pcm_frame) -> Tuple[Optional[str], float]:
+        """Best-scoring enrolled speaker, or None below VERIFY_THRESHOLD."""
+        scores = self.eagle.process(pcm_frame)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        score = scores[best]
+        if score >= VERIFY_THRESHOLD:
+            return self.speaker_ids[best], score
+        return None, score
 
-        return verified, score
+    def process_frame(self, pcm_frame):
+        speaker, score = self.identify(pcm_frame)
+        return speaker is not None, score
 
     def delete(self):
         self.eagle.delete()
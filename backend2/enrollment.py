@@ -1,39 +1,256 @@
-# enrollment.py 
+# enrollment.py
+import json
 import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
+
 import numpy as np
 import pveagle
-from config import ACCESS_KEY, DATA_DIR, PROFILE_PATH
-from memory_engine import MemorySystem
+import soundfile as sf
+from audio_input import StreamingResampler
+from config import (
+    ACCESS_KEY,
+    DATA_DIR,
+    DEFAULT_USER_ID,
+    ENROLL_MAX_JOBS,
+    ENROLL_UPLOAD_DIR,
+    SAMPLE_RATE,
+    WIRE_MAX_SAMPLE_RATE,
+)
+from memory_engine import MemorySystem, adopt_memories
+from profile_store import profile_store
 
-os.makedirs(DATA_DIR, exist_ok=True)
 
+os.makedirs(DATA_DIR, exist_ok=True)
 
-def enroll_from_pcm(pcm_int16: np.ndarray):
-    print("[ENROLL] Starting enrollment")
 
-    # Reset memory on new voice
-    MemorySystem(reset=True)
+def _enroll(
+    frames: Callable[[int], Iterator[np.ndarray]],
+    user_id: str,
+    on_progress: Optional[Callable[[float], None]] = None,
+):
+    """
+    Feed `frames(frame_len)` to the Eagle profiler until it is complete,
+    then save the profile and start the speaker with a clean memory.
+    """
+    print(f"[ENROLL] Starting enrollment for {user_id}")
 
     profiler = pveagle.create_profiler(access_key=ACCESS_KEY)
 
     try:
         frame_len = profiler.min_enroll_samples
-        cursor = 0
         percent = 0.0
 
-        while percent < 100.0 and cursor + frame_len <= len(pcm_int16):
-            frame = pcm_int16[cursor: cursor + frame_len]
-            cursor += frame_len
+        for frame in frames(frame_len):
+            if len(frame) < frame_len:
+                break
             percent, _ = profiler.enroll(frame) # type: ignore
+            if on_progress:
+                on_progress(percent)
+            if percent >= 100.0:
+                break
 
         if percent < 100.0:
             raise RuntimeError("Not enough clean speech")
 
         profile = profiler.export()
-        with open(PROFILE_PATH, "wb") as f:
-            f.write(profile.to_bytes())
+        profile_store.save(user_id, profile.to_bytes())
+
+        # A new voice starts with a clean memory; other users are untouched
+        MemorySystem(user_id, reset=True)
 
         print("[ENROLL] Completed")
 
     finally:
         profiler.delete()
+
+
+def adopt_legacy_user(user_id: str) -> bool:
+    """
+    Give an install's legacy single-user profile, and its memories, to
+    `user_id` when that profile is the only one. Returns True if adopted.
+    """
+    # Moving the profile file is the claim; only its winner takes the memories
+    if not profile_store.adopt_legacy(user_id):
+        return False
+    try:
+        adopt_memories(DEFAULT_USER_ID, user_id)
+    except Exception as e:
+        print(f"[ENROLL] Legacy memories not moved to {user_id}: {e!r}")
+    print(f"[ENROLL] Legacy profile adopted by {user_id}")
+    return True
+
+
+def enroll_from_pcm(pcm_int16: np.ndarray, user_id: str = DEFAULT_USER_ID, on_progress=None):
+    def frames(frame_len):
+        for cursor in range(0, len(pcm_int16), frame_len):
+            yield pcm_int16[cursor: cursor + frame_len]
+
+    _enroll(frames, user_id, on_progress)
+
+
+def enroll_from_file(path: str, user_id: str = DEFAULT_USER_ID, on_progress=None):
+    """
+    Decode and enroll block by block; the recording is never fully in
+    memory. Any sample rate or channel count is downmixed and resampled.
+    """
+    with sf.SoundFile(path) as f:
+        resampler = StreamingResampler(f.samplerate) if f.samplerate != SAMPLE_RATE else None
+
+        def frames(frame_len):
+            block_len = -(-frame_len * f.samplerate // SAMPLE_RATE)
+            pending = np.empty(0, dtype=np.float32)
+            for block in f.blocks(blocksize=block_len, dtype="float32", always_2d=True):
+                pcm = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+                if resampler is not None:
+                    pcm = resampler.process(pcm)
+                pending = np.concatenate((pending, pcm))
+                while len(pending) >= frame_len:
+                    frame, pending = pending[:frame_len], pending[frame_len:]
+                    yield (np.clip(frame, -1.0, 1.0) * 32767).astype(np.int16)
+
+        _enroll(frames, user_id, on_progress)
+
+
+def stage_upload(src) -> str:
+    """
+    Check the audio header, then copy the upload in chunks to a file the
+    background job owns (the request's own upload is closed when it ends).
+    """
+    info = sf.info(src)
+    if not 8000 <= info.samplerate <= WIRE_MAX_SAMPLE_RATE:
+        raise ValueError(f"Unsupported sample rate: {info.samplerate}")
+    src.seek(0)
+
+    os.makedirs(ENROLL_UPLOAD_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".wav", dir=ENROLL_UPLOAD_DIR)
+    with os.fdopen(fd, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 16)
+    return path
+
+
+_JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+PROGRESS_WRITE_STEP = 5.0  # percent between job-file writes while running
+
+
+class EnrollmentJob:
+    def __init__(self, user_id: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.status = "queued"  # queued | running | done | failed
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "user": self.user_id,
+            "status": self.status,
+            "progress": round(self.progress, 1),
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EnrollmentJob":
+        job = cls(data["user"])
+        job.id = data["job_id"]
+        job.status = data["status"]
+        job.progress = data["progress"]
+        job.error = data["error"]
+        job.created = data.get("created", job.created)
+        job.finished = data.get("finished")
+        return job
+
+
+class EnrollmentJobs:
+    """
+    Background enrollment runs. `run()` is executed on a worker thread and
+    owns the temporary upload file; progress is read by pollers.
+
+    Job state is also written as `<job_id>.json` next to the staged uploads,
+    so a poll that lands on another worker process still finds the job.
+    Only the most recent `max_jobs` are kept, in memory and on disk.
+    """
+
+    def __init__(self, max_jobs: int = ENROLL_MAX_JOBS, directory: Optional[str] = None):
+        self.max_jobs = max_jobs
+        self.directory = directory  # None: ENROLL_UPLOAD_DIR
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory or ENROLL_UPLOAD_DIR, job_id + ".json")
+
+    def _save(self, job: EnrollmentJob):
+        path = self._path(job.id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({**job.to_dict(), "created": job.created, "finished": job.finished}, f)
+        os.replace(tmp, path)
+
+    def _drop(self, job_id: str):
+        try:
+            os.remove(self._path(job_id))
+        except OSError:
+            pass
+
+    def create(self, user_id: str) -> EnrollmentJob:
+        job = EnrollmentJob(user_id)
+        self._save(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                old_id, _ = self._jobs.popitem(last=False)
+                self._drop(old_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[EnrollmentJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or not _JOB_ID_RE.fullmatch(job_id):
+            return job
+        # Started by another worker process
+        try:
+            with open(self._path(job_id)) as f:
+                return EnrollmentJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def run(self, job: EnrollmentJob, path: str, enroll=enroll_from_file):
+        job.status = "running"
+        self._save(job)
+        written = [0.0]
+
+        def on_progress(percent):
+            job.progress = percent
+            if percent - written[0] >= PROGRESS_WRITE_STEP:
+                written[0] = percent
+                self._save(job)
+
+        try:
+            enroll(path, job.user_id, on_progress)
+            job.progress = 100.0
+            job.status = "done"
+        except Exception as e:
+            print(f"[ENROLL] Job {job.id} failed: {e!r}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+            self._save(job)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+enrollment_jobs = EnrollmentJobs()
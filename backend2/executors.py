@@ -0,0 +1,123 @@
+# executors.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from config import (
+    BACKGROUND_WORKERS,
+    LLM_MAX_QUEUE,
+    LLM_WORKERS,
+    MAX_SESSIONS,
+    STT_MAX_QUEUE,
+    STT_WORKERS,
+)
+
+ACCEPT = "accept"
+DEGRADE = "degrade"
+REJECT = "reject"
+
+
+class WorkloadPool:
+    """
+    A named thread pool for one class of blocking work, so a burst in one
+    class (say, LLM calls) cannot occupy the threads another class (STT)
+    needs. `max_queue` is the backlog beyond which callers should shed or
+    degrade work; the pool itself never refuses a submission.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-"
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        # Submitted but not yet picked up by a worker thread
+        return self.executor._work_queue.qsize()
+
+    @property
+    def overloaded(self) -> bool:
+        return self.max_queue is not None and self.queue_depth >= self.max_queue
+
+    def run(self, fn, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+        }
+
+
+# CPU-bound inference (Whisper) is sized to the cores; CTranslate2 drops
+# the GIL while decoding, so threads run in parallel without a process pool
+stt_pool = WorkloadPool("stt", STT_WORKERS, STT_MAX_QUEUE)
+# Memory retrieval ahead of each LLM call (embedding + Chroma query)
+llm_pool = WorkloadPool("llm", LLM_WORKERS, LLM_MAX_QUEUE)
+# Enrollment and other one-off jobs
+background_pool = WorkloadPool("background", BACKGROUND_WORKERS)
+
+pools = (stt_pool, llm_pool, background_pool)
+
+
+class AdmissionController:
+    """
+    Decides whether a new websocket session is accepted.
+
+    Sessions are rejected outright past `max_sessions`, or when the STT
+    backlog reaches `stt_hard`; between `stt_soft` and `stt_hard` they are
+    accepted in degraded mode (no streaming partial transcripts, the
+    heaviest optional STT load).
+    """
+
+    def __init__(
+        self,
+        stt_backlog: Callable[[], int],
+        max_sessions: int = MAX_SESSIONS,
+        stt_soft: int = STT_MAX_QUEUE,
+        stt_hard: int = 2 * STT_MAX_QUEUE,
+    ):
+        self.stt_backlog = stt_backlog
+        self.max_sessions = max_sessions
+        self.stt_soft = stt_soft
+        self.stt_hard = stt_hard
+
+        self._lock = threading.Lock()
+        self.active = 0
+        self.accepted = 0
+        self.degraded = 0
+        self.rejected = 0
+
+    def admit(self) -> str:
+        """Returns ACCEPT, DEGRADE or REJECT; call `leave()` for every non-REJECT."""
+        backlog = self.stt_backlog()
+        with self._lock:
+            if self.active >= self.max_sessions or backlog >= self.stt_hard:
+                self.rejected += 1
+                return REJECT
+            self.active += 1
+            if backlog >= self.stt_soft:
+                self.degraded += 1
+                return DEGRADE
+            self.accepted += 1
+            return ACCEPT
+
+    def leave(self):
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "accepted": self.accepted,
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+            "stt_backlog": self.stt_backlog(),
+        }
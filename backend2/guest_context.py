@@ -0,0 +1,93 @@
+# guest_context.py
+
+import asyncio
+from collections import Counter, deque
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from config import GUEST_CONTEXT_SEC, GUEST_CONTEXT_UTTERANCES, SAMPLE_RATE
+
+
+class _Turn:
+    __slots__ = ("audio", "text", "seconds")
+
+    def __init__(self, audio: Optional[np.ndarray], text: Optional[str], seconds: float):
+        self.audio = audio
+        self.text = text
+        self.seconds = seconds
+
+
+class GuestContext:
+    """
+    Rolling window of recent guest (unregistered) speech for one session.
+
+    Guest speech only matters as context for coaching, so utterances can
+    be kept as raw audio and transcribed lazily by `resolve()` when a coach
+    prompt needs them. The window holds at most `max_utterances` turns and
+    `max_sec` seconds; the oldest are dropped first, transcribed or not.
+    `version` changes whenever a turn is added.
+    """
+
+    def __init__(
+        self,
+        max_sec: float = GUEST_CONTEXT_SEC,
+        max_utterances: int = GUEST_CONTEXT_UTTERANCES,
+    ):
+        self.max_sec = max_sec
+        self._turns: deque = deque(maxlen=max_utterances)
+        self._seconds = 0.0
+        self._lock = asyncio.Lock()
+        self.version = 0
+        self.counters: Counter = Counter()
+
+    def _add(self, turn: _Turn):
+        if len(self._turns) == self._turns.maxlen:
+            self._evict()
+        self._turns.append(turn)
+        self._seconds += turn.seconds
+        while self._seconds > self.max_sec and len(self._turns) > 1:
+            self._evict()
+        self.version += 1
+
+    def _evict(self):
+        turn = self._turns.popleft()
+        self._seconds -= turn.seconds
+        if turn.text is None:
+            self.counters["dropped_untranscribed"] += 1
+
+    def add_audio(self, audio: np.ndarray):
+        """Keep an utterance for deferred transcription."""
+        self._add(_Turn(audio, None, len(audio) / SAMPLE_RATE))
+        self.counters["deferred"] += 1
+
+    def add_text(self, text: str, seconds: float = 0.0):
+        self._add(_Turn(None, text, seconds))
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for t in self._turns if t.text is None)
+
+    def text(self) -> str:
+        return " ".join(t.text for t in self._turns if t.text)
+
+    async def resolve(
+        self, transcribe: Optional[Callable[[np.ndarray], Awaitable[str]]] = None
+    ) -> str:
+        """
+        Transcribe pending turns with `transcribe` (oldest first) and return
+        the context text. Without `transcribe` (e.g. STT is overloaded),
+        pending turns are left as they are.
+        """
+        if transcribe is not None:
+            async with self._lock:
+                for turn in list(self._turns):
+                    if turn.text is not None:
+                        continue
+                    turn.text = await transcribe(turn.audio)
+                    turn.audio = None
+                    self.counters["transcribed"] += 1
+        return self.text()
+
+    def stats(self) -> dict:
+        return {"turns": len(self._turns), "pending": self.pending, **self.counters}
@@ -0,0 +1,177 @@
+# hesitation.py
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from config import (
+    HESITATION_THRESHOLD_MS,
+    SPEECH_RATE_THRESHOLD_FAST,
+    SPEECH_RATE_THRESHOLD_SLOW,
+)
+
+Word = Tuple[str, float, float]  # (text, start_sec, end_sec), as from Whisper
+
+FILLERS = {"uh", "um", "umm", "uhm", "hmm", "mm", "ah", "er", "erm", "ha"}
+HEDGES = ["you know", "i mean", "i guess", "i think", "kind of", "sort of", "maybe", "like"]
+# Also ordinary words ("I like pizza", "you know the answer"): these only
+# count in filler position, set off by a comma or next to a filler
+POSITIONAL_HEDGES = {("like",), ("you", "know")}
+
+# "ummm", "uhhh", "hmmmm": only checked for tokens ending in a doubled letter
+_ELONGATED_RE = re.compile(r"u+h+|u+m+|h+m+|a+h+|e+r+m*")
+_PUNCT = ".,!?;:\"()-"
+
+# Hedge phrases keyed by first word, so each token costs one dict lookup
+_HEDGE_INDEX: Dict[str, List[Tuple[str, ...]]] = {}
+for _phrase in HEDGES:
+    _first, *_rest = _phrase.split()
+    _HEDGE_INDEX.setdefault(_first, []).append(tuple(_rest))
+
+
+def _is_filler(tok: str) -> bool:
+    return tok in FILLERS or (
+        len(tok) > 2 and tok[-1] == tok[-2] and _ELONGATED_RE.fullmatch(tok) is not None
+    )
+
+
+WEIGHTS = {
+    "filler": 1.0,
+    "repeat": 1.0,
+    "hedge": 0.5,
+    "long_pause": 1.0,
+    # Acoustic pauses are quiet runs of PAUSE_MIN_MS or more; utterances end
+    # before one can reach HESITATION_THRESHOLD_MS, so most are phrase breaks
+    "pause": 0.25,
+    "slow": 1.0,
+}
+MIN_RATE_WORDS = 4       # fewer timed words than this gives no reliable rate
+
+
+class HesitationReport(NamedTuple):
+    fillers: int
+    hedges: int
+    repeats: int
+    long_pauses: int
+    pauses: int          # acoustic pauses, only counted without word timestamps
+    words: int
+    wpm: Optional[float]
+    score: float
+
+    @property
+    def pace(self) -> Optional[str]:
+        if self.wpm is None:
+            return None
+        if self.wpm < SPEECH_RATE_THRESHOLD_SLOW:
+            return "slow"
+        if self.wpm > SPEECH_RATE_THRESHOLD_FAST:
+            return "fast"
+        return "normal"
+
+    def to_dict(self) -> dict:
+        return {
+            "fillers": self.fillers,
+            "hedges": self.hedges,
+            "repeats": self.repeats,
+            "long_pauses": self.long_pauses,
+            "pauses": self.pauses,
+            "wpm": None if self.wpm is None else round(self.wpm),
+            "pace": self.pace,
+            "score": round(self.score, 2),
+        }
+
+
+class HesitationAnalyzer:
+    """
+    Struggle score for one utterance.
+
+    The transcript is tokenized once and walked once: fillers and the
+    first word of each hedge phrase are set/dict lookups, repeated words
+    ("i i", "the the") a comparison with the previous token. "like" and
+    "you know" only count in filler position ("it was, like, um, far").
+    With Whisper word timestamps, gaps
+    of at least `pause_ms` count as long pauses and words-per-minute below
+    `slow_wpm` adds to the score. Without them, the acoustic pause count
+    from the frame loop is used instead, at the lower "pause" weight.
+    """
+
+    def __init__(
+        self,
+        pause_ms: float = HESITATION_THRESHOLD_MS,
+        slow_wpm: float = SPEECH_RATE_THRESHOLD_SLOW,
+        weights: Optional[dict] = None,
+    ):
+        self.pause_sec = pause_ms / 1000.0
+        self.slow_wpm = slow_wpm
+        self.weights = {**WEIGHTS, **(weights or {})}
+
+    def count(self, text: str) -> Tuple[int, int, int]:
+        raw = text.lower().split()
+        tokens = [t.strip(_PUNCT) for t in raw]
+        filler = [_is_filler(t) for t in tokens]
+        fillers = hedges = repeats = 0
+        prev = None
+        for i, tok in enumerate(tokens):
+            if filler[i]:
+                fillers += 1
+            elif tok == prev and tok:
+                repeats += 1
+            else:
+                for rest in _HEDGE_INDEX.get(tok, ()):
+                    end = i + 1 + len(rest)
+                    if tuple(tokens[i + 1:end]) != rest:
+                        continue
+                    if (tok, *rest) in POSITIONAL_HEDGES and not (
+                        (i > 0 and (raw[i - 1].endswith(",") or filler[i - 1]))
+                        or raw[end - 1].endswith(",")
+                        or (end < len(tokens) and filler[end])
+                    ):
+                        continue
+                    hedges += 1
+                    break
+            prev = tok
+        return fillers, hedges, repeats
+
+    def timing(self, words: Sequence[Word]) -> Tuple[int, Optional[float]]:
+        long_pauses = sum(
+            1
+            for (_, _, prev_end), (_, start, _) in zip(words, words[1:])
+            if start - prev_end >= self.pause_sec
+        )
+        wpm = None
+        if len(words) >= MIN_RATE_WORDS:
+            span = words[-1][2] - words[0][1]
+            if span > 0:
+                wpm = len(words) / span * 60.0
+        return long_pauses, wpm
+
+    def analyze(
+        self,
+        text: str,
+        words: Optional[Sequence[Word]] = None,
+        pauses: int = 0,
+    ) -> HesitationReport:
+        fillers, hedges, repeats = self.count(text)
+
+        if words:
+            long_pauses, wpm = self.timing(words)
+            pauses = 0
+        else:
+            long_pauses, wpm = 0, None
+
+        w = self.weights
+        score = (
+            w["filler"] * fillers
+            + w["hedge"] * hedges
+            + w["repeat"] * repeats
+            + w["long_pause"] * long_pauses
+            + w["pause"] * pauses
+        )
+        if wpm is not None and wpm < self.slow_wpm:
+            score += w["slow"]
+
+        return HesitationReport(
+            fillers, hedges, repeats, long_pauses, pauses, len(text.split()), wpm, score
+        )
+
+
+analyzer = HesitationAnalyzer()
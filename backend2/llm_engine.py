@@ -1,73 +1,107 @@
 # llm_engine.py
 
-from ollama import Client
-from collections import deque
-from config import SYSTEM_PROMPT, OLLAMA_MODEL, OLLAMA_URL
+import asyncio
+import time
+from config import DEFAULT_USER_ID, OLLAMA_MODEL, PROMPT_TOKEN_BUCKETS
+from executors import llm_pool
 from memory_engine import MemorySystem
+from memory_extractor import extractor
+from metrics import metrics
+from ollama_client import llm_client
+from prompt_builder import PromptBuilder, summary_messages
 
 
-MEMORY_EXTRACTION_PROMPT = """
-You are a personal memory extractor.
-
-Decide if the user's message contains a stable personal fact, event, or important information worth remembering.
-Examples:
-- "I work as a software engineer at Google" → STORE
-- "My name is Varun" → STORE
-- "I feel sick today" → STORE
-- "How are you?" → DO NOT STORE
-
-Reply with:
-STORE: <cleaned memory text>
-or
-IGNORE
-"""
+def _record_prompt_tokens(response: dict):
+    # Tokens Ollama actually evaluated; a reused prefix lowers this
+    if "prompt_eval_count" in response:
+        metrics.observe(
+            "prompt_tokens", response["prompt_eval_count"], {"source": "ollama"}, PROMPT_TOKEN_BUCKETS
+        )
 
 
 class EnglishTeacher:
-    def __init__(self):
-        self.client = Client(host=OLLAMA_URL)
-        self.memory = MemorySystem()
-        self.history = deque(maxlen=6)
-
-    def chat(self, user_text: str):
+    def __init__(self, user_id: str = DEFAULT_USER_ID, client=None):
+        self.client = client or llm_client
+        self.user_id = user_id
+        self.memory = MemorySystem(user_id)
+        self.prompt = PromptBuilder()
+        self._fold_task = None
+
+    def _build_messages(self, user_text: str):
         # 1️⃣ RETRIEVE RELEVANT MEMORIES (RAG)
         memories = self.memory.retrieve(user_text)
 
-        # 2️⃣ BUILD CONTEXT
-        memory_context = ""
-        if memories:
-            memory_context = "\nKNOWN FACTS ABOUT USER:\n" + "\n".join(
-                f"- {m}" for m in memories
+        # 2️⃣ BUILD CONTEXT within the token budget
+        prompt = self.prompt.build(user_text, memories)
+        metrics.observe("prompt_tokens", prompt.total, {"source": "estimate"}, PROMPT_TOKEN_BUCKETS)
+        return prompt.messages
+
+    async def _fold(self, turns):
+        try:
+            with metrics.span("llm_summary"):
+                response = await self.client.chat(
+                    OLLAMA_MODEL,
+                    summary_messages(self.prompt.summary, turns, self.prompt.summary_tokens),
+                )
+            summary = response["message"]["content"]
+        except Exception as e:
+            print(f"[LLM] Summary failed, keeping turns verbatim: {e!r}")
+            summary = None
+        self.prompt.finish_fold(summary)
+
+    def _finish_turn(self, user_text: str, ai_text: str, remember: bool):
+        self.record(user_text, ai_text)
+
+        # 4️⃣ MEMORY EXTRACTION (AI-DECIDED, batched in the background)
+        if remember:
+            extractor.submit(self.user_id, user_text, self.memory)
+
+    async def draft(self, user_text: str) -> str:
+        """A reply that is not recorded in history; the caller may discard it."""
+        messages = await llm_pool.run(self._build_messages, user_text)
+        with metrics.span("llm_draft"):
+            response = await self.client.chat(OLLAMA_MODEL, messages)
+        return response["message"]["content"]
+
+    def record(self, user_text: str, ai_text: str):
+        """Add a turn produced outside `chat` (e.g. a served draft) to history."""
+        self.prompt.add_turn(user_text, ai_text)
+
+        # Older turns are summarized off the reply path, not dropped
+        if self.prompt.fold_due():
+            self._fold_task = asyncio.get_running_loop().create_task(
+                self._fold(self.prompt.start_fold())
             )
 
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT + memory_context}
-        ]
-        messages.extend(self.history)
-        messages.append({"role": "user", "content": user_text})
+    async def chat(self, user_text: str, remember: bool = True):
+        # Retrieval embeds and queries Chroma, so it stays off the event loop
+        messages = await llm_pool.run(self._build_messages, user_text)
 
         # 3️⃣ GENERATE RESPONSE
-        response = self.client.chat(
-            model=OLLAMA_MODEL,
-            messages=messages,
-        )
+        with metrics.span("llm"):
+            response = await self.client.chat(OLLAMA_MODEL, messages)
+        _record_prompt_tokens(response)
 
         ai_text = response["message"]["content"]
-
-        self.history.append({"role": "user", "content": user_text})
-        self.history.append({"role": "assistant", "content": ai_text})
-
-        # 4️⃣ MEMORY EXTRACTION (AI-DECIDED)
-        mem_decision = self.client.chat(
-            model=OLLAMA_MODEL,
-            messages=[
-                {"role": "system", "content": MEMORY_EXTRACTION_PROMPT},
-                {"role": "user", "content": user_text}
-            ]
-        )["message"]["content"].strip()
-
-        if mem_decision.startswith("STORE:"):
-            memory_text = mem_decision.replace("STORE:", "").strip()
-            self.memory.store(memory_text)
-
+        self._finish_turn(user_text, ai_text, remember)
         return ai_text
+
+    async def chat_stream(self, user_text: str, remember: bool = True):
+        """
+        Like `chat`, but yields the reply in chunks as Ollama produces them.
+        History and memory are updated once the stream is exhausted.
+        """
+        messages = await llm_pool.run(self._build_messages, user_text)
+
+        parts = []
+        start = time.perf_counter()
+        async for delta in self.client.chat_stream(
+            OLLAMA_MODEL, messages, on_done=_record_prompt_tokens
+        ):
+            if not parts:
+                metrics.stage("llm_first_token", time.perf_counter() - start)
+            parts.append(delta)
+            yield delta
+        metrics.stage("llm", time.perf_counter() - start)
+
+        self._finish_turn(user_text, "".join(parts), remember)
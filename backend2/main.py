@@ -1,15 +1,12 @@
 # main.py 
 
 import asyncio
-import io
-import os
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from time import perf_counter
 from fastapi import WebSocketDisconnect
-import webrtcvad
 
 
 import numpy as np
-import soundfile as sf
 from fastapi import (
     FastAPI,
     WebSocket,
@@ -19,27 +16,67 @@ from fastapi import (
     HTTPException,
 )
 from fastapi.middleware.cors import CORSMiddleware
-
-from enrollment import enroll_from_pcm
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from audio_buffer import PCMRingBuffer
+from executors import (
+    ACCEPT,
+    DEGRADE,
+    REJECT,
+    AdmissionController,
+    background_pool,
+    llm_pool,
+    pools,
+    stt_pool,
+)
+from metrics import metrics, monitor_event_loop
+from audio_input import AudioDecoder, parse_wire_format
+from audio_features import FrameFeatureExtractor, UtteranceStats
+from enrollment import adopt_legacy_user, enrollment_jobs, stage_upload
+from status_stream import StatusCoalescer
+from session_pipeline import UtterancePipeline
+from stt_scheduler import STTScheduler
+from vad_engine import SpeechGate, create_vad
 from eagle_engine import EagleRecognizer
-from transcription import RealtimeSTT
+from profile_store import profile_store
+from transcription import RealtimeSTT, StreamingTranscriber
 from llm_engine import EnglishTeacher
+from hesitation import analyzer as hesitation
+from coach_speculator import SpeculativeCoach, coach_prompt
+from guest_context import GuestContext
+from ollama_client import OllamaError, llm_client
+from model_pool import registry
+from memory_extractor import extractor
+from memory_engine import cache_stats as memory_cache_stats
 from config import (
-    PROFILE_PATH,
+    COACH_SPECULATIVE,
+    DEFAULT_USER_ID,
+    GUEST_STT_POLICY,
     VERIFY_THRESHOLD,
     GRACE_PERIOD_FRAMES,
     MIN_TRANSCRIPTION_LENGTH_SEC,
+    AUDIO_BUFFER_FRAMES,
+    LLM_STREAMING,
+    MODEL_PRELOAD,
+    OLLAMA_MODEL,
+    PRELOAD_MODELS,
+    SAMPLE_RATE,
+    STREAMING_STT,
+    STREAMING_INTERVAL_MS,
+    STRUGGLE_THRESHOLD,
+    STT_MAX_QUEUE,
 )
 import re
 
-SAMPLE_RATE = 16000
-VAD_FRAME_MS = 30
-VAD_FRAME_SAMPLES = int(SAMPLE_RATE * VAD_FRAME_MS / 1000)
-
 app = FastAPI()
-executor = ThreadPoolExecutor(max_workers=4)
 
 stt_engine = RealtimeSTT()
+stt_scheduler = STTScheduler(stt_engine, stt_pool.executor)
+
+# Admission looks at everything queued for Whisper, batched or not
+admission = AdmissionController(
+    lambda: stt_pool.queue_depth + stt_scheduler.queue_depth
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,12 +86,215 @@ app.add_middleware(
 )
 
 
+def session_user(ws: WebSocket) -> str:
+    # Memory namespace for this session; enrollment uses the same name
+    return ws.query_params.get("user", "").strip() or DEFAULT_USER_ID
+
+
+def session_speakers(ws: WebSocket):
+    # Optional ?speakers=a,b subset to identify against; default everyone
+    raw = ws.query_params.get("speakers", "")
+    return [s.strip() for s in raw.split(",") if s.strip()] or None
+
+
+async def open_decoder(ws: WebSocket):
+    """Negotiate the client's audio format; closes the socket if unsupported."""
+    try:
+        decoder = AudioDecoder(parse_wire_format(ws.query_params))
+    except (ValueError, ImportError) as e:
+        await ws.send_json({"type": "error", "message": str(e)})
+        await ws.close(code=1003)
+        return None
+    await ws.send_json({"type": "format", **decoder.format.to_dict()})
+    return decoder
+
+
+def llm_busy() -> bool:
+    return llm_pool.overloaded or llm_client.overloaded(OLLAMA_MODEL)
+
+
+def stt_busy() -> bool:
+    return stt_pool.overloaded or stt_scheduler.queue_depth >= STT_MAX_QUEUE
+
+
+async def admit_session(ws: WebSocket):
+    """
+    Apply admission control; closes the socket when the server is full.
+    Returns ACCEPT or DEGRADE (the caller must `admission.leave()`), or None.
+    """
+    mode = admission.admit()
+    if mode == REJECT:
+        print("[WS] Rejected: server busy")
+        await ws.send_json({"type": "error", "message": "Server busy, try again shortly"})
+        await ws.close(code=1013)
+        return None
+    if mode == DEGRADE:
+        try:
+            await ws.send_json({"type": "degraded", "reason": "stt_backlog"})
+        except Exception:
+            admission.leave()
+            raise
+    return mode
+
+
+async def open_recognizer(ws: WebSocket, speaker_ids):
+    """Eagle recognizer for the session; closes the socket if no profile matches."""
+    try:
+        return EagleRecognizer(speaker_ids)
+    except FileNotFoundError:
+        print(f"[WS] No enrolled profile for {speaker_ids}")
+        await ws.send_json({"type": "error", "message": "No enrolled profile for the requested speakers"})
+        await ws.close(code=1008)
+        return None
+
+
+def iter_frame_features(buffer: PCMRingBuffer, features: FrameFeatureExtractor):
+    """
+    Drain every full frame from the ring, computing signal features for
+    each drained block in one vectorised call. Yields
+    (frame, rms, peak, clipped) per frame.
+    """
+    while True:
+        block = buffer.drain_frames()
+        if not len(block):
+            return
+        feats = features.compute(block)
+        rms = feats.rms.tolist()
+        peak = feats.peak.tolist()
+        clipped = feats.clipped.tolist()
+        for i, frame in enumerate(block):
+            yield frame, rms[i], peak[i], clipped[i]
+
+
+async def send_reply(
+    ws: WebSocket,
+    teacher: EnglishTeacher,
+    prompt: str,
+    kind: str,
+    remember: bool = True,
+) -> str:
+    """
+    Generate a teacher reply and send it to the client.
+
+    With LLM_STREAMING, chunks go out as `response_delta` messages as soon
+    as Ollama produces them, followed by one `response_done` carrying the
+    full text. Otherwise a single `<kind>` message is sent at the end.
+    If Ollama fails for good the client gets an `error` message instead.
+    """
+    try:
+        if not LLM_STREAMING:
+            text = await teacher.chat(prompt, remember)
+            await ws.send_json({"type": kind, "text": text})
+            return text
+
+        parts = []
+        async for delta in teacher.chat_stream(prompt, remember):
+            parts.append(delta)
+            await ws.send_json({"type": "response_delta", "kind": kind, "text": delta})
+    except OllamaError as e:
+        print(f"[LLM] {kind} failed: {e}")
+        await ws.send_json({"type": "error", "kind": kind, "message": "AI reply unavailable"})
+        return ""
+
+    text = "".join(parts)
+    await ws.send_json({"type": "response_done", "kind": kind, "text": text})
+    return text
+
+
 @app.get("/")
 def root():
     return {"status": "TalkBuddy Backend Running"}
 
 
-@app.post("/api/enroll-voice")
+@app.get("/api/models")
+def model_stats():
+    return registry.stats()
+
+
+@app.get("/api/ready")
+def readiness():
+    # With MODEL_PRELOAD="off" models load on first use, so there is nothing to wait for
+    ready = MODEL_PRELOAD == "off" or registry.ready(PRELOAD_MODELS)
+    return JSONResponse(
+        {"ready": ready, "preload": MODEL_PRELOAD, **registry.stats()},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/api/memory/stats")
+def memory_stats():
+    return {"extraction": extractor.stats(), **memory_cache_stats()}
+
+
+for _pool in pools:
+    metrics.gauge_callback(
+        "executor_queue_depth",
+        lambda pool=_pool: pool.queue_depth,
+        labels={"pool": _pool.name},
+    )
+metrics.gauge_callback("admitted_sessions", lambda: admission.active)
+metrics.gauge_callback("llm_waiting", lambda: llm_client.backlog(OLLAMA_MODEL))
+metrics.gauge_callback("stt_queue_depth", lambda: stt_scheduler.queue_depth)
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    app.state.loop_monitor = asyncio.create_task(monitor_event_loop(metrics))
+
+
+@app.on_event("startup")
+async def open_llm_client():
+    # Bind the shared Ollama pool to the server loop; extraction threads use it too
+    await llm_client.open()
+
+
+@app.on_event("startup")
+async def warm_models():
+    if MODEL_PRELOAD == "startup":
+        await asyncio.to_thread(registry.warm_up, PRELOAD_MODELS)
+    elif MODEL_PRELOAD == "background":
+        # Serve right away; a session that needs a model first waits on its load lock
+        threading.Thread(
+            target=registry.warm_up, args=(PRELOAD_MODELS,), name="model-warmup", daemon=True
+        ).start()
+
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await llm_client.aclose()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+async def preload_profiles():
+    # Parse profiles once so websocket connects do no file I/O
+    await background_pool.run(profile_store.load)
+
+
+@app.get("/api/speakers")
+def speakers():
+    return {"speakers": profile_store.users()}
+
+
+@app.get("/api/stt/stats")
+def stt_stats():
+    return stt_scheduler.stats()
+
+
+@app.get("/api/load")
+def load_stats():
+    return {
+        "admission": admission.stats(),
+        "pools": {pool.name: pool.stats() for pool in pools},
+        "llm": llm_client.stats(),
+    }
+
+
+@app.post("/api/enroll-voice", status_code=202)
 async def enroll_voice(
     name: str = Form(...),
     audio: UploadFile = File(...),
@@ -64,19 +304,29 @@ async def enroll_voice(
     if not audio.filename.lower().endswith(".wav"): # type: ignore
         raise HTTPException(400, "WAV required")
 
-    pcm, sr = sf.read(io.BytesIO(await audio.read()), dtype="int16")
+    try:
+        path = await background_pool.run(stage_upload, audio.file)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except RuntimeError:
+        raise HTTPException(400, "Unreadable WAV")
+
+    user_id = name.strip() or DEFAULT_USER_ID
 
-    if sr != SAMPLE_RATE:
-        raise HTTPException(400, "16kHz audio required")
+    # Profiling runs in the background; clients poll the job for progress
+    job = enrollment_jobs.create(user_id)
+    background_pool.run(enrollment_jobs.run, job, path)
 
-    if pcm.ndim > 1:
-        pcm = pcm[:, 0]
+    print(f"[ENROLL] Job {job.id} queued for {user_id}")
+    return {"success": True, **job.to_dict()}
 
-    loop = asyncio.get_running_loop()
-    await loop.run_in_executor(executor, enroll_from_pcm, pcm)
 
-    print("[ENROLL] Completed successfully")
-    return {"success": True}
+@app.get("/api/enroll-voice/{job_id}")
+def enroll_status(job_id: str):
+    job = enrollment_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown enrollment job")
+    return job.to_dict()
 
 
 @app.websocket("/ws/talk")
@@ -84,19 +334,65 @@ async def ws_talk(ws: WebSocket):
     await ws.accept()
     print("[WS] Connected")
 
-    if not os.path.exists(PROFILE_PATH):
-        await ws.close()
+    # Verification is against this user's own profile only; never fall
+    # back to everyone enrolled, or any of them would pass as this user
+    user_id = session_user(ws)
+    if not profile_store.has(user_id):
+        # Installs from before per-user profiles: the one enrolled voice is this user
+        await background_pool.run(adopt_legacy_user, user_id)
+    if not profile_store.has(user_id):
+        print(f"[WS] No enrolled profile for user {user_id!r}")
+        await ws.send_json({"type": "error", "message": f"No enrolled profile for user {user_id!r}"})
+        await ws.close(code=1008)
         return
 
-    recognizer = EagleRecognizer()
-    teacher = EnglishTeacher()
+    decoder = await open_decoder(ws)
+    if decoder is None:
+        return
+
+    recognizer = await open_recognizer(ws, [user_id])
+    if recognizer is None:
+        return
+    teacher = EnglishTeacher(user_id)
 
-    buffer = np.zeros(0, dtype=np.int16)
+    buffer = PCMRingBuffer(recognizer.frame_length, AUDIO_BUFFER_FRAMES)
+    status = StatusCoalescer(field="status")
+    gate = SpeechGate(create_vad(), recognizer.frame_length)
+    onset = []  # the gate's pre-roll, then speech Eagle has not verified yet
     speech_frames = []
 
     is_recording = False
     grace = 0
 
+    async def handle_utterance(audio: np.ndarray):
+        # ----------------------------------
+        # 5️⃣ STT
+        # ----------------------------------
+        user_text = await stt_scheduler.transcribe(audio)
+
+        if not user_text:
+            return
+        print(f"\n[STT] USER: {user_text}")
+        await ws.send_json({
+            "type": "transcription",
+            "text": user_text,
+        })
+
+        # ----------------------------------
+        # 6️⃣ AI RESPONSE
+        # ----------------------------------
+        ai_text = await send_reply(ws, teacher, user_text, kind="response")
+        print(f"\n[AI] ASSISTANT: {ai_text}")
+
+    # Admit last: from here on the finally below releases the slot
+    if await admit_session(ws) is None:
+        recognizer.delete()
+        return
+
+    # STT/LLM run on their own task so the frame loop never waits on them
+    pipeline = UtterancePipeline(handle_utterance, name="talk").start()
+    metrics.inc("active_sessions", labels={"endpoint": "talk"})
+
     try:
         while True:
             try:
@@ -124,38 +420,56 @@ async def ws_talk(ws: WebSocket):
             if not data:
                 continue
 
-            pcm_f32 = np.frombuffer(data, dtype=np.float32)
-            pcm_i16 = (pcm_f32 * 32767).astype(np.int16)
-            buffer = np.concatenate([buffer, pcm_i16])
+            with metrics.span("decode"):
+                decoder.feed(data, buffer)
 
             # ----------------------------------
             # 3️⃣ FRAME LOOP
             # ----------------------------------
-            while len(buffer) >= recognizer.frame_length:
-                frame = buffer[:recognizer.frame_length]
-                buffer = buffer[recognizer.frame_length:]
-
-                verified, score = recognizer.process_frame(frame)
+            for frame in buffer.frames():
+
+                # Non-speech frames never reach Eagle
+                t0 = perf_counter()
+                speech, preroll = gate.process(frame)
+                t1 = perf_counter()
+                metrics.stage("endpointing", t1 - t0)
+                if speech:
+                    verified, score = recognizer.process_frame(frame)
+                    metrics.stage("eagle", perf_counter() - t1)
+                else:
+                    verified, score = False, 0.0
 
                 # 🔹 Send verification status (frontend shield UI)
-                await ws.send_json({
-                    "type": "status",
-                    "status": "VERIFIED" if verified else "NOT VERIFIED",
-                    "confidence": round(float(score), 3),
-                })
+                payload = status.update(
+                    "VERIFIED" if verified else "NOT VERIFIED", float(score)
+                )
+                if payload:
+                    await ws.send_json(payload)
 
                 # ----------------------------------
                 # 4️⃣ RECORDING LOGIC
                 # ----------------------------------
+                # frame is a view into the ring buffer, so keep copies
                 if verified:
+                    if not is_recording:
+                        speech_frames.extend(onset)
+                        onset.clear()
                     is_recording = True
                     grace = GRACE_PERIOD_FRAMES
-                    speech_frames.append(frame)
+                    speech_frames.append(frame.copy())
 
                 elif is_recording and grace > 0:
-                    speech_frames.append(frame)
+                    speech_frames.append(frame.copy())
                     grace -= 1
 
+                elif not is_recording:
+                    # Keep the start of this speech segment until Eagle verifies it
+                    if speech:
+                        onset.extend(preroll)
+                        onset.append(frame.copy())
+                    else:
+                        onset.clear()
+
                 elif is_recording:
                     # 🔚 SPEECH END
                     is_recording = False
@@ -163,72 +477,52 @@ async def ws_talk(ws: WebSocket):
                     audio = np.concatenate(speech_frames)
                     speech_frames = []
 
-                    duration = len(audio) / 16000
+                    duration = len(audio) / SAMPLE_RATE
                     if duration < MIN_TRANSCRIPTION_LENGTH_SEC:
                         continue
 
-                    # ----------------------------------
-                    # 5️⃣ STT
-                    # ----------------------------------
-                    loop = asyncio.get_event_loop()
-                    user_text = await loop.run_in_executor(
-                        executor, stt_engine.transcribe, audio
-                    )
-
-                    if not user_text:
-                        continue
-                    print(f"\n[STT] USER: {user_text}")
-                    await ws.send_json({
-                        "type": "transcription",
-                        "text": user_text,
-                    })
-
-                    # ----------------------------------
-                    # 6️⃣ AI RESPONSE
-                    # ----------------------------------
-                    ai_text = await loop.run_in_executor(
-                        executor, teacher.chat, user_text
-                    )
-                    print(f"\n[AI] ASSISTANT: {ai_text}")
-
-                    await ws.send_json({
-                        "type": "response",
-                        "text": ai_text,
-                    })
+                    pipeline.submit(audio)
 
     except WebSocketDisconnect:
         print("[WS] Client closed connection")
     finally:
+        await pipeline.close()
         recognizer.delete()
+        admission.leave()
+        metrics.dec("active_sessions", labels={"endpoint": "talk"})
         print("[WS] Session ended")
 
 
 
-
-
-HESITATION_KEYWORDS = {
-    "uh", "um", "umm", "hmm", "ha", "ah",
-    "i", "i i", "i uh", "i um",
-    "i think", "maybe", "like", "you know", "uh"
-}
-
-STRUGGLE_THRESHOLD = 3
-
 @app.websocket("/ws/conversation")
 async def ws_conversation(ws: WebSocket):
     await ws.accept()
     print("[WS] Conversation Connected (Final Stable Guest STT)")
 
-    recognizer = EagleRecognizer()
-    stt_engine = RealtimeSTT()
-    teacher = EnglishTeacher()
+    if not profile_store.has():
+        await ws.close()
+        return
+
+    decoder = await open_decoder(ws)
+    if decoder is None:
+        return
+
+    recognizer = await open_recognizer(ws, session_speakers(ws))
+    if recognizer is None:
+        return
+    teacher = EnglishTeacher(session_user(ws))
 
-    buffer = np.zeros(0, dtype=np.int16)
+    buffer = PCMRingBuffer(recognizer.frame_length, AUDIO_BUFFER_FRAMES)
+    status = StatusCoalescer(field="speaker")
+    gate = SpeechGate(create_vad(), recognizer.frame_length)
+    features = FrameFeatureExtractor(recognizer.frame_length)
+    utterance = UtteranceStats(recognizer.frame_length)
     speech_frames = []
 
     is_recording = False
     silence_frames = 0
     max_confidence = 0.0
+    best_speaker = None  # enrolled speaker id at max_confidence
 
     # ---- tuned thresholds ----
     MAX_SILENCE_FRAMES = 18          # ~540 ms
@@ -238,11 +532,156 @@ async def ws_conversation(ws: WebSocket):
 
     last_coach_time = 0
     COACH_COOLDOWN_SEC = 8
+    # Guest speech is kept as coaching context; hints are drafted from partials
+    guests = GuestContext()
+
+    async def transcribe_guest(audio: np.ndarray) -> str:
+        text = await stt_scheduler.transcribe(audio, trusted=False)
+        if text:
+            print(f"[TRANSCRIPT] guest (deferred): {text}")
+            await ws.send_json({
+                "type": "transcription",
+                "speaker": "unregistered_user",
+                "speaker_id": None,
+                "text": text,
+                "deferred": True,
+            })
+        return text
+
+    async def guest_text() -> str:
+        # Deferred guest audio is only decoded now that a coach prompt needs it
+        return await guests.resolve(None if stt_busy() else transcribe_guest)
+
+    async def draft_hint(user_text: str) -> str:
+        return await teacher.draft(coach_prompt(user_text, await guest_text()))
+
+    speculator = SpeculativeCoach(draft_hint, guests)
+
+    # ---- streaming partials (registered speaker only) ----
+    streamer = None
+    partial_task = None
+    partial_frames = 0
+    partial_tasks = set()  # queued utterances still hold theirs
+    PARTIAL_EVERY_FRAMES = max(
+        1, int(STREAMING_INTERVAL_MS / 1000 * SAMPLE_RATE / recognizer.frame_length)
+    )
+
+    def cooling_down() -> bool:
+        return asyncio.get_running_loop().time() - last_coach_time <= COACH_COOLDOWN_SEC
+
+    def should_coach(text: str, words=None, pauses: int = 0) -> bool:
+        # Claims the cooldown slot when it says yes
+        nonlocal last_coach_time
+        if cooling_down():
+            return False
+
+        report = hesitation.analyze(text, words, pauses)
+        if report.score >= STRUGGLE_THRESHOLD:
+            print(f"[BEHAVIOR] Hesitation {report.to_dict()}")
+            last_coach_time = asyncio.get_running_loop().time()
+            return True
+        return False
+
+    async def coach(text: str):
+        start = perf_counter()
+
+        # A hint drafted from this utterance's partials goes out at once
+        hint = await speculator.take(text)
+        if hint:
+            teacher.record(coach_prompt(text, guests.text()), hint)
+            await ws.send_json({"type": "coach", "text": hint, "speculative": True})
+            metrics.stage("coach_speculative", perf_counter() - start)
+            print(f"[COACH] (speculative) {hint}")
+            return
+
+        if llm_busy():
+            # Coaching is optional; shed it rather than delay replies
+            print("[COACH] Skipped: LLM backlog")
+            return
+
+        print("[BEHAVIOR] Registered user struggling")
+
+        prompt = coach_prompt(text, await guest_text())
+        coach_text = await send_reply(ws, teacher, prompt, kind="coach", remember=False)
+        metrics.stage("coach", perf_counter() - start)
+
+        print(f"[COACH] {coach_text}")
+
+    async def handle_utterance(item):
+        kind = item[0]
+        if kind == "coach":
+            await coach(item[1])
+            return
+
+        _, audio, final_speaker, speaker_id, confidence, streamer, partial_task, feats = item
+
+        # -------- STT --------
+        trusted = final_speaker == "registered_user"
+
+        if streamer is not None and trusted:
+            # Partials already committed most of the text; decode the tail
+            if partial_task is not None:
+                await asyncio.gather(partial_task, return_exceptions=True)
+            text = await stt_pool.run(streamer.finalize, audio)
+        else:
+            text = await stt_scheduler.transcribe(audio, trusted)
+
+        if not text:
+            return
+
+        print(f"[TRANSCRIPT] {speaker_id or final_speaker} ({confidence:.2f}): {text}")
+
+        await ws.send_json({
+            "type": "transcription",
+            "speaker": final_speaker,
+            "speaker_id": speaker_id,
+            "confidence": round(confidence, 3),
+            "text": text,
+        })
+
+        if not trusted:
+            guests.add_text(text, len(audio) / SAMPLE_RATE)
+            return
+
+        # -------- AI COACH (REGISTERED ONLY) --------
+        words = streamer.committed_words if streamer is not None else None
+        if should_coach(text, words, feats["pause_count"]):
+            await coach(text)
+        else:
+            speculator.discard()
+
+    async def run_partial(
+        streamer: StreamingTranscriber, audio: np.ndarray, speaker_id: str
+    ):
+        text = await stt_pool.run(streamer.update, audio)
+        if not text:
+            return
+
+        await ws.send_json({
+            "type": "partial",
+            "speaker": "registered_user",
+            "speaker_id": speaker_id,
+            "text": text,
+            "committed": streamer.committed_text,
+        })
+
+        # Hesitation on committed words can trigger coaching mid-utterance
+        if should_coach(streamer.committed_text, streamer.committed_words):
+            pipeline.submit(("coach", streamer.committed_text))
+        elif COACH_SPECULATIVE and not cooling_down() and not llm_busy():
+            speculator.observe(streamer.committed_text, streamer.committed_words)
+
+    # Admit last: from here on the finally below releases the slot
+    mode = await admit_session(ws)
+    if mode is None:
+        recognizer.delete()
+        return
+    # Degraded sessions skip partial transcripts, the heaviest optional STT load
+    streaming = STREAMING_STT and mode == ACCEPT
 
-    def rms_ok(audio: np.ndarray) -> bool:
-        audio_f = audio.astype(np.float32) / 32768.0
-        rms = np.sqrt(np.mean(audio_f ** 2))
-        return rms >= MIN_GUEST_RMS
+    # STT/LLM run on their own task so the frame loop never waits on them
+    pipeline = UtterancePipeline(handle_utterance, name="conversation").start()
+    metrics.inc("active_sessions", labels={"endpoint": "conversation"})
 
     try:
         while True:
@@ -252,41 +691,64 @@ async def ws_conversation(ws: WebSocket):
             if "text" in msg:
                 continue
 
-            pcm_f32 = np.frombuffer(msg["bytes"], dtype=np.float32)
-            pcm_i16 = (pcm_f32 * 32767).astype(np.int16)
-            buffer = np.concatenate([buffer, pcm_i16])
+            with metrics.span("decode"):
+                decoder.feed(msg["bytes"], buffer)
+
+            for frame, rms, peak, clipped in iter_frame_features(buffer, features):
 
-            while len(buffer) >= recognizer.frame_length:
-                frame = buffer[:recognizer.frame_length]
-                buffer = buffer[recognizer.frame_length:]
+                # ----- speech detection (VAD) -----
+                t0 = perf_counter()
+                is_speech, preroll = gate.process(frame, rms)
+                t1 = perf_counter()
+                metrics.stage("endpointing", t1 - t0)
 
-                _, score = recognizer.process_frame(frame)
-                confidence = float(score)
-                max_confidence = max(max_confidence, confidence)
+                # Non-speech frames skip Eagle scoring entirely
+                if is_speech:
+                    speaker_id, score = recognizer.identify(frame)
+                    metrics.stage("eagle", perf_counter() - t1)
+                    confidence = float(score)
+                    if confidence > max_confidence:
+                        max_confidence, best_speaker = confidence, speaker_id
+                else:
+                    speaker_id, confidence = None, 0.0
 
                 current_speaker = (
-                    "registered_user"
-                    if confidence >= VERIFY_THRESHOLD
-                    else "unregistered_user"
+                    "registered_user" if speaker_id else "unregistered_user"
                 )
 
-                await ws.send_json({
-                    "type": "status",
-                    "speaker": current_speaker,
-                    "confidence": round(confidence, 3),
-                })
-
-                # ----- speech detection (energy only) -----
-                rms = np.sqrt(np.mean(frame.astype(np.float32) ** 2)) / 32768.0
-                is_speech = rms > 0.006
+                payload = status.update(current_speaker, confidence, speaker_id)
+                if payload:
+                    await ws.send_json(payload)
 
+                # frame is a view into the ring buffer, so keep copies
                 if is_speech:
                     silence_frames = 0
+                    if not is_recording:
+                        speech_frames.extend(preroll)
                     is_recording = True
-                    speech_frames.append(frame)
+                    speech_frames.append(frame.copy())
+                    utterance.add(rms, peak, clipped)
                 elif is_recording:
                     silence_frames += 1
-                    speech_frames.append(frame)
+                    speech_frames.append(frame.copy())
+                    utterance.add(rms, peak, clipped)
+
+                # ----- streaming partial transcript -----
+                if (
+                    streaming
+                    and is_recording
+                    and max_confidence >= VERIFY_THRESHOLD
+                    and len(speech_frames) - partial_frames >= PARTIAL_EVERY_FRAMES
+                    and (partial_task is None or partial_task.done())
+                ):
+                    if streamer is None:
+                        streamer = StreamingTranscriber(stt_engine)
+                    partial_frames = len(speech_frames)
+                    partial_task = asyncio.create_task(
+                        run_partial(streamer, np.concatenate(speech_frames), best_speaker)
+                    )
+                    partial_tasks.add(partial_task)
+                    partial_task.add_done_callback(partial_tasks.discard)
 
                 # ----- end of utterance -----
                 if is_recording and silence_frames >= MAX_SILENCE_FRAMES:
@@ -296,6 +758,14 @@ async def ws_conversation(ws: WebSocket):
                     audio = np.concatenate(speech_frames)
                     speech_frames = []
 
+                    utterance_streamer, utterance_partial = streamer, partial_task
+                    streamer, partial_task, partial_frames = None, None, 0
+
+                    # O(1) gate from running aggregates, no rescan of audio
+                    utterance_rms = utterance.rms
+                    utterance_features = utterance.snapshot()
+                    utterance.reset()
+
                     duration = len(audio) / SAMPLE_RATE
                     final_speaker = (
                         "registered_user"
@@ -304,75 +774,52 @@ async def ws_conversation(ws: WebSocket):
                     )
 
                     # -------- HARD GATES --------
+                    dropped = False
                     if final_speaker == "unregistered_user":
                         if duration < MIN_GUEST_DURATION:
-                            max_confidence = 0.0
-                            continue
-                        if not rms_ok(audio):
+                            dropped = True
+                        elif utterance_rms < MIN_GUEST_RMS:
                             print("[NOISE] Dropped guest noise")
-                            max_confidence = 0.0
-                            continue
-                    else:
-                        if duration < MIN_REG_DURATION:
-                            max_confidence = 0.0
-                            continue
-
-                    # -------- STT --------
-                    trusted = final_speaker == "registered_user"
-                    loop = asyncio.get_running_loop()
-
-                    text = await loop.run_in_executor(
-                        executor,
-                        stt_engine.transcribe,
-                        audio,
-                        trusted
-                    )
-
-                    if not text:
-                        max_confidence = 0.0
+                            dropped = True
+                        elif GUEST_STT_POLICY != "eager" or stt_busy():
+                            # Context only: decoded later if coaching needs it
+                            if GUEST_STT_POLICY != "off":
+                                guests.add_audio(audio)
+                            dropped = True
+                    elif duration < MIN_REG_DURATION:
+                        dropped = True
+
+                    if dropped:
+                        # Its partial must not send text or coach for audio that is gone
+                        if utterance_partial is not None:
+                            utterance_partial.cancel()
+                            speculator.discard()
+                        max_confidence, best_speaker = 0.0, None
                         continue
 
-                    print(f"[TRANSCRIPT] {final_speaker} ({max_confidence:.2f}): {text}")
-
-                    await ws.send_json({
-                        "type": "transcription",
-                        "speaker": final_speaker,
-                        "confidence": round(max_confidence, 3),
-                        "text": text,
-                    })
-
-                    # -------- AI COACH (REGISTERED ONLY) --------
-                    if final_speaker == "registered_user":
-                        norm = text.lower()
-                        struggle_count = sum(norm.count(k) for k in HESITATION_KEYWORDS)
-
-                        now = asyncio.get_event_loop().time()
-                        if (
-                            struggle_count >= STRUGGLE_THRESHOLD
-                            and now - last_coach_time > COACH_COOLDOWN_SEC
-                        ):
-                            print("[BEHAVIOR] Registered user struggling")
-
-                            coach_text = await loop.run_in_executor(
-                                executor,
-                                teacher.chat,
-                                f"User is struggling. Suggest one confident sentence.\nUser said: {text}"
-                            )
-
-                            print(f"[COACH] {coach_text}")
-
-                            await ws.send_json({
-                                "type": "coach",
-                                "text": coach_text,
-                            })
-
-                            last_coach_time = now
-
-                    max_confidence = 0.0
+                    pipeline.submit((
+                        "utterance",
+                        audio,
+                        final_speaker,
+                        best_speaker,
+                        max_confidence,
+                        utterance_streamer,
+                        utterance_partial,
+                        utterance_features,
+                    ))
+                    max_confidence, best_speaker = 0.0, None
 
     except WebSocketDisconnect:
         print("[WS] Conversation closed")
     finally:
+        pending = list(partial_tasks)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        speculator.discard()
+        await pipeline.close()
         recognizer.delete()
+        admission.leave()
+        metrics.dec("active_sessions", labels={"endpoint": "conversation"})
         print("[WS] Conversation session ended")
 
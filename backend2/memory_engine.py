@@ -1,56 +1,368 @@
 # memory_engine.py
 
-import chromadb
+import re
+import threading
 import uuid
+import zlib
 import datetime
-from chromadb.utils import embedding_functions
-from config import DATA_DIR, MAX_MEMORY_ITEMS
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from config import (
+    DEFAULT_USER_ID,
+    EMBEDDING_CACHE_SIZE,
+    MAX_MEMORY_ITEMS,
+    MEMORY_DEDUP_SIMILARITY,
+    MEMORY_EVICTION_POLICY,
+    MEMORY_WRITE_BATCH,
+    RETRIEVAL_CACHE_SIZE,
+)
+from metrics import metrics
+from model_pool import get_chroma_client, get_embedding_fn
+
+COLLECTION_NAME = "human_memory"  # the pre-namespace collection, kept for DEFAULT_USER_ID
+
+_PUNCT_RE = re.compile(r"[^\w\s']")
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(_PUNCT_RE.sub(" ", text.lower()).split())
+
+
+class LRUCache:
+    """Small thread-safe LRU with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# Process-wide: the embedding model is shared, so are its query vectors.
+# Retrieval results are keyed by a per-collection version that every
+# mutation bumps, so stale results can never be served.
+_embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+_retrieval_cache = LRUCache(RETRIEVAL_CACHE_SIZE)
+_versions: dict = {}
+_versions_lock = threading.Lock()
+
+
+def _bump_version(collection_name: str):
+    with _versions_lock:
+        _versions[collection_name] = _versions.get(collection_name, 0) + 1
+
+
+def _cosine(a, b) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / denom if denom else 0.0
+
+
+def collection_name_for(user_id: str) -> str:
+    """Chroma-safe, collision-free collection name for a speaker."""
+    if user_id == DEFAULT_USER_ID:
+        return COLLECTION_NAME
+    slug = re.sub(r"[^a-z0-9]+", "_", user_id.lower()).strip("_")[:40]
+    return f"mem_{slug or 'user'}_{zlib.crc32(user_id.encode()):08x}"
+
+
+class _Namespace:
+    """Shared per-collection state: the handle, pending writes and eviction index."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.collection = None
+        self.pending: List[str] = []
+        self.lock = threading.RLock()
+        # id -> None, in eviction order (front is evicted first)
+        self.index: Optional[OrderedDict] = None
+
+
+# One namespace per speaker, opened on first use and kept for the process
+_namespaces: dict = {}
+_namespaces_lock = threading.Lock()
+
+
+def _namespace(user_id: str) -> _Namespace:
+    with _namespaces_lock:
+        ns = _namespaces.get(user_id)
+        if ns is None:
+            ns = _namespaces[user_id] = _Namespace(collection_name_for(user_id))
+        return ns
+
+
+def adopt_memories(from_user: str, to_user: str) -> bool:
+    """
+    Rename `from_user`'s collection to `to_user`'s. Does nothing (False)
+    if there is no source collection or the target already exists.
+    """
+    client = get_chroma_client()
+    source, target = collection_name_for(from_user), collection_name_for(to_user)
+    # Chroma < 0.6 lists names, later versions Collection objects
+    names = {getattr(c, "name", c) for c in client.list_collections()}
+    if source not in names or target in names:
+        return False
+
+    client.get_collection(source).modify(name=target)
+    with _namespaces_lock:
+        _namespaces.pop(from_user, None)
+        _namespaces.pop(to_user, None)
+    _bump_version(source)
+    _bump_version(target)
+    return True
+
+
+def cache_stats() -> dict:
+    with _namespaces_lock:
+        opened = sum(1 for ns in _namespaces.values() if ns.collection is not None)
+    return {
+        "embedding_cache": _embedding_cache.stats(),
+        "retrieval_cache": _retrieval_cache.stats(),
+        "open_collections": opened,
+    }
 
 
 class MemorySystem:
-    def __init__(self, reset=False):
-        self.client = chromadb.PersistentClient(path=f"{DATA_DIR}/memory_db")
+    """
+    Long-term memory for one speaker.
 
-        self.embed_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
+    Each user id maps to its own collection, so retrieval only ever
+    searches that speaker's vectors. Collection handles and eviction
+    state are shared by every MemorySystem for the same user and the
+    collection is only opened on first access.
 
-        self.collection = self.client.get_or_create_collection(
-            name="human_memory",
-            embedding_function=self.embed_fn # type: ignore
-        )
+    Writes are buffered and added in one embedded `collection.add` call per
+    `flush()`; near-duplicates of existing (or just-buffered) facts are
+    merged into the existing entry instead of being stored again. Eviction
+    order lives in a local index loaded once from metadata, so a full
+    collection never has to be scanned to make room.
+    """
+
+    def __init__(
+        self,
+        user_id: str = DEFAULT_USER_ID,
+        reset=False,
+        write_batch: int = MEMORY_WRITE_BATCH,
+        policy: str = MEMORY_EVICTION_POLICY,
+        max_items: int = MAX_MEMORY_ITEMS,
+    ):
+        if policy not in ("lru", "oldest"):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.user_id = user_id
+        self.write_batch = max(1, write_batch)
+        self.policy = policy
+        self.max_items = max_items
+        self._ns = _namespace(user_id)
+        self.collection_name = self._ns.name
 
         if reset:
             self.reset()
 
+    @property
+    def client(self):
+        # Client and embedding model are shared; only the collection handle
+        # is per user. Resolved on use, so constructing a MemorySystem on the
+        # event loop never imports chromadb or waits on a model load
+        return get_chroma_client()
+
+    @property
+    def embed_fn(self):
+        # Resolved on use, so a bare reset() never loads the model
+        return get_embedding_fn()
+
+    @property
+    def collection(self):
+        ns = self._ns
+        if ns.collection is None:
+            with ns.lock:
+                if ns.collection is None:
+                    ns.collection = self.client.get_or_create_collection(
+                        name=ns.name,
+                        embedding_function=self.embed_fn # type: ignore
+                    )
+        return ns.collection
+
     def reset(self):
-        self.client.delete_collection("human_memory")
-        self.collection = self.client.get_or_create_collection(
-            name="human_memory",
-            embedding_function=self.embed_fn # type: ignore
-        )
+        ns = self._ns
+        with ns.lock:
+            try:
+                self.client.delete_collection(ns.name)
+            except Exception:
+                pass  # never created
+            ns.collection = None
+            ns.pending.clear()
+            ns.index = OrderedDict()
+            _bump_version(ns.name)
+
+    # ---------------- eviction index ----------------
+
+    def _ensure_index(self) -> OrderedDict:
+        ns = self._ns
+        if ns.index is None:
+            # One metadata-only read per process; oldest first
+            existing = self.collection.get(include=["metadatas"])
+            rows = sorted(
+                zip(existing["ids"], existing["metadatas"] or []),
+                key=lambda r: (r[1] or {}).get("timestamp", ""),
+            )
+            ns.index = OrderedDict((i, None) for i, _ in rows)
+        return ns.index
+
+    def _touch(self, ids):
+        ns = self._ns
+        if self.policy != "lru" or ns.index is None:
+            return
+        with ns.lock:
+            for i in ids:
+                if i in ns.index:
+                    ns.index.move_to_end(i)
+
+    # ---------------- writes ----------------
 
     def store(self, text: str):
         if not text or len(text) > 500:
             return
 
-        if self.collection.count() >= MAX_MEMORY_ITEMS:
-            ids = self.collection.get()["ids"][:10]
-            self.collection.delete(ids=ids)
-
-        self.collection.add(
-            documents=[text],
-            ids=[str(uuid.uuid4())],
-            metadatas=[{
-                "timestamp": datetime.datetime.now().isoformat(),
-                "confidence": 1
-            }]
-        )
+        ns = self._ns
+        with ns.lock:
+            ns.pending.append(text)
+            if len(ns.pending) >= self.write_batch:
+                self.flush()
+
+    def flush(self):
+        ns = self._ns
+        with ns.lock:
+            texts, ns.pending = ns.pending, []
+            if texts:
+                with metrics.span("memory_write"):
+                    self._write(texts)
+
+    def _write(self, texts: List[str]):
+        index = self._ensure_index()
+        now = datetime.datetime.now().isoformat()
+        embeddings = self.embed_fn(texts) # type: ignore
+
+        # Nearest existing neighbour for every new fact, in one query
+        neighbours = None
+        if index:
+            neighbours = self.collection.query(
+                query_embeddings=[list(map(float, e)) for e in embeddings],
+                n_results=1,
+                include=["embeddings", "metadatas"],
+            )
+
+        new_docs, new_embs = [], []
+        merged = {}
+        for i, (text, emb) in enumerate(zip(texts, embeddings)):
+            if neighbours and neighbours["ids"][i]:
+                nid = neighbours["ids"][i][0]
+                if _cosine(emb, neighbours["embeddings"][i][0]) >= MEMORY_DEDUP_SIMILARITY:
+                    meta = merged.get(nid) or dict(neighbours["metadatas"][i][0] or {})
+                    meta["confidence"] = int(meta.get("confidence", 1)) + 1
+                    meta["timestamp"] = now
+                    merged[nid] = meta
+                    continue
+
+            if any(_cosine(emb, e) >= MEMORY_DEDUP_SIMILARITY for e in new_embs):
+                continue
+            new_docs.append(text)
+            new_embs.append(emb)
+
+        if merged:
+            self.collection.update(ids=list(merged), metadatas=list(merged.values()))
+            for nid in merged:
+                if nid in index:
+                    index.move_to_end(nid)
+
+        if new_docs:
+            overflow = len(index) + len(new_docs) - self.max_items
+            if overflow > 0:
+                evict = [index.popitem(last=False)[0] for _ in range(min(overflow, len(index)))]
+                self.collection.delete(ids=evict)
+
+            ids = [str(uuid.uuid4()) for _ in new_docs]
+            self.collection.add(
+                documents=new_docs,
+                embeddings=[list(map(float, e)) for e in new_embs],
+                ids=ids,
+                metadatas=[{"timestamp": now, "confidence": 1} for _ in new_docs],
+            )
+            for i in ids:
+                index[i] = None
+
+        _bump_version(self.collection_name)
+
+    # ---------------- reads ----------------
+
+    def embed_query(self, norm: str):
+        embedding = _embedding_cache.get(norm)
+        if embedding is None:
+            embedding = self.embed_fn([norm])[0] # type: ignore
+            _embedding_cache.put(norm, embedding)
+        return embedding
 
     def retrieve(self, query: str, k: int = 5):
+        with metrics.span("memory_retrieve"):
+            return self._retrieve(query, k)
+
+    def _retrieve(self, query: str, k: int):
+        norm = normalize_query(query)
+        if not norm:
+            return []
+
+        if self._ns.pending:
+            self.flush()
+
+        key = (self.collection_name, _versions.get(self.collection_name, 0), norm, k)
+        cached = _retrieval_cache.get(key)
+        if cached is not None:
+            documents, ids = cached
+            self._touch(ids)
+            return list(documents)
+
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=[self.embed_query(norm)],
             n_results=k
         )
 
-        return results["documents"][0] if results["documents"] else []
+        documents = results["documents"][0] if results["documents"] else []
+        ids = results["ids"][0] if results["ids"] else []
+        self._touch(ids)
+        _retrieval_cache.put(key, (tuple(documents), tuple(ids)))
+        return documents
@@ -0,0 +1,209 @@
+# memory_extractor.py
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from config import (
+    MEMORY_BATCH_SIZE,
+    MEMORY_BATCH_WINDOW_SEC,
+    MEMORY_MIN_WORDS,
+    MEMORY_RECENT_DEDUP,
+    OLLAMA_MODEL,
+)
+from metrics import metrics
+
+
+MEMORY_EXTRACTION_PROMPT = """
+You are a personal memory extractor.
+
+You will receive one or more numbered messages from the same user.
+Decide which of them contain a stable personal fact, event, or important information worth remembering.
+Examples:
+- "I work as a software engineer at Google" → STORE
+- "My name is Varun" → STORE
+- "I feel sick today" → STORE
+- "How are you?" → DO NOT STORE
+
+Reply with one line per fact worth remembering:
+STORE: <cleaned memory text>
+or, if nothing is worth remembering, a single line:
+IGNORE
+"""
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_FIRST_PERSON = {"i", "i'm", "im", "i've", "i'd", "i'll", "me", "my", "mine", "myself", "we", "our", "us"}
+_QUESTION_STARTERS = {
+    "what", "how", "why", "when", "where", "who", "which",
+    "is", "are", "do", "does", "did", "can", "could", "would", "will", "should",
+}
+_STORE_RE = re.compile(r"^\s*(?:\d+[.)]\s*)?STORE:\s*(.+)$", re.IGNORECASE)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class MemoryExtractor:
+    """
+    Background memory extraction, off the reply path.
+
+    `submit()` runs cheap pre-filters and queues what survives per user. A
+    worker thread sends each user's queue as one batched extraction call
+    once it holds `batch_size` utterances or the oldest has waited
+    `batch_window` seconds, then stores the extracted facts.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        batch_size: int = MEMORY_BATCH_SIZE,
+        batch_window: float = MEMORY_BATCH_WINDOW_SEC,
+        min_words: int = MEMORY_MIN_WORDS,
+        recent: int = MEMORY_RECENT_DEDUP,
+    ):
+        self._client = client
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.min_words = min_words
+        self.recent = recent
+
+        self._pending: Dict[str, List[str]] = {}
+        self._since: Dict[str, float] = {}
+        self._targets: Dict[str, object] = {}
+        self._recent: Dict[str, deque] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.counters: Counter = Counter()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from ollama_client import BlockingOllama, llm_client
+            # Shares the server's connection pool and per-model limits
+            self._client = BlockingOllama(llm_client)
+        return self._client
+
+    # ---------------- pre-filters ----------------
+
+    def _skip_reason(self, user_id: str, text: str) -> Optional[str]:
+        norm = _normalize(text)
+        words = norm.split()
+
+        if len(words) < self.min_words:
+            return "short"
+        if text.rstrip().endswith("?") or words[0] in _QUESTION_STARTERS:
+            return "question"
+        if not _FIRST_PERSON.intersection(words):
+            return "impersonal"
+
+        recent = self._recent.setdefault(user_id, deque(maxlen=self.recent))
+        if norm in recent:
+            return "duplicate"
+        recent.append(norm)
+        return None
+
+    # ---------------- queueing ----------------
+
+    def submit(self, user_id: str, text: str, memory) -> bool:
+        """Queue `text` for extraction into `memory`; False if pre-filtered."""
+        with self._cond:
+            self.counters["submitted"] += 1
+            reason = self._skip_reason(user_id, text)
+            if reason:
+                self.counters[f"skipped_{reason}"] += 1
+                return False
+
+            queue = self._pending.setdefault(user_id, [])
+            if not queue:
+                self._since[user_id] = time.monotonic()
+            queue.append(text)
+            self._targets[user_id] = memory
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="memory-extractor", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+            return True
+
+    def _take_ready(self, force: bool = False):
+        now = time.monotonic()
+        ready = []
+        for user_id, texts in list(self._pending.items()):
+            if (
+                force
+                or len(texts) >= self.batch_size
+                or now - self._since[user_id] >= self.batch_window
+            ):
+                ready.append((user_id, texts, self._targets[user_id]))
+                del self._pending[user_id]
+        return ready
+
+    def _next_deadline(self) -> Optional[float]:
+        if not self._since or not self._pending:
+            return None
+        oldest = min(self._since[u] for u in self._pending)
+        return max(oldest + self.batch_window - time.monotonic(), 0.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+                while not ready:
+                    self._cond.wait(timeout=self._next_deadline())
+                    ready = self._take_ready()
+            for user_id, texts, memory in ready:
+                self._extract(user_id, texts, memory)
+
+    def flush(self):
+        """Process everything pending right now, on the calling thread."""
+        with self._cond:
+            ready = self._take_ready(force=True)
+        for user_id, texts, memory in ready:
+            self._extract(user_id, texts, memory)
+
+    # ---------------- extraction ----------------
+
+    def _extract(self, user_id: str, texts: List[str], memory):
+        with metrics.span("memory_extraction"):
+            self._extract_batch(user_id, texts, memory)
+
+    def _extract_batch(self, user_id: str, texts: List[str], memory):
+        numbered = "\n".join(f"{i}. {t}" for i, t in enumerate(texts, 1))
+        try:
+            decision = self.client.chat(
+                model=OLLAMA_MODEL,
+                messages=[
+                    {"role": "system", "content": MEMORY_EXTRACTION_PROMPT},
+                    {"role": "user", "content": numbered},
+                ],
+            )["message"]["content"]
+        except Exception as e:
+            print(f"[MEMORY] Extraction failed for {user_id}: {e!r}")
+            self.counters["llm_errors"] += 1
+            return
+
+        self.counters["llm_calls"] += 1
+        self.counters["batched_utterances"] += len(texts)
+
+        for line in decision.splitlines():
+            match = _STORE_RE.match(line)
+            if match:
+                memory.store(match.group(1).strip())
+                self.counters["stored"] += 1
+        memory.flush()
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = sum(len(t) for t in self._pending.values())
+            counters = dict(self.counters)
+        skipped = sum(v for k, v in counters.items() if k.startswith("skipped_"))
+        return {"pending": pending, "skipped": skipped, **counters}
+
+
+extractor = MemoryExtractor()
@@ -0,0 +1,188 @@
+# metrics.py
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from config import METRICS_BUCKETS, METRICS_PREFIX
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[dict]) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Histogram:
+    """Cumulative-bucket histogram (seconds by default), Prometheus style."""
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.bounds = sorted(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.bounds + [float("inf")], self.counts):
+            total += n
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    Process-wide timings and gauges, rendered as Prometheus text.
+
+    Stage timings go into one labelled histogram (`<prefix>_stage_seconds`)
+    so a slow hint can be traced to the stage that caused it. Gauges are
+    either set directly or read from a callback at scrape time.
+    """
+
+    def __init__(self, prefix: str = METRICS_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._callbacks: Dict[str, Dict[Labels, Callable[[], float]]] = {}
+
+    # ---------------- histograms ----------------
+
+    def observe(
+        self, name: str, value: float, labels: Optional[dict] = None, buckets=METRICS_BUCKETS
+    ):
+        """`buckets` only applies when the series is first created."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def stage(self, stage: str, seconds: float):
+        self.observe("stage_seconds", seconds, {"stage": stage})
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(stage, time.perf_counter() - start)
+
+    # ---------------- gauges ----------------
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def set(self, name: str, value: float, labels: Optional[dict] = None):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def inc(self, name: str, amount: float = 1.0, labels: Optional[dict] = None):
+        key = _labels(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def dec(self, name: str, amount: float = 1.0, labels: Optional[dict] = None):
+        self.inc(name, -amount, labels)
+
+    def gauge_callback(self, name: str, fn: Callable[[], float], labels: Optional[dict] = None):
+        with self._lock:
+            self._callbacks.setdefault(name, {})[_labels(labels)] = fn
+
+    # ---------------- export ----------------
+
+    def snapshot(self, name: str, labels: Optional[dict] = None) -> Optional[dict]:
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_labels(labels))
+            if hist is None:
+                return None
+            return {"count": hist.count, "sum": hist.sum}
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = {n: dict(s) for n, s in self._histograms.items()}
+            gauges = {n: dict(s) for n, s in self._gauges.items()}
+            callbacks = {n: dict(s) for n, s in self._callbacks.items()}
+
+        for name in sorted(histograms):
+            full = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} histogram")
+            for labels, hist in sorted(histograms[name].items()):
+                for bound, total in hist.cumulative():
+                    lines.append(
+                        f"{full}_bucket{_fmt_labels(labels, [('le', _fmt_value(bound))])} {total}"
+                    )
+                lines.append(f"{full}_sum{_fmt_labels(labels)} {_fmt_value(hist.sum)}")
+                lines.append(f"{full}_count{_fmt_labels(labels)} {hist.count}")
+
+        values: Dict[str, Dict[Labels, float]] = {}
+        for name, series in gauges.items():
+            values.setdefault(name, {}).update(series)
+        for name, series in callbacks.items():
+            for labels, fn in series.items():
+                try:
+                    values.setdefault(name, {})[labels] = float(fn())
+                except Exception:
+                    continue
+
+        for name in sorted(values):
+            full = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} gauge")
+            for labels, value in sorted(values[name].items()):
+                lines.append(f"{full}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop(registry: "MetricsRegistry", interval: float = 0.1):
+    """Samples how late the loop wakes up; runs until cancelled."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        registry.observe("event_loop_lag_seconds", lag)
+        registry.set("event_loop_lag_last_seconds", lag)
+
+
+metrics = MetricsRegistry()
+metrics.describe("stage_seconds", "Time spent in each pipeline stage")
+metrics.describe("event_loop_lag_seconds", "Event-loop wake-up delay")
+metrics.describe("active_sessions", "Open websocket sessions")
+metrics.describe("executor_queue_depth", "Work items waiting for an executor thread")
+metrics.describe("stt_queue_depth", "Utterances waiting in the STT batch scheduler")
+metrics.describe("llm_waiting", "Ollama requests waiting for a concurrency slot")
+metrics.describe("prompt_tokens", "Prompt tokens per LLM turn (estimated, and as counted by Ollama)")
@@ -0,0 +1,212 @@
+# model_pool.py
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config import (
+    DATA_DIR,
+    EMBEDDING_MODEL_NAME,
+    GUEST_WHISPER_MODEL_SIZE,
+    STT_CPU_THREADS,
+    STT_WORKERS,
+    WHISPER_COMPUTE,
+    WHISPER_DEVICE,
+    WHISPER_MODEL_SIZE,
+)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is a peak, in KiB on Linux; good enough as a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class ModelRegistry:
+    """
+    Process-wide home for heavy models.
+
+    Each model is loaded on first use, exactly once, behind its own lock so
+    one slow load does not block the others. Sessions take the shared
+    instance instead of constructing their own. `warm_up()` loads models
+    ahead of the first request and runs each one's warm-up call, so the
+    first real inference does not pay for lazy initialisation either.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._warmers: Dict[str, Callable[[Any], Any]] = {}
+        self._warm: Dict[str, bool] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._stats: Dict[str, dict] = {}
+        self._registry_lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        warmup: Optional[Callable[[Any], Any]] = None,
+    ):
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._warmers[name] = warmup
+            self._warm.pop(name, None)
+            self._locks.setdefault(name, threading.Lock())
+            self._models.pop(name, None)
+            self._stats[name] = {"loaded": False}
+
+    def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            print(f"[MODELS] Loading {name}")
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            load_time = time.perf_counter() - start
+            rss_delta = max(_rss_bytes() - rss_before, 0)
+
+            self._models[name] = model
+            self._stats[name] = {
+                "loaded": True,
+                "load_time_sec": round(load_time, 3),
+                "rss_delta_mb": round(rss_delta / (1024 * 1024), 1),
+            }
+            print(f"[MODELS] {name} ready in {load_time:.2f}s")
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: Iterable[str]):
+        """Load `names` and run their warm-up calls; failures are logged, not raised."""
+        for name in names:
+            if name not in self._loaders:
+                continue
+            try:
+                model = self.get(name)
+                warmup = self._warmers.get(name)
+                if warmup is not None and not self._warm.get(name):
+                    start = time.perf_counter()
+                    warmup(model)
+                    self._stats[name]["warmup_sec"] = round(time.perf_counter() - start, 3)
+                self._warm[name] = True
+            except Exception as e:
+                print(f"[MODELS] Warm-up of {name} failed: {e!r}")
+                self._stats[name]["error"] = repr(e)
+
+    def ready(self, names: Iterable[str]) -> bool:
+        return all(self._warm.get(name) for name in names if name in self._loaders)
+
+    def stats(self) -> dict:
+        return {
+            "models": {name: dict(s) for name, s in self._stats.items()},
+            "process_rss_mb": round(_rss_bytes() / (1024 * 1024), 1),
+        }
+
+
+def whisper_device() -> tuple:
+    """(device, compute_type), resolving "auto" without importing torch."""
+    device = WHISPER_DEVICE
+    if device == "auto":
+        try:
+            import ctranslate2
+
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        except ImportError:
+            device = "cpu"
+    compute = WHISPER_COMPUTE
+    if compute == "auto":
+        compute = "float16" if device == "cuda" else "int8"
+    return device, compute
+
+
+def _load_whisper(size: str = WHISPER_MODEL_SIZE):
+    from faster_whisper import WhisperModel
+
+    device, compute = whisper_device()
+    print(f"[MODELS] Whisper {size} on {device.upper()} ({compute})")
+
+    # One CTranslate2 replica per STT worker thread so decodes run in parallel
+    return WhisperModel(
+        size,
+        device=device,
+        compute_type=compute,
+        cpu_threads=STT_CPU_THREADS,
+        num_workers=STT_WORKERS,
+    )
+
+
+def _warm_whisper(model):
+    import numpy as np
+
+    # The first decode allocates CTranslate2 buffers; do it on silence
+    segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="en", beam_size=1)
+    list(segments)
+
+
+def _load_embedding():
+    from chromadb.utils import embedding_functions
+
+    return embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=EMBEDDING_MODEL_NAME
+    )
+
+
+def _warm_embedding(fn):
+    fn(["warm up"])
+
+
+def _load_chroma():
+    import chromadb
+
+    return chromadb.PersistentClient(path=f"{DATA_DIR}/memory_db")
+
+
+registry = ModelRegistry()
+registry.register("whisper", _load_whisper, _warm_whisper)
+registry.register("embedding", _load_embedding, _warm_embedding)
+registry.register("chroma", _load_chroma)
+if GUEST_WHISPER_MODEL_SIZE:
+    registry.register(
+        "whisper_guest", lambda: _load_whisper(GUEST_WHISPER_MODEL_SIZE), _warm_whisper
+    )
+
+
+def get_whisper():
+    return registry.get("whisper")
+
+
+def get_guest_whisper():
+    # Guests share the main model unless a smaller one is configured
+    if GUEST_WHISPER_MODEL_SIZE:
+        return registry.get("whisper_guest")
+    return get_whisper()
+
+
+def get_embedding_fn():
+    return registry.get("embedding")
+
+
+def get_chroma_client():
+    return registry.get("chroma")
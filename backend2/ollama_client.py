@@ -0,0 +1,302 @@
+# ollama_client.py
+
+import asyncio
+import json
+import random
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from config import (
+    LLM_CONNECT_TIMEOUT,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_QUEUE,
+    LLM_READ_TIMEOUT,
+    LLM_REQUEST_TIMEOUT,
+    LLM_RETRIES,
+    LLM_RETRY_BACKOFF,
+    OLLAMA_URL,
+)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class OllamaError(RuntimeError):
+    """The request failed for good (after retries, or with a non-retryable answer)."""
+
+
+class _Retryable(Exception):
+    pass
+
+
+class OllamaClient:
+    """
+    Async client for Ollama's `/api/chat` over one pooled set of HTTP
+    connections, shared by chat replies and memory extraction.
+
+    In-flight requests per model are bounded by `max_concurrency`;
+    connect errors, timeouts and 429/5xx answers are retried with
+    jittered exponential backoff (a stream only until its first chunk).
+    `read_timeout` bounds each wait for data; `request_timeout` is the
+    deadline for the whole reply, slot wait and retries included, so a
+    stream that keeps trickling tokens is still cut off.
+    Cancelling the awaiting task, e.g. when the websocket disconnects,
+    closes the HTTP request and frees its slot.
+
+    The connection pool and the concurrency slots belong to the event
+    loop that first uses it. Other loops are refused while that loop is
+    alive (a closed loop's state is dropped). Worker threads go through
+    `chat_blocking`.
+    """
+
+    def __init__(
+        self,
+        host: str = OLLAMA_URL,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        read_timeout: float = LLM_READ_TIMEOUT,
+        request_timeout: float = LLM_REQUEST_TIMEOUT,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        retries: int = LLM_RETRIES,
+        backoff: float = LLM_RETRY_BACKOFF,
+        max_queue: int = LLM_MAX_QUEUE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.host = host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.request_timeout = request_timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.transport = transport
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: Counter = Counter()
+        self.counters: Counter = Counter()
+
+    # ---------------- connection pool ----------------
+
+    def _new_http(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.host,
+            timeout=httpx.Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout,
+                pool=self.request_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            transport=self.transport,
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is not None and self._loop is loop:
+            return self._http
+        if self._loop is not None and not self._loop.is_closed():
+            # Connections and semaphores cannot move between event loops, and
+            # a second set of slots would double the per-model bound
+            raise RuntimeError("OllamaClient is bound to another event loop; use chat_blocking")
+        # First use, or the owning loop has been closed along with its sockets
+        self._http = self._new_http()
+        self._loop = loop
+        self._slots = {}
+        self._waiting.clear()
+        return self._http
+
+    async def open(self):
+        """Bind the pool to the running loop (the server's, at startup)."""
+        self._client()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+        self._http = None
+        self._loop = None
+
+    # ---------------- concurrency ----------------
+
+    @asynccontextmanager
+    async def _slot(self, model: str):
+        self._client()  # rebinds (and resets the slots) on a new loop
+        slot = self._slots.get(model)
+        if slot is None:
+            slot = self._slots[model] = asyncio.Semaphore(self.max_concurrency)
+        self._waiting[model] += 1
+        try:
+            await slot.acquire()
+        finally:
+            self._waiting[model] -= 1
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def backlog(self, model: str) -> int:
+        """Requests waiting for one of `model`'s concurrency slots."""
+        return self._waiting[model]
+
+    def overloaded(self, model: str) -> bool:
+        return self.backlog(model) >= self.max_queue
+
+    async def _backoff(self, attempt: int, error: Exception):
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        self.counters["retries"] += 1
+        print(f"[LLM] {str(error) or repr(error)}; retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _deadline(self) -> float:
+        return asyncio.get_running_loop().time() + self.request_timeout
+
+    def _remaining(self, deadline: float) -> float:
+        return max(0.0, deadline - asyncio.get_running_loop().time())
+
+    def _failed(self, reason) -> OllamaError:
+        self.counters["failures"] += 1
+        return OllamaError(f"Ollama request failed: {reason}")
+
+    # ---------------- requests ----------------
+
+    async def chat(self, model: str, messages: List[dict], **options) -> dict:
+        """One non-streamed reply, as Ollama returns it."""
+        payload = {"model": model, "messages": messages, "stream": False, **options}
+        timeout = httpx.Timeout(self.request_timeout, connect=self.connect_timeout)
+        deadline = self._deadline()
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._slot(model):
+                    response = await asyncio.wait_for(
+                        self._client().post("/api/chat", json=payload, timeout=timeout),
+                        self._remaining(deadline),
+                    )
+                if response.status_code in RETRY_STATUS:
+                    raise _Retryable(f"HTTP {response.status_code}")
+                if response.is_error:
+                    raise self._failed(f"HTTP {response.status_code}: {response.text}")
+                self.counters["requests"] += 1
+                return response.json()
+            except asyncio.TimeoutError as e:
+                raise self._failed(f"no reply within {self.request_timeout}s") from e
+            except (httpx.TransportError, _Retryable) as e:
+                if attempt == self.retries:
+                    raise self._failed(repr(e)) from e
+                await self._backoff(attempt, e)
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[dict],
+        on_done: Optional[Callable[[dict], None]] = None,
+        **options,
+    ) -> AsyncIterator[str]:
+        """
+        Yields reply text chunks as Ollama produces them. `on_done` gets the
+        final chunk, which carries Ollama's counters (`prompt_eval_count`...).
+        """
+        payload = {"model": model, "messages": messages, "stream": True, **options}
+        deadline = self._deadline()
+
+        for attempt in range(self.retries + 1):
+            started = False
+            try:
+                async with self._slot(model):
+                    client = self._client()
+                    request = client.build_request("POST", "/api/chat", json=payload)
+                    response = await asyncio.wait_for(
+                        client.send(request, stream=True), self._remaining(deadline)
+                    )
+                    try:
+                        if response.status_code in RETRY_STATUS:
+                            raise _Retryable(f"HTTP {response.status_code}")
+                        if response.is_error:
+                            await response.aread()
+                            raise self._failed(f"HTTP {response.status_code}: {response.text}")
+
+                        lines = response.aiter_lines()
+                        while True:
+                            try:
+                                line = await asyncio.wait_for(
+                                    lines.__anext__(), self._remaining(deadline)
+                                )
+                            except StopAsyncIteration:
+                                break
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            if "error" in chunk:
+                                raise self._failed(chunk["error"])
+                            delta = chunk.get("message", {}).get("content", "")
+                            if delta:
+                                started = True
+                                yield delta
+                            if chunk.get("done"):
+                                if on_done is not None:
+                                    on_done(chunk)
+                                break
+                    finally:
+                        await response.aclose()
+                self.counters["requests"] += 1
+                return
+            except asyncio.TimeoutError as e:
+                raise self._failed(f"reply not finished within {self.request_timeout}s") from e
+            except (httpx.TransportError, _Retryable) as e:
+                # Once text has reached the caller a retry would repeat it
+                if started or attempt == self.retries:
+                    raise self._failed(repr(e)) from e
+                await self._backoff(attempt, e)
+
+    def chat_blocking(self, model: str, messages: List[dict], **options) -> dict:
+        """
+        `chat` for worker threads: runs on the loop that owns the pool when
+        it is running. Otherwise (scripts, no server loop) a short-lived
+        client with the same settings makes the call on a private loop, so
+        this client's own pool and slots are never rebound.
+        """
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self.chat(model, messages, **options), loop)
+            return future.result()
+
+        async def once():
+            client = OllamaClient(
+                self.host, self.connect_timeout, self.read_timeout, self.request_timeout,
+                self.max_concurrency, self.max_connections, self.retries, self.backoff,
+                self.max_queue, self.transport,
+            )
+            try:
+                return await client.chat(model, messages, **options)
+            finally:
+                await client.aclose()
+
+        return asyncio.run(once())
+
+    def stats(self) -> dict:
+        return {
+            "waiting": {m: n for m, n in self._waiting.items() if n},
+            "max_concurrency": self.max_concurrency,
+            **self.counters,
+        }
+
+
+class BlockingOllama:
+    """`ollama.Client`-shaped view (`chat(model=, messages=)`) for threads."""
+
+    def __init__(self, client: OllamaClient):
+        self._client = client
+
+    def chat(self, model: str, messages: List[dict], **options) -> dict:
+        return self._client.chat_blocking(model, messages, **options)
+
+
+llm_client = OllamaClient()
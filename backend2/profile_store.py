@@ -0,0 +1,153 @@
+# profile_store.py
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+from config import DEFAULT_USER_ID, PROFILE_DIR, PROFILE_PATH
+
+PROFILE_SUFFIX = ".pv"
+
+
+def _parse(profile_bytes: bytes):
+    import pveagle
+
+    return pveagle.EagleProfile.from_bytes(profile_bytes)
+
+
+class ProfileStore:
+    """
+    Enrolled Eagle speaker profiles, one file per user id under `directory`.
+
+    Profiles are read and deserialized once (`load()`, normally at startup)
+    and then served from memory; opening a recognizer only lists the
+    profile directory, and everything is reloaded when it changed (another
+    worker process enrolled someone). `save()` writes through and
+    replaces the cached profile, which is how re-enrollment invalidates it. The legacy single-profile file is served
+    as DEFAULT_USER_ID unless that user has re-enrolled.
+    """
+
+    def __init__(
+        self,
+        directory: str = PROFILE_DIR,
+        legacy_path: Optional[str] = PROFILE_PATH,
+        parse=_parse,
+    ):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self._parse = parse
+        self._profiles: Optional[Dict[str, object]] = None
+        self._stamp: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _path(self, user_id: str) -> str:
+        return os.path.join(self.directory, quote(user_id, safe="") + PROFILE_SUFFIX)
+
+    def _disk_stamp(self) -> tuple:
+        # Saves replace files atomically (new inode), so names plus inodes
+        # change on every enrollment; scandir gets both without a stat each
+        try:
+            with os.scandir(self.directory) as entries:
+                files = frozenset((e.name, e.inode()) for e in entries)
+        except OSError:
+            files = frozenset()
+        legacy = bool(self.legacy_path) and os.path.exists(self.legacy_path) # type: ignore
+        return files, legacy
+
+    def load(self) -> int:
+        """(Re)read every profile from disk; returns how many were loaded."""
+        stamp = self._disk_stamp()
+        profiles: Dict[str, object] = {}
+
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, "rb") as f:
+                profiles[DEFAULT_USER_ID] = self._parse(f.read())
+
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(PROFILE_SUFFIX):
+                    continue
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    profiles[unquote(name[:-len(PROFILE_SUFFIX)])] = self._parse(f.read())
+
+        with self._lock:
+            self._profiles = profiles
+            self._stamp = stamp
+            self.version += 1
+
+        print(f"[PROFILES] Loaded {len(profiles)} speaker profile(s)")
+        return len(profiles)
+
+    def _cache(self) -> Dict[str, object]:
+        if self._profiles is None or self._disk_stamp() != self._stamp:
+            self.load()
+        return self._profiles # type: ignore
+
+    def save(self, user_id: str, profile_bytes: bytes):
+        profile = self._parse(profile_bytes)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(user_id)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(profile_bytes)
+        os.replace(tmp, path)
+
+        self._cache()
+        with self._lock:
+            self._profiles[user_id] = profile # type: ignore
+            self.version += 1
+
+    def users(self) -> List[str]:
+        return sorted(self._cache())
+
+    def has(self, user_id: Optional[str] = None) -> bool:
+        profiles = self._cache()
+        return bool(profiles) if user_id is None else user_id in profiles
+
+    def legacy_only(self) -> bool:
+        """True on an install from before per-user profiles: the legacy file is all there is."""
+        return (
+            bool(self.legacy_path)
+            and os.path.exists(self.legacy_path) # type: ignore
+            and not os.path.exists(self._path(DEFAULT_USER_ID))
+            and list(self._cache()) == [DEFAULT_USER_ID]
+        )
+
+    def adopt_legacy(self, user_id: str) -> bool:
+        """
+        Move the legacy single profile to `user_id` (the name its owner
+        registered under) when it is the only profile. The legacy file is
+        renamed to `*.adopted`, so it is no longer served as DEFAULT_USER_ID.
+        """
+        if user_id == DEFAULT_USER_ID or not self.legacy_only():
+            return False
+        try:
+            with open(self.legacy_path, "rb") as f: # type: ignore
+                data = f.read()
+            os.replace(self.legacy_path, self.legacy_path + ".adopted") # type: ignore
+        except FileNotFoundError:
+            return False  # another worker adopted it first
+        self.save(user_id, data)
+        with self._lock:
+            self._profiles.pop(DEFAULT_USER_ID, None) # type: ignore
+            self.version += 1
+        return True
+
+    def select(self, user_ids: Optional[Sequence[str]] = None) -> Tuple[List[str], list]:
+        """
+        Ids and profiles to score a session against: the requested users
+        that are enrolled, or everyone when `user_ids` is empty.
+        """
+        profiles = self._cache()
+        with self._lock:
+            if user_ids:
+                ids = [u for u in dict.fromkeys(user_ids) if u in profiles]
+            else:
+                ids = sorted(profiles)
+            return ids, [profiles[u] for u in ids]
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,184 @@
+# prompt_builder.py
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from config import (
+    MAX_MEMORY_INJECTION_CHARS,
+    PROMPT_FOLD_TURNS,
+    PROMPT_HISTORY_TOKENS,
+    PROMPT_SUMMARY_TOKENS,
+    PROMPT_TOKEN_BUDGET,
+    SYSTEM_PROMPT,
+)
+
+CHARS_PER_TOKEN = 4     # rough for English with Llama-family tokenizers
+MESSAGE_OVERHEAD = 4    # role and separator tokens added by the chat template
+
+SUMMARY_HEADER = "EARLIER IN THIS CONVERSATION:\n"
+FACTS_HEADER = "KNOWN FACTS ABOUT USER:\n"
+
+Turn = Tuple[str, str]  # (user, assistant)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN) + MESSAGE_OVERHEAD
+
+
+def _clip(text: str, tokens: int) -> str:
+    limit = max(0, tokens - MESSAGE_OVERHEAD) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def _turn_tokens(turn: Turn) -> int:
+    return estimate_tokens(turn[0]) + estimate_tokens(turn[1])
+
+
+def summary_messages(previous: str, turns: Sequence[Turn], max_tokens: int) -> List[dict]:
+    """Messages asking the LLM to fold `turns` into the running summary."""
+    lines = [f"User: {u}\nCoach: {a}" for u, a in turns]
+    content = (
+        f"Summarize this English coaching conversation in at most {max_tokens * 3 // 4} words. "
+        "Keep what the user talked about and the mistakes they were coached on. "
+        "Reply with the summary only.\n"
+    )
+    if previous:
+        content += f"\nSummary so far:\n{previous}\n"
+    content += "\nNew turns:\n" + "\n".join(lines)
+    return [{"role": "user", "content": content}]
+
+
+class Prompt(NamedTuple):
+    messages: List[dict]
+    tokens: Dict[str, int]  # estimated, per part
+
+    @property
+    def total(self) -> int:
+        return sum(self.tokens.values())
+
+
+class PromptBuilder:
+    """
+    Chat messages for one conversation, held to a token budget.
+
+    Messages are laid out from most to least stable so that consecutive
+    turns share as long a prefix as possible and Ollama can reuse its
+    cached prefill:
+
+      system   SYSTEM_PROMPT, byte-identical every turn
+      system   rolling summary (changes only when turns are folded)
+      ...      recent turns, oldest first
+      system   memories retrieved for this message
+      user     the message
+
+    The system prompt and the message are always sent. Memories come next,
+    capped at `memory_chars`, then the summary, then as many recent turns
+    as still fit. Once the turns exceed `history_tokens`, `start_fold()`
+    hands the oldest `fold_turns` to the caller to summarize; they stay in
+    the prompt until `finish_fold()` replaces them with the new summary.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str = SYSTEM_PROMPT,
+        budget: int = PROMPT_TOKEN_BUDGET,
+        history_tokens: int = PROMPT_HISTORY_TOKENS,
+        summary_tokens: int = PROMPT_SUMMARY_TOKENS,
+        memory_chars: int = MAX_MEMORY_INJECTION_CHARS,
+        fold_turns: int = PROMPT_FOLD_TURNS,
+    ):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.memory_chars = memory_chars
+        self.fold_turns = fold_turns
+
+        self.turns: deque = deque()
+        self.summary = ""
+        self._folding: List[Turn] = []
+        self._system_tokens = estimate_tokens(system_prompt)
+
+    # ---------------- history ----------------
+
+    def add_turn(self, user_text: str, ai_text: str):
+        self.turns.append((user_text, ai_text))
+
+    def _history(self) -> List[Turn]:
+        return self._folding + list(self.turns)
+
+    def fold_due(self) -> bool:
+        return (
+            not self._folding
+            and len(self.turns) > self.fold_turns
+            and sum(_turn_tokens(t) for t in self.turns) > self.history_tokens
+        )
+
+    def start_fold(self) -> List[Turn]:
+        """Take the oldest turns for summarizing; they stay in the prompt meanwhile."""
+        n = min(self.fold_turns, len(self.turns) - 1)
+        self._folding = [self.turns.popleft() for _ in range(n)]
+        return list(self._folding)
+
+    def finish_fold(self, summary: Optional[str]):
+        """
+        Replace the folding turns with `summary`. Without one (the LLM call
+        failed) the user's side of those turns is appended verbatim, so
+        the topics survive even if the wording does not.
+        """
+        if summary is None:
+            said = " / ".join(u for u, _ in self._folding)
+            summary = f"{self.summary} User also said: {said}".strip()
+        self.summary = _clip(summary.strip(), self.summary_tokens)
+        self._folding = []
+
+    # ---------------- assembly ----------------
+
+    def _facts(self, memories: Sequence[str], tokens: int) -> str:
+        limit = min(self.memory_chars, max(0, tokens - MESSAGE_OVERHEAD) * CHARS_PER_TOKEN)
+        lines, size = [], len(FACTS_HEADER)
+        for memory in memories:
+            line = f"- {memory}"
+            if size + len(line) + 1 > limit:
+                break
+            lines.append(line)
+            size += len(line) + 1
+        return FACTS_HEADER + "\n".join(lines) if lines else ""
+
+    def build(self, user_text: str, memories: Sequence[str] = ()) -> Prompt:
+        tokens = {"system": self._system_tokens, "user": estimate_tokens(user_text)}
+        left = self.budget - tokens["system"] - tokens["user"]
+
+        facts = self._facts(memories, left)
+        tokens["memories"] = estimate_tokens(facts) if facts else 0
+        left -= tokens["memories"]
+
+        summary = ""
+        if self.summary and left > MESSAGE_OVERHEAD:
+            summary = _clip(SUMMARY_HEADER + self.summary, left)
+        tokens["summary"] = estimate_tokens(summary) if summary else 0
+        left -= tokens["summary"]
+
+        recent: List[Turn] = []
+        history_tokens = 0
+        for turn in reversed(self._history()):
+            cost = _turn_tokens(turn)
+            if history_tokens + cost > left:
+                break
+            recent.append(turn)
+            history_tokens += cost
+        recent.reverse()
+        tokens["history"] = history_tokens
+
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if summary:
+            messages.append({"role": "system", "content": summary})
+        for user, assistant in recent:
+            messages.append({"role": "user", "content": user})
+            messages.append({"role": "assistant", "content": assistant})
+        if facts:
+            messages.append({"role": "system", "content": facts})
+        messages.append({"role": "user", "content": user_text})
+        return Prompt(messages, tokens)
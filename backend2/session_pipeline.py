@@ -0,0 +1,83 @@
+# session_pipeline.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from config import UTTERANCE_QUEUE_SIZE
+
+
+class UtterancePipeline:
+    """
+    Per-session queue between the frame loop and the STT/LLM work.
+
+    The frame loop calls `submit()` (never blocks) and keeps verifying
+    frames; a single worker task drains the queue in FIFO order, so
+    transcription and response messages for one session are never
+    reordered. When the queue is full the oldest pending utterance is
+    dropped, which bounds memory and keeps replies about recent speech.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        maxsize: int = UTTERANCE_QUEUE_SIZE,
+        name: str = "session",
+    ):
+        self.handler = handler
+        self.name = name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.processed = 0
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        return self
+
+    def submit(self, item: Any) -> bool:
+        """Queue an utterance; returns False if an older one was dropped."""
+        dropped = False
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+                dropped = True
+                print(f"[PIPELINE] {self.name}: queue full, dropped oldest utterance")
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(item)
+        return not dropped
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    async def _run(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[PIPELINE] {self.name}: handler failed: {e!r}")
+            finally:
+                self.queue.task_done()
+
+    async def join(self):
+        """Wait until everything queued so far has been handled."""
+        await self.queue.join()
+
+    async def close(self):
+        """Cancel the worker (e.g. on disconnect) and discard pending work."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
@@ -0,0 +1,90 @@
+# status_stream.py
+
+import time
+from typing import Callable, Optional
+
+from config import STATUS_AGGREGATE, STATUS_COALESCE, STATUS_MAX_RATE_HZ
+
+
+class StatusCoalescer:
+    """
+    Decides which per-frame verification results are worth sending.
+
+    A status message goes out immediately when the label (VERIFIED /
+    speaker) changes, otherwise at most `max_rate_hz` times per second.
+    With `aggregate` on, each message also carries min/max/mean confidence
+    over the frames folded into it. `coalesce=False` restores the old
+    one-message-per-frame behaviour.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        coalesce: bool = STATUS_COALESCE,
+        max_rate_hz: float = STATUS_MAX_RATE_HZ,
+        aggregate: bool = STATUS_AGGREGATE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.field = field
+        self.coalesce = coalesce
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.aggregate = aggregate
+        self.clock = clock
+
+        self._last_label: Optional[tuple] = None
+        self._last_sent = float("-inf")
+        self._reset_window()
+
+        self.frames_seen = 0
+        self.messages_sent = 0
+
+    def _reset_window(self):
+        self._count = 0
+        self._sum = 0.0
+        self._min = float("inf")
+        self._max = float("-inf")
+
+    def update(
+        self, label: str, confidence: float, speaker_id: Optional[str] = None
+    ) -> Optional[dict]:
+        """
+        Fold in one frame; return a payload if one should be sent now.
+        A change of `speaker_id` (which enrolled speaker) counts as a
+        label change.
+        """
+        self.frames_seen += 1
+        self._count += 1
+        self._sum += confidence
+        if confidence < self._min:
+            self._min = confidence
+        if confidence > self._max:
+            self._max = confidence
+
+        now = self.clock()
+        if (
+            self.coalesce
+            and (label, speaker_id) == self._last_label
+            and now - self._last_sent < self.min_interval
+        ):
+            return None
+
+        payload = {
+            "type": "status",
+            self.field: label,
+            "confidence": round(confidence, 3),
+        }
+        if speaker_id is not None:
+            payload["speaker_id"] = speaker_id
+        if self.coalesce and self.aggregate:
+            payload["window"] = {
+                "frames": self._count,
+                "min": round(self._min, 3),
+                "max": round(self._max, 3),
+                "mean": round(self._sum / self._count, 3),
+            }
+
+        self._last_label = (label, speaker_id)
+        self._last_sent = now
+        self._reset_window()
+        self.messages_sent += 1
+        return payload
@@ -0,0 +1,193 @@
+# stt_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import Executor
+from typing import List, Optional, Set
+
+import numpy as np
+
+from config import STT_BATCH_WINDOW_MS, STT_MAX_BATCH, STT_WORKERS
+
+PRIORITY_TRUSTED = 0
+PRIORITY_GUEST = 1
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "audio", "trusted", "future", "enqueued")
+
+    def __init__(self, priority, seq, audio, trusted, future):
+        self.priority = priority
+        self.seq = seq
+        self.audio = audio
+        self.trusted = trusted
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class STTScheduler:
+    """
+    Cross-session batching front-end for final-utterance transcription.
+
+    Sessions `await transcribe(...)`; the dispatcher waits up to
+    `window_ms` after the first job arrives to collect more, then decodes
+    up to `max_batch` jobs of the same class (registered speech before
+    guests, FIFO within a class) as one batched Whisper call on the
+    executor. Up to `max_in_flight` batches decode at once, one per STT
+    worker; while all are busy, new jobs wait and form larger batches.
+
+    Guest jobs are not batched: they go one by one through the engine's
+    regular path, which keeps Whisper's VAD filter, temperature fallback
+    and compression-ratio check for noisy speech.
+    """
+
+    def __init__(
+        self,
+        engine,
+        executor: Optional[Executor] = None,
+        window_ms: float = STT_BATCH_WINDOW_MS,
+        max_batch: int = STT_MAX_BATCH,
+        max_in_flight: int = STT_WORKERS,
+    ):
+        self.engine = engine
+        self.executor = executor
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+
+        self._heap: List[_Job] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.jobs_done = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.total_wait_sec = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._heap)
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        trusted: bool = True,
+        priority: Optional[int] = None,
+    ) -> str:
+        self._ensure_dispatcher()
+        if priority is None:
+            priority = PRIORITY_TRUSTED if trusted else PRIORITY_GUEST
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._heap, _Job(priority, next(self._seq), audio, trusted, future)
+        )
+        self._wakeup.set() # type: ignore
+        return await future
+
+    def _take_batch(self) -> List[_Job]:
+        # Drop jobs whose session went away while queued
+        while self._heap and self._heap[0].future.done():
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return []
+
+        head = heapq.heappop(self._heap)
+        batch = [head]
+        skipped = []
+        limit = self.max_batch if head.trusted else 1
+        while self._heap and len(batch) < limit:
+            job = heapq.heappop(self._heap)
+            if job.future.done():
+                continue
+            if job.trusted == head.trusted:
+                batch.append(job)
+            else:
+                skipped.append(job)
+        for job in skipped:
+            heapq.heappush(self._heap, job)
+        return batch
+
+    async def _dispatch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._heap:
+                self._wakeup.clear() # type: ignore
+                await self._wakeup.wait() # type: ignore
+
+            # Give other sessions a moment to contribute to this batch
+            deadline = loop.time() + self.window
+            while len(self._heap) < self.max_batch and loop.time() < deadline:
+                self._wakeup.clear() # type: ignore
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), deadline - loop.time() # type: ignore
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire() # type: ignore
+            batch = self._take_batch()
+            if not batch:
+                self._slots.release() # type: ignore
+                continue
+
+            now = time.perf_counter()
+            self.total_wait_sec += sum(now - j.enqueued for j in batch)
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(self, batch: List[_Job]):
+        loop = asyncio.get_running_loop()
+        try:
+            texts = await loop.run_in_executor(
+                self.executor,
+                self.engine.transcribe_batch,
+                [j.audio for j in batch],
+                batch[0].trusted,
+            )
+        except Exception as e:
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        finally:
+            self._slots.release() # type: ignore
+
+        for job, text in zip(batch, texts):
+            if not job.future.done():
+                job.future.set_result(text)
+
+        self.batches += 1
+        self.jobs_done += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": len(self._in_flight),
+            "batches": self.batches,
+            "jobs": self.jobs_done,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_seen,
+            "mean_batch_size": round(self.jobs_done / self.batches, 2) if self.batches else 0.0,
+            "mean_wait_ms": round(self.total_wait_sec / self.jobs_done * 1000, 1) if self.jobs_done else 0.0,
+        }
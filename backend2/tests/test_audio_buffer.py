@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from audio_buffer import PCMRingBuffer
+
+
+def test_frames_are_consumed_in_order():
+    buf = PCMRingBuffer(frame_length=4, capacity_frames=4)
+    buf.write(np.arange(10, dtype=np.int16))
+
+    frames = [f.copy() for f in buf.frames()]
+
+    assert [f.tolist() for f in frames] == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert len(buf) == 2
+
+
+def test_frames_survive_wraparound():
+    buf = PCMRingBuffer(frame_length=4, capacity_frames=3)
+    buf.write(np.arange(6, dtype=np.int16))
+    assert buf.pop_frame().tolist() == [0, 1, 2, 3]
+
+    buf.write(np.arange(6, 14, dtype=np.int16))
+    out = []
+    while True:
+        block = buf.drain_frames()
+        if not len(block):
+            break
+        out.extend(block.ravel().tolist())
+
+    assert out == list(range(4, 12))
+    assert len(buf) == 2
+
+
+def test_overflow_drops_oldest_frames():
+    buf = PCMRingBuffer(frame_length=4, capacity_frames=2)
+    buf.write(np.arange(12, dtype=np.int16))
+
+    assert [f.tolist() for f in buf.frames()] == [[4, 5, 6, 7], [8, 9, 10, 11]]
+    assert buf.dropped_samples == 4
+
+
+def test_pop_frame_without_full_frame_raises():
+    buf = PCMRingBuffer(frame_length=4)
+    buf.write(np.zeros(3, dtype=np.int16))
+    with pytest.raises(IndexError):
+        buf.pop_frame()
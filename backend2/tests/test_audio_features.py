@@ -0,0 +1,32 @@
+import numpy as np
+
+from audio_features import FrameFeatureExtractor, UtteranceStats
+
+
+def test_features_match_naive_per_frame_computation():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(-20000, 20000, size=(5, 512), dtype=np.int16)
+    frames[2, 10] = 32767
+
+    feats = FrameFeatureExtractor(512, max_frames=2).compute(frames)
+
+    for i, frame in enumerate(frames):
+        x = frame.astype(np.float64) / 32768.0
+        assert np.isclose(feats.rms[i], np.sqrt(np.mean(x ** 2)), rtol=1e-5)
+        assert np.isclose(feats.peak[i], np.max(np.abs(x)), rtol=1e-5)
+        crossings = np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1]))
+        assert np.isclose(feats.zcr[i], crossings / 512)
+    assert feats.clipped.tolist() == [False, False, True, False, False]
+
+
+def test_utterance_stats_rms_and_pauses():
+    stats = UtteranceStats(frame_length=160, sample_rate=16000,
+                           quiet_rms=0.01, pause_min_ms=30)  # 10 ms frames
+
+    for rms in [0.1, 0.1, 0.0, 0.0, 0.0, 0.1, 0.0, 0.1, 0.0, 0.0, 0.0]:
+        stats.add(rms, rms, False)
+
+    assert np.isclose(stats.rms, np.sqrt(4 * 0.01 / 11))
+    # The 3-frame gap counts; the 1-frame gap and trailing silence do not
+    assert stats.pause_count == 1
+    assert stats.longest_pause_ms == 30
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from audio_buffer import PCMRingBuffer
+from audio_input import AudioDecoder, StreamingResampler, WireFormat, parse_wire_format
+
+
+def tone(freq, rate, seconds):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_parse_defaults_and_rejects():
+    assert parse_wire_format({}) == WireFormat("float32", 16000, 1)
+    assert parse_wire_format({"encoding": "int16", "rate": "48000", "channels": "2"}) == (
+        WireFormat("int16", 48000, 2)
+    )
+    assert parse_wire_format({"encoding": "opus"}).sample_rate == 48000
+    for bad in ({"encoding": "mp3"}, {"rate": "1000"}, {"channels": "6"}, {"rate": "x"}):
+        with pytest.raises(ValueError):
+            parse_wire_format(bad)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 8000])
+def test_resampler_is_block_size_invariant(in_rate):
+    x = tone(440, in_rate, 0.5)
+    whole = StreamingResampler(in_rate).process(x)
+
+    chunked = StreamingResampler(in_rate)
+    rng = np.random.default_rng(0)
+    parts, pos = [], 0
+    while pos < len(x):
+        n = int(rng.integers(1, 700))
+        parts.append(chunked.process(x[pos:pos + n]))
+        pos += n
+    joined = np.concatenate(parts)
+
+    assert len(joined) == len(whole) == int(np.ceil(len(x) * 16000 / in_rate))
+    np.testing.assert_allclose(joined, whole, atol=1e-5)
+
+
+def test_resampler_passes_speech_band_and_rejects_aliases():
+    rs = StreamingResampler(48000)
+    passband = rs.process(tone(1000, 48000, 1.0))[2000:]
+    assert abs(np.sqrt(np.mean(passband ** 2)) - 0.5 / np.sqrt(2)) < 0.01
+
+    rs = StreamingResampler(48000)
+    alias = rs.process(tone(12000, 48000, 1.0))[2000:]
+    assert np.sqrt(np.mean(alias ** 2)) < 0.005
+
+
+def test_decoder_native_and_converted_paths():
+    ring = PCMRingBuffer(512, 16)
+    pcm = (tone(300, 16000, 0.064) * 32767).astype(np.int16)
+    AudioDecoder(WireFormat("int16")).feed(pcm.tobytes(), ring)
+    np.testing.assert_array_equal(ring.pop_frame(), pcm[:512])
+
+    # Stereo 48 kHz int16: downmixed and resampled to one 16 kHz stream
+    ring.clear()
+    stereo = np.repeat((tone(300, 48000, 0.2) * 32767).astype(np.int16), 2)
+    decoder = AudioDecoder(WireFormat("int16", 48000, 2))
+    written = decoder.feed(stereo.tobytes(), ring)
+    assert written == 3200
+    assert decoder.bytes_in == stereo.nbytes
+    assert 0.3 < np.abs(ring.pop_frame()[200:].astype(np.float32)).max() / 32767 < 0.55
@@ -0,0 +1,72 @@
+import asyncio
+
+from coach_speculator import SpeculativeCoach
+from guest_context import GuestContext
+
+HESITANT = "um I I think maybe"
+
+
+class FakeDrafts:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+
+    async def __call__(self, user_text):
+        self.prompts.append(user_text)
+        await asyncio.sleep(self.delay)
+        return f"hint {len(self.prompts)}"
+
+
+def test_draft_is_served_when_final_text_extends_it():
+    async def run():
+        drafts = FakeDrafts()
+        coach = SpeculativeCoach(drafts, min_score=1.0)
+        assert coach.observe(HESITANT)
+        hint = await coach.take(HESITANT + " we went to the beach")
+        assert drafts.prompts == [HESITANT]
+        return hint
+
+    assert asyncio.run(run()) == "hint 1"
+
+
+def test_fluent_text_is_not_drafted():
+    async def run():
+        coach = SpeculativeCoach(FakeDrafts(), min_score=1.0)
+        return coach.observe("We went to the beach on Sunday")
+
+    assert not asyncio.run(run())
+
+
+def test_stale_drafts_are_discarded():
+    async def run():
+        drafts = FakeDrafts(delay=5)
+        guests = GuestContext()
+        coach = SpeculativeCoach(drafts, guests, min_score=1.0, max_drift_words=3)
+        results = []
+
+        coach.observe(HESITANT)
+        guests.add_text("new guest turn")  # context changed
+        results.append(await coach.take(HESITANT))
+
+        coach.observe(HESITANT)
+        results.append(await coach.take("something else entirely"))
+
+        coach.observe(HESITANT)
+        results.append(await coach.take(HESITANT + " and then a lot more words"))
+        return results, coach.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [None, None, None]
+    assert stats == {"drafted": 3, "stale": 3}
+
+
+def test_in_flight_draft_is_awaited_and_not_redrafted():
+    async def run():
+        drafts = FakeDrafts(delay=0.05)
+        coach = SpeculativeCoach(drafts, min_score=1.0, min_new_words=2)
+        coach.observe(HESITANT)
+        assert not coach.observe(HESITANT + " uh")  # same state, still drafting
+        hint = await coach.take(HESITANT + " uh")
+        return hint, len(drafts.prompts)
+
+    assert asyncio.run(run()) == ("hint 1", 1)
@@ -0,0 +1,122 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import enrollment
+from enrollment import EnrollmentJobs, stage_upload
+from profile_store import ProfileStore
+
+
+class FakeProfiler:
+    min_enroll_samples = 1600
+
+    def __init__(self, frames_needed):
+        self.frames_needed = frames_needed
+        self.frames = []
+
+    def enroll(self, frame):
+        self.frames.append(len(frame))
+        return min(100.0, 100.0 * len(self.frames) / self.frames_needed), None
+
+    def export(self):
+        class Profile:
+            def to_bytes(self):
+                return b"profile"
+        return Profile()
+
+    def delete(self):
+        pass
+
+
+@pytest.fixture
+def fake_eagle(tmp_path, monkeypatch):
+    profiler = FakeProfiler(frames_needed=4)
+    store = ProfileStore(str(tmp_path / "profiles"), None, parse=bytes)
+    resets = []
+    monkeypatch.setattr(enrollment.pveagle, "create_profiler", lambda access_key: profiler)
+    monkeypatch.setattr(enrollment, "profile_store", store)
+    monkeypatch.setattr(
+        enrollment, "MemorySystem", lambda user_id, reset: resets.append(user_id)
+    )
+    monkeypatch.setattr(enrollment, "ENROLL_UPLOAD_DIR", str(tmp_path / "uploads"))
+    return profiler, store, resets
+
+
+def wav_bytes(seconds, sr=16000):
+    buf = io.BytesIO()
+    sf.write(buf, np.zeros(int(seconds * sr), dtype=np.int16), sr, format="WAV")
+    buf.seek(0)
+    return buf
+
+
+def test_job_streams_file_and_reports_progress(fake_eagle):
+    profiler, store, resets = fake_eagle
+    path = stage_upload(wav_bytes(2.0))
+
+    jobs = EnrollmentJobs()
+    job = jobs.create("alice")
+    seen = []
+    jobs.run(job, path, enroll=lambda p, u, cb: enrollment.enroll_from_file(
+        p, u, lambda pct: (seen.append(pct), cb(pct))
+    ))
+
+    assert job.status == "done" and job.progress == 100.0
+    assert seen == [25.0, 50.0, 75.0, 100.0]
+    # Stops as soon as the profile is complete, one block at a time
+    assert profiler.frames == [1600] * 4
+    assert store.has("alice") and resets == ["alice"]
+    assert jobs.get(job.id).to_dict()["status"] == "done"
+
+
+def test_short_recording_fails_without_touching_memory(fake_eagle):
+    _, store, resets = fake_eagle
+    path = stage_upload(wav_bytes(0.25))
+
+    jobs = EnrollmentJobs()
+    job = jobs.create("bob")
+    jobs.run(job, path)
+
+    assert job.status == "failed"
+    assert "Not enough clean speech" in job.error
+    assert not store.has("bob") and resets == []
+
+
+def test_stage_upload_checks_sample_rate(fake_eagle):
+    with pytest.raises(ValueError):
+        stage_upload(wav_bytes(1.0, sr=4000))
+
+
+def test_other_rates_are_resampled(fake_eagle):
+    profiler, store, _ = fake_eagle
+    path = stage_upload(wav_bytes(0.5, sr=44100))
+
+    jobs = EnrollmentJobs()
+    job = jobs.create("carol")
+    jobs.run(job, path)
+
+    assert job.status == "done"
+    assert profiler.frames == [1600] * 4
+
+
+def test_old_jobs_are_dropped(tmp_path):
+    jobs = EnrollmentJobs(max_jobs=2, directory=str(tmp_path))
+    first = jobs.create("a")
+    jobs.create("b")
+    jobs.create("c")
+    assert jobs.get(first.id) is None
+
+
+def test_jobs_are_visible_to_other_workers(fake_eagle, tmp_path):
+    path = stage_upload(wav_bytes(2.0))
+    worker_a = EnrollmentJobs(directory=str(tmp_path / "jobs"))
+    worker_b = EnrollmentJobs(directory=str(tmp_path / "jobs"))
+
+    job = worker_a.create("alice")
+    assert worker_b.get(job.id).to_dict() == job.to_dict()
+    worker_a.run(job, path)
+
+    assert worker_b.get(job.id).to_dict()["status"] == "done"
+    assert worker_b.get("../../etc/passwd") is None
+    assert worker_b.get("0" * 32) is None
@@ -0,0 +1,55 @@
+import threading
+
+from executors import ACCEPT, DEGRADE, REJECT, AdmissionController, WorkloadPool
+
+
+def test_admission_accept_degrade_reject():
+    backlog = [0]
+    admission = AdmissionController(lambda: backlog[0], max_sessions=2, stt_soft=4, stt_hard=8)
+
+    assert admission.admit() == ACCEPT
+    backlog[0] = 5
+    assert admission.admit() == DEGRADE
+    # Session cap reached
+    backlog[0] = 0
+    assert admission.admit() == REJECT
+
+    admission.leave()
+    backlog[0] = 8
+    assert admission.admit() == REJECT
+    backlog[0] = 0
+    assert admission.admit() == ACCEPT
+
+    stats = admission.stats()
+    assert stats["active"] == 2
+    assert (stats["accepted"], stats["degraded"], stats["rejected"]) == (2, 1, 2)
+
+
+def test_leave_never_goes_negative():
+    admission = AdmissionController(lambda: 0, max_sessions=1)
+    admission.leave()
+    assert admission.active == 0
+    assert admission.admit() == ACCEPT
+
+
+def test_pool_reports_backlog():
+    pool = WorkloadPool("test", max_workers=1, max_queue=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    try:
+        pool.executor.submit(block)
+        started.wait(5)
+        assert not pool.overloaded
+        pool.executor.submit(lambda: None)
+        pool.executor.submit(lambda: None)
+        assert pool.queue_depth == 2
+        assert pool.overloaded
+        assert pool.stats()["queue_depth"] == 2
+    finally:
+        release.set()
+        pool.executor.shutdown(wait=True)
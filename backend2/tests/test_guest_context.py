@@ -0,0 +1,47 @@
+import asyncio
+
+import numpy as np
+
+from guest_context import SAMPLE_RATE, GuestContext
+
+
+def audio(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def test_deferred_turns_are_transcribed_once_on_resolve():
+    guests = GuestContext()
+    guests.add_text("Hello there")
+    guests.add_audio(audio(2))
+    calls = []
+
+    async def transcribe(pcm):
+        calls.append(len(pcm))
+        return "how was your weekend"
+
+    async def run():
+        # Without a transcriber (STT busy) pending audio is left alone
+        assert await guests.resolve() == "Hello there"
+        first = await guests.resolve(transcribe)
+        second = await guests.resolve(transcribe)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == "Hello there how was your weekend"
+    assert calls == [2 * SAMPLE_RATE]
+    assert guests.pending == 0
+
+
+def test_window_is_bounded_by_turns_and_seconds():
+    guests = GuestContext(max_sec=5, max_utterances=3)
+    for i in range(4):
+        guests.add_text(f"t{i}", seconds=1)
+    assert guests.text() == "t1 t2 t3"
+
+    guests.add_audio(audio(4))
+    assert guests.text() == "t3"
+    assert guests.stats()["turns"] == 2
+    assert guests.version == 5
+
+    guests.add_audio(audio(3))
+    assert guests.stats()["dropped_untranscribed"] == 1
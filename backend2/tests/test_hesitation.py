@@ -0,0 +1,51 @@
+from config import STRUGGLE_THRESHOLD
+from hesitation import HesitationAnalyzer
+
+
+def test_fillers_hedges_and_repeats():
+    analyzer = HesitationAnalyzer()
+    report = analyzer.analyze("Um, I think I I went to the the store, uhh, you know?")
+    assert (report.fillers, report.hedges, report.repeats) == (2, 2, 2)
+    assert report.score == 2 + 1 + 2
+
+
+def test_no_substring_matches():
+    # The old keyword scan counted every "i" inside a word
+    report = HesitationAnalyzer().analyze("Visiting Hawaii is inspiring, I admit")
+    assert report.score == 0
+    assert HesitationAnalyzer().analyze("This likely works").hedges == 0
+
+
+def test_word_timestamps_give_pauses_and_rate():
+    analyzer = HesitationAnalyzer(pause_ms=800, slow_wpm=110)
+    words = [("so", 0.0, 0.3), ("I", 1.5, 1.7), ("went", 1.8, 2.1), ("home", 3.2, 4.0)]
+    report = analyzer.analyze("so I went home", words)
+    assert report.long_pauses == 2
+    assert round(report.wpm) == 60
+    assert report.pace == "slow"
+    assert report.score == 2 + 1
+
+
+def test_acoustic_pauses_fill_in_without_timestamps():
+    report = HesitationAnalyzer().analyze("so I went home", pauses=3)
+    assert (report.long_pauses, report.pauses) == (0, 3)
+    assert report.score == 0.75
+    assert report.wpm is None
+
+    words = [("so", 0.0, 0.3), ("I", 0.4, 0.5), ("went", 0.6, 0.8), ("home", 0.9, 1.2)]
+    assert HesitationAnalyzer().analyze("so I went home", words, pauses=3).score == 0
+
+
+def test_phrase_breaks_do_not_trigger_coaching():
+    # A fluent sentence with a few ~300 ms breaks between phrases
+    text = "I went to the store and then I bought some bread for dinner"
+    assert HesitationAnalyzer().analyze(text, None, 3).score < STRUGGLE_THRESHOLD
+
+
+def test_like_and_you_know_count_only_as_fillers():
+    analyzer = HesitationAnalyzer()
+    assert analyzer.analyze("I like pizza").score == 0
+    assert analyzer.analyze("Do you know the answer").hedges == 0
+    assert analyzer.analyze("It was, like, far").hedges == 1
+    assert analyzer.analyze("It was like um far").hedges == 1
+    assert analyzer.analyze("I went there, you know, yesterday").hedges == 1
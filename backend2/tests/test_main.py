@@ -1,15 +1,12 @@
+import os
+import subprocess
 import sys
-from unittest.mock import MagicMock
-
-# Mock heavy engines BEFORE importing main
-sys.modules["transcription"] = MagicMock()
-sys.modules["eagle_engine"] = MagicMock()
-sys.modules["llm_engine"] = MagicMock()
-sys.modules["dill"] = MagicMock() # Often a hidden dep
 
+import pytest
 from fastapi.testclient import TestClient
-# Now import main, which will use the mocks
-from main import app 
+
+import main
+from main import app
 
 client = TestClient(app)
 
@@ -31,3 +28,65 @@ def test_enroll_voice_invalid_file():
     assert response.status_code == 400
     assert "WAV required" in response.json()["detail"]
 
+
+def test_model_stats():
+    """Model registry stats are exposed without loading anything."""
+    response = client.get("/api/models")
+    assert response.status_code == 200
+    assert set(response.json()["models"]) >= {"whisper", "embedding", "chroma"}
+
+
+def test_import_is_light():
+    """Importing main pulls in neither torch nor faster_whisper, and loads no model."""
+    code = (
+        "import sys, main; "
+        "assert not {'torch', 'faster_whisper', 'chromadb'} & set(sys.modules), sorted(sys.modules); "
+        "assert not any(s['loaded'] for s in main.registry.stats()['models'].values())"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_readiness(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_PRELOAD", "background")
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    monkeypatch.setattr(main, "MODEL_PRELOAD", "off")
+    assert client.get("/api/ready").json()["ready"] is True
+
+
+def test_unknown_speakers_close_cleanly_without_leaking_admission(monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    monkeypatch.setattr(main.profile_store, "has", lambda user_id=None: user_id is None)
+    monkeypatch.setattr(main.profile_store, "select", lambda ids=None: ([], []))
+    before = main.admission.active
+
+    for _ in range(3):
+        with client.websocket_connect("/ws/conversation?speakers=nobody") as ws:
+            assert ws.receive_json()["type"] == "format"
+            assert ws.receive_json()["type"] == "error"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 1008
+
+    assert main.admission.active == before
+
+
+def test_talk_without_own_profile_is_refused(monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    # Someone else is enrolled, but not the requested user
+    monkeypatch.setattr(main.profile_store, "has", lambda user_id=None: user_id in (None, "alice"))
+    selected = []
+    monkeypatch.setattr(main.profile_store, "select", lambda ids=None: selected.append(ids) or ([], []))
+
+    with client.websocket_connect("/ws/talk?user=bob") as ws:
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1008
+    assert selected == []
@@ -0,0 +1,214 @@
+import zlib
+
+import numpy as np
+
+import memory_engine
+from memory_engine import MemorySystem, collection_name_for, normalize_query
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}  # id -> (doc, embedding, metadata)
+        self.queries = 0
+        self.adds = 0
+        self.full_scans = 0
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None):
+        self.full_scans += 1
+        return {
+            "ids": list(self.rows),
+            "metadatas": [m for _, _, m in self.rows.values()],
+        }
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+    def add(self, documents, ids, metadatas, embeddings):
+        self.adds += 1
+        for i, d, e, m in zip(ids, documents, embeddings, metadatas):
+            self.rows[i] = (d, np.asarray(e), m)
+
+    def update(self, ids, metadatas):
+        for i, m in zip(ids, metadatas):
+            d, e, _ = self.rows[i]
+            self.rows[i] = (d, e, m)
+
+    def query(self, query_embeddings, n_results, include=None):
+        self.queries += 1
+        out = {"ids": [], "documents": [], "embeddings": [], "metadatas": []}
+        for q in query_embeddings:
+            ranked = sorted(self.rows.items(), key=lambda r: -float(np.dot(q, r[1][1])))
+            ranked = ranked[:n_results]
+            out["ids"].append([i for i, _ in ranked])
+            out["documents"].append([r[0] for _, r in ranked])
+            out["embeddings"].append([r[1] for _, r in ranked])
+            out["metadatas"].append([r[2] for _, r in ranked])
+        return out
+
+
+class FakeClient:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def delete_collection(self, name):
+        self.collections.pop(name, None)
+
+    def list_collections(self):
+        return list(self.collections)
+
+    def get_collection(self, name):
+        client = self
+
+        class Handle:
+            def modify(self, name):
+                client.collections[name] = client.collections.pop(source)
+
+        source = name
+        return Handle()
+
+
+class FakeEmbed:
+    """Bag of hashed words, unit length: identical wording -> cosine 1."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        out = []
+        for t in texts:
+            v = np.zeros(64, dtype=np.float32)
+            for w in normalize_query(t).split():
+                v[zlib.crc32(w.encode()) % 64] += 1
+            out.append(v / (np.linalg.norm(v) or 1))
+        return out
+
+
+def make_memory(monkeypatch, **kwargs):
+    embed = FakeEmbed()
+    client = FakeClient()
+    monkeypatch.setattr(memory_engine, "get_chroma_client", lambda: client)
+    monkeypatch.setattr(memory_engine, "get_embedding_fn", lambda: embed)
+    memory_engine._embedding_cache.clear()
+    memory_engine._retrieval_cache.clear()
+    memory_engine._namespaces.clear()
+    return MemorySystem(**kwargs), embed
+
+
+def test_normalize_query():
+    assert normalize_query("  What's my   NAME?! ") == "what's my name"
+
+
+def test_retrieve_is_cached_until_store(monkeypatch):
+    memory, embed = make_memory(monkeypatch, write_batch=1)
+    memory.store("Works as a nurse")
+
+    assert memory.retrieve("Where do I work?") == ["Works as a nurse"]
+    assert memory.retrieve("where do I work") == ["Works as a nurse"]
+    assert memory.collection.queries == 1
+    query_embeds = embed.calls
+
+    memory.store("Has two cats")
+    assert set(memory.retrieve("Where do I work?")) == {"Works as a nurse", "Has two cats"}
+    # Query embedding survives the store; only results were invalidated
+    assert embed.calls == query_embeds + 1  # just the stored fact
+
+    stats = memory_engine.cache_stats()
+    assert stats["retrieval_cache"]["hits"] == 1
+    assert stats["embedding_cache"]["hits"] == 1
+
+
+def test_reset_invalidates_results(monkeypatch):
+    memory, _ = make_memory(monkeypatch, write_batch=1)
+    memory.store("Works as a nurse")
+    assert memory.retrieve("work") == ["Works as a nurse"]
+
+    memory.reset()
+    assert memory.retrieve("work") == []
+
+
+def test_writes_are_batched_and_deduplicated(monkeypatch):
+    memory, embed = make_memory(monkeypatch, write_batch=3)
+    memory.store("Works as a nurse")
+    memory.store("works as a nurse.")
+    assert memory.collection.adds == 0
+
+    memory.store("Has two cats")
+    assert memory.collection.adds == 1
+    assert embed.calls == 1
+    assert memory.collection.count() == 2
+
+    memory.store("Works as a NURSE")
+    memory.flush()
+    assert memory.collection.count() == 2
+    confidences = sorted(m["confidence"] for _, _, m in memory.collection.rows.values())
+    assert confidences == [1, 2]
+
+
+def test_eviction_uses_local_index(monkeypatch):
+    memory, _ = make_memory(monkeypatch, write_batch=1, max_items=3, policy="lru")
+    for fact in ("likes jazz", "plays chess", "owns bicycle"):
+        memory.store(fact)
+
+    # Retrieval marks "likes jazz" as recently used
+    memory.retrieve("jazz", k=1)
+    memory.store("speaks spanish")
+
+    docs = {d for d, _, _ in memory.collection.rows.values()}
+    assert docs == {"likes jazz", "owns bicycle", "speaks spanish"}
+    assert memory.collection.full_scans == 1
+
+
+def test_collection_names_are_safe_and_distinct():
+    assert collection_name_for("default") == "human_memory"
+    a, b = collection_name_for("Ann B"), collection_name_for("ann_b")
+    assert a != b
+    assert a.startswith("mem_ann_b_") and a[-1].isalnum()
+
+
+def test_speakers_have_separate_memories(monkeypatch):
+    make_memory(monkeypatch)
+    alice = MemorySystem("alice", write_batch=1)
+    bob = MemorySystem("bob", write_batch=1)
+    assert set(alice.client.collections) == set()  # opened lazily
+
+    alice.store("Works as a nurse")
+    bob.store("Plays the drums")
+    assert alice.retrieve("what do I do") == ["Works as a nurse"]
+    assert bob.retrieve("what do I do") == ["Plays the drums"]
+
+    # A second session for the same speaker shares the handle
+    assert MemorySystem("alice").collection is alice.collection
+
+    # Re-enrolling bob leaves alice alone
+    MemorySystem("bob", reset=True)
+    assert bob.retrieve("what do I do") == []
+    assert alice.retrieve("what do I do") == ["Works as a nurse"]
+
+
+def test_legacy_memories_move_to_the_adopting_user(monkeypatch):
+    memory, _ = make_memory(monkeypatch)  # DEFAULT_USER_ID, the legacy collection
+    memory.store("I live in Pune")
+    memory.flush()
+
+    assert memory_engine.adopt_memories("default", "ann")
+    assert memory_engine.COLLECTION_NAME not in memory.client.collections
+    assert MemorySystem("ann").retrieve("where do I live") == ["I live in Pune"]
+    # Nothing left to move, and an existing target is never overwritten
+    assert not memory_engine.adopt_memories("default", "ann")
+
+
+def test_construction_does_not_touch_the_model_registry(monkeypatch):
+    def fail():
+        raise AssertionError("registry touched")
+
+    monkeypatch.setattr(memory_engine, "get_chroma_client", fail)
+    monkeypatch.setattr(memory_engine, "get_embedding_fn", fail)
+    MemorySystem("ann")
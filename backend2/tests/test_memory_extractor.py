@@ -0,0 +1,56 @@
+from memory_extractor import MemoryExtractor
+
+
+class FakeClient:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def chat(self, model, messages):
+        self.calls.append(messages[-1]["content"])
+        return {"message": {"content": self.reply}}
+
+
+class FakeMemory:
+    def __init__(self):
+        self.stored = []
+
+    def store(self, text):
+        self.stored.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_prefilters_skip_llm():
+    ex = MemoryExtractor(client=FakeClient("IGNORE"), batch_size=10, batch_window=60)
+    memory = FakeMemory()
+
+    assert not ex.submit("u", "um okay", memory)
+    assert not ex.submit("u", "What time is it for you?", memory)
+    assert not ex.submit("u", "The weather is nice outside today", memory)
+    assert ex.submit("u", "I work as a nurse in Leeds", memory)
+    assert not ex.submit("u", "I work as a nurse in Leeds.", memory)
+
+    stats = ex.stats()
+    assert stats["skipped_short"] == 1
+    assert stats["skipped_question"] == 1
+    assert stats["skipped_impersonal"] == 1
+    assert stats["skipped_duplicate"] == 1
+    assert stats["pending"] == 1
+
+
+def test_batch_is_one_llm_call():
+    client = FakeClient("1. STORE: Works as a nurse\nIGNORE\n3. STORE: Has two cats")
+    ex = MemoryExtractor(client=client, batch_size=10, batch_window=60)
+    memory = FakeMemory()
+
+    ex.submit("u", "I work as a nurse in Leeds", memory)
+    ex.submit("u", "I think my day was fine", memory)
+    ex.submit("u", "I have two cats at home", memory)
+    ex.flush()
+
+    assert len(client.calls) == 1
+    assert client.calls[0].startswith("1. I work as a nurse")
+    assert memory.stored == ["Works as a nurse", "Has two cats"]
+    assert ex.stats()["llm_calls"] == 1
@@ -0,0 +1,38 @@
+from metrics import MetricsRegistry
+
+
+def test_histogram_buckets_and_render():
+    m = MetricsRegistry(prefix="vs")
+    m.describe("stage_seconds", "Stage time")
+    m.stage("eagle", 0.0004)
+    m.stage("eagle", 0.003)
+    m.stage("eagle", 100.0)
+    with m.span("stt"):
+        pass
+
+    text = m.render()
+    assert "# TYPE vs_stage_seconds histogram" in text
+    assert 'vs_stage_seconds_bucket{stage="eagle",le="0.0005"} 1' in text
+    assert 'vs_stage_seconds_bucket{stage="eagle",le="0.005"} 2' in text
+    assert 'vs_stage_seconds_bucket{stage="eagle",le="+Inf"} 3' in text
+    assert 'vs_stage_seconds_count{stage="eagle"} 3' in text
+    assert 'vs_stage_seconds_count{stage="stt"} 1' in text
+    assert m.snapshot("stage_seconds", {"stage": "eagle"})["count"] == 3
+
+
+def test_gauges_and_callbacks():
+    m = MetricsRegistry(prefix="vs")
+    m.inc("active_sessions", labels={"endpoint": "talk"})
+    m.inc("active_sessions", labels={"endpoint": "talk"})
+    m.dec("active_sessions", labels={"endpoint": "talk"})
+    depth = [3]
+    m.gauge_callback("queue_depth", lambda: depth[0])
+    m.gauge_callback("broken", lambda: 1 / 0)
+
+    text = m.render()
+    assert 'vs_active_sessions{endpoint="talk"} 1' in text
+    assert "vs_queue_depth 3" in text
+    assert "vs_broken" not in text.replace("# TYPE vs_broken gauge", "")
+
+    depth[0] = 0
+    assert "vs_queue_depth 0" in m.render()
@@ -0,0 +1,44 @@
+import threading
+
+from model_pool import ModelRegistry
+
+
+def test_model_loaded_once_across_threads():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return object()
+
+    registry = ModelRegistry()
+    registry.register("fake", loader)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("fake")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert registry.stats()["models"]["fake"]["loaded"] is True
+
+
+def test_warm_up_loads_runs_warmup_and_reports_ready():
+    warmed = []
+    registry = ModelRegistry()
+    registry.register("fake", lambda: "model", warmup=warmed.append)
+    registry.register("broken", lambda: 1 / 0)
+
+    assert not registry.ready(["fake"])
+    registry.warm_up(["fake", "broken", "unknown"])
+    registry.warm_up(["fake"])
+
+    assert warmed == ["model"]
+    assert registry.ready(["fake"])
+    assert not registry.ready(["fake", "broken"])
+    assert "error" in registry.stats()["models"]["broken"]
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from ollama_client import BlockingOllama, OllamaClient, OllamaError
+
+
+class FakeOllama:
+    """In-process /api/chat: scripted failures, then a fixed reply."""
+
+    def __init__(self, statuses=(), delay=0.0, tokens=("Hello", " there")):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.tokens = tokens
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.statuses:
+                status = self.statuses.pop(0)
+                if isinstance(status, Exception):
+                    raise status
+                return httpx.Response(status, json={"error": "busy"})
+
+            body = json.loads(request.content)
+            if not body["stream"]:
+                return httpx.Response(
+                    200, json={"message": {"role": "assistant", "content": "".join(self.tokens)}}
+                )
+            lines = [json.dumps({"message": {"content": t}, "done": False}) for t in self.tokens]
+            lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+            return httpx.Response(200, content="\n".join(lines).encode())
+        finally:
+            self.in_flight -= 1
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return OllamaClient(host="http://fake", transport=httpx.MockTransport(server), **kwargs)
+
+
+def test_chat_retries_then_succeeds():
+    server = FakeOllama(statuses=[503, httpx.ConnectError("refused")])
+    client = make_client(server, retries=2)
+
+    reply = asyncio.run(client.chat("m", [{"role": "user", "content": "hi"}]))
+
+    assert reply["message"]["content"] == "Hello there"
+    assert server.calls == 3
+    assert client.counters["retries"] == 2
+
+
+def test_chat_gives_up_and_does_not_retry_client_errors():
+    server = FakeOllama(statuses=[503, 503, 503])
+    client = make_client(server, retries=2)
+    with pytest.raises(OllamaError):
+        asyncio.run(client.chat("m", []))
+    assert server.calls == 3
+
+    server = FakeOllama(statuses=[404])
+    client = make_client(server, retries=2)
+    with pytest.raises(OllamaError):
+        asyncio.run(client.chat("m", []))
+    assert server.calls == 1
+
+
+def test_stream_yields_deltas():
+    client = make_client(FakeOllama(statuses=[502]))
+
+    async def run():
+        return [d async for d in client.chat_stream("m", [])]
+
+    assert asyncio.run(run()) == ["Hello", " there"]
+
+
+@pytest.fixture
+def fake_ollama():
+    """benchmarks/fake_ollama.py served over real HTTP, so httpx timeouts apply."""
+    uvicorn = pytest.importorskip("uvicorn")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+    import fake_ollama as module
+
+    servers = []
+
+    def start(**latencies):
+        config = uvicorn.Config(module.create_app(**latencies), host="127.0.0.1", port=0, log_level="warning")
+        server = uvicorn.Server(config)
+        thread = threading.Thread(target=asyncio.run, args=(server.serve(),), daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        servers.append((server, thread))
+        return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+
+    yield start
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(5)
+
+
+def test_read_timeout_bounds_the_wait_for_a_chunk(fake_ollama):
+    host = fake_ollama(first_token=1.0)
+    client = OllamaClient(host=host, read_timeout=0.1, retries=0)
+
+    async def run():
+        return [delta async for delta in client.chat_stream("m", [])]
+
+    started = time.monotonic()
+    with pytest.raises(OllamaError, match="ReadTimeout"):
+        asyncio.run(run())
+    assert time.monotonic() - started < 0.8
+    assert client.backlog("m") == 0
+
+
+def test_request_timeout_cuts_off_a_trickling_stream(fake_ollama):
+    host = fake_ollama(first_token=0.0, per_token=0.05, tokens=100)
+    client = OllamaClient(host=host, read_timeout=1.0, request_timeout=0.3, retries=0)
+    received = []
+
+    async def run():
+        async for delta in client.chat_stream("m", []):
+            received.append(delta)
+
+    started = time.monotonic()
+    with pytest.raises(OllamaError, match="within"):
+        asyncio.run(run())
+    assert time.monotonic() - started < 1.0
+    assert 0 < len(received) < 100
+    assert client.backlog("m") == 0
+
+
+def test_request_timeout_bounds_a_plain_reply(fake_ollama):
+    host = fake_ollama(first_token=1.0)
+    client = OllamaClient(host=host, read_timeout=5.0, request_timeout=0.2, retries=2)
+
+    started = time.monotonic()
+    with pytest.raises(OllamaError, match="within"):
+        asyncio.run(client.chat("m", []))
+    assert time.monotonic() - started < 0.8
+    assert client.counters["retries"] == 0
+
+
+def test_concurrency_is_bounded_per_model():
+    server = FakeOllama(delay=0.02)
+    client = make_client(server, max_concurrency=2)
+
+    async def run():
+        await asyncio.gather(*(client.chat("m", []) for _ in range(6)))
+
+    asyncio.run(run())
+    assert server.peak == 2
+    assert client.counters["requests"] == 6
+
+
+def test_cancel_frees_the_slot():
+    server = FakeOllama(delay=5.0)
+    client = make_client(server, max_concurrency=1)
+
+    async def run():
+        task = asyncio.create_task(client.chat("m", []))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        server.delay = 0
+        return await asyncio.wait_for(client.chat("m", []), 1.0)
+
+    assert asyncio.run(run())["message"]["content"] == "Hello there"
+
+
+def test_blocking_calls_run_on_the_owning_loop():
+    client = make_client(FakeOllama())
+    results = []
+
+    async def run():
+        await client.open()
+        thread = threading.Thread(
+            target=lambda: results.append(BlockingOllama(client).chat(model="m", messages=[]))
+        )
+        thread.start()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+    asyncio.run(run())
+    assert results[0]["message"]["content"] == "Hello there"
+
+
+def test_stream_reports_final_chunk():
+    client = make_client(FakeOllama())
+    finals = []
+
+    async def run():
+        return [d async for d in client.chat_stream("m", [], on_done=finals.append)]
+
+    asyncio.run(run())
+    assert finals and finals[0]["done"] is True
+
+
+def test_other_loops_are_refused_while_the_owner_lives():
+    client = make_client(FakeOllama())
+    owner = asyncio.new_event_loop()
+    try:
+        owner.run_until_complete(client.open())
+        with pytest.raises(RuntimeError):
+            asyncio.run(client.chat("m", []))
+        # Without a running owner loop, threads get a private client
+        reply = BlockingOllama(client).chat(model="m", messages=[])
+        assert reply["message"]["content"] == "Hello there"
+        assert client._loop is owner
+    finally:
+        owner.run_until_complete(client.aclose())
+        owner.close()
+
+    # A closed owner's state is dropped and the client rebinds
+    assert asyncio.run(client.chat("m", []))["message"]["content"] == "Hello there"
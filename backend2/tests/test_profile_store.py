@@ -0,0 +1,113 @@
+import numpy as np
+
+import eagle_engine
+from eagle_engine import EagleRecognizer
+from profile_store import ProfileStore
+
+
+def make_store(tmp_path, legacy=None):
+    parsed = []
+
+    def parse(data):
+        parsed.append(data)
+        return data.decode()
+
+    store = ProfileStore(str(tmp_path / "profiles"), legacy, parse=parse)
+    return store, parsed
+
+
+def test_profiles_are_parsed_once_and_replaced_on_save(tmp_path):
+    legacy = tmp_path / "speaker_profile.pv"
+    legacy.write_bytes(b"old-default")
+    store, parsed = make_store(tmp_path, str(legacy))
+
+    store.save("Ann B/2", b"ann")
+    assert store.users() == ["Ann B/2", "default"]
+    assert store.select(["Ann B/2"]) == (["Ann B/2"], ["ann"])
+    assert store.select(["nobody"]) == ([], [])
+    count = len(parsed)
+
+    # Served from memory from now on
+    store.select()
+    store.has("default")
+    assert len(parsed) == count
+
+    # Re-enrollment replaces the cached profile
+    store.save("default", b"new-default")
+    assert store.select(["default"])[1] == ["new-default"]
+
+    # And survives a reload from disk
+    fresh, _ = make_store(tmp_path, str(legacy))
+    assert fresh.select() == (["Ann B/2", "default"], ["ann", "new-default"])
+
+
+def test_enrollment_in_another_worker_is_picked_up(tmp_path):
+    worker_a, _ = make_store(tmp_path)
+    worker_b, parsed = make_store(tmp_path)
+    worker_a.save("ann", b"ann")
+    assert not worker_b.has("bob") and worker_b.has("ann")
+    count = len(parsed)
+
+    worker_a.save("bob", b"bob")
+    assert worker_b.select(["bob"]) == (["bob"], ["bob"])
+    # Unchanged directory: no further reads
+    worker_b.has("bob")
+    assert len(parsed) == count + 2
+
+
+def test_legacy_profile_is_adopted_only_when_alone(tmp_path):
+    legacy = tmp_path / "speaker_profile.pv"
+    legacy.write_bytes(b"old-default")
+    store, _ = make_store(tmp_path, str(legacy))
+
+    assert store.legacy_only()
+    assert not store.adopt_legacy("default")
+    assert store.adopt_legacy("ann")
+    assert store.users() == ["ann"]
+    assert store.select(["ann"])[1] == ["old-default"]
+    assert not legacy.exists()
+
+    # Another worker, or a second name, finds nothing left to adopt
+    assert not store.adopt_legacy("bob")
+    assert make_store(tmp_path, str(legacy))[0].users() == ["ann"]
+
+    # Once someone has enrolled the new way, the legacy voice is not handed out
+    legacy.write_bytes(b"old-default")
+    store, _ = make_store(tmp_path, str(legacy))
+    assert not store.legacy_only() and not store.adopt_legacy("carol")
+
+
+class FakeEagle:
+    frame_length = 512
+    sample_rate = 16000
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.scores = [0.0] * len(profiles)
+
+    def process(self, frame):
+        return self.scores
+
+    def delete(self):
+        pass
+
+
+def test_recognizer_reports_best_speaker(tmp_path, monkeypatch):
+    store, _ = make_store(tmp_path)
+    for name in ("alice", "bob", "carol"):
+        store.save(name, name.encode())
+
+    monkeypatch.setattr(
+        eagle_engine.pveagle, "create_recognizer",
+        lambda access_key, speaker_profiles: FakeEagle(speaker_profiles),
+    )
+
+    recognizer = EagleRecognizer(["carol", "alice"], store=store)
+    assert recognizer.eagle.profiles == ["carol", "alice"]
+
+    frame = np.zeros(512, dtype=np.int16)
+    recognizer.eagle.scores = [0.2, 0.9]
+    assert recognizer.identify(frame) == ("alice", 0.9)
+    recognizer.eagle.scores = [0.3, 0.1]
+    assert recognizer.identify(frame) == (None, 0.3)
+    assert recognizer.process_frame(frame) == (False, 0.3)
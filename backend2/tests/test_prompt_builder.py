@@ -0,0 +1,60 @@
+from prompt_builder import FACTS_HEADER, PromptBuilder, estimate_tokens
+
+
+def turn(i):
+    return f"this is what I said in turn number {i}", f"and this is the coach reply number {i}"
+
+
+def test_system_prefix_and_history_are_stable_across_turns():
+    builder = PromptBuilder(system_prompt="You are a coach.")
+    builder.add_turn(*turn(1))
+    first = builder.build("hello", ["Likes tea"]).messages
+    builder.add_turn("hello", "hi")
+    second = builder.build("next", ["Works in Pune"]).messages
+
+    assert first[0] == {"role": "system", "content": "You are a coach."}
+    # Everything before this turn's memories is an unchanged prefix
+    assert second[:len(first) - 2] == first[:-2]
+    assert second[-2]["content"] == FACTS_HEADER + "- Works in Pune"
+    assert second[-1] == {"role": "user", "content": "next"}
+
+
+def test_budget_keeps_newest_turns_and_caps_memories():
+    builder = PromptBuilder(system_prompt="sys", budget=120, memory_chars=60, history_tokens=10_000)
+    for i in range(10):
+        builder.add_turn(*turn(i))
+
+    prompt = builder.build("hello", ["fact number %d is long enough" % i for i in range(5)])
+
+    assert prompt.total <= 120
+    facts = prompt.messages[-2]["content"]
+    assert len(facts) <= 60 and facts.count("\n- ") == 1
+    assert prompt.messages[-3]["content"] == turn(9)[1]
+    assert turn(0)[0] not in [m["content"] for m in prompt.messages]
+
+
+def test_old_turns_fold_into_summary():
+    builder = PromptBuilder(system_prompt="sys", history_tokens=3 * sum(map(estimate_tokens, turn(0))), fold_turns=2)
+    for i in range(4):
+        builder.add_turn(*turn(i))
+    assert builder.fold_due()
+
+    folding = builder.start_fold()
+    assert folding == [turn(0), turn(1)]
+    # Still sent until the summary is in
+    assert len(builder.build("x").messages) == 1 + 8 + 1
+
+    builder.finish_fold("User talked about turns 0 and 1.")
+    messages = builder.build("x").messages
+    assert messages[1]["content"].endswith("User talked about turns 0 and 1.")
+    assert len(messages) == 2 + 4 + 1
+    assert not builder.fold_due()
+
+
+def test_failed_summary_keeps_what_the_user_said():
+    builder = PromptBuilder(system_prompt="sys", history_tokens=0, fold_turns=1)
+    builder.add_turn("I went hiking", "Nice!")
+    builder.add_turn("It rained", "Oh no")
+    builder.start_fold()
+    builder.finish_fold(None)
+    assert "I went hiking" in builder.summary
@@ -0,0 +1,49 @@
+import asyncio
+
+from session_pipeline import UtterancePipeline
+
+
+def test_items_handled_in_order_and_oldest_dropped_when_full():
+    async def run():
+        seen = []
+        gate = asyncio.Event()
+
+        async def handler(item):
+            await gate.wait()
+            seen.append(item)
+
+        pipeline = UtterancePipeline(handler, maxsize=2).start()
+        pipeline.submit(1)
+        await asyncio.sleep(0)  # worker picks up 1 and blocks on the gate
+        pipeline.submit(2)
+        pipeline.submit(3)
+        assert pipeline.submit(4) is False  # 2 is dropped
+
+        gate.set()
+        await pipeline.join()
+        await pipeline.close()
+        return seen, pipeline.dropped
+
+    seen, dropped = asyncio.run(run())
+    assert seen == [1, 3, 4]
+    assert dropped == 1
+
+
+def test_close_cancels_in_flight_work():
+    async def run():
+        cancelled = asyncio.Event()
+
+        async def handler(item):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        pipeline = UtterancePipeline(handler).start()
+        pipeline.submit("slow")
+        await asyncio.sleep(0)
+        await pipeline.close()
+        return cancelled.is_set()
+
+    assert asyncio.run(run())
@@ -0,0 +1,46 @@
+from status_stream import StatusCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sends_on_change_and_at_max_rate():
+    clock = FakeClock()
+    status = StatusCoalescer("speaker", max_rate_hz=5, clock=clock)
+
+    assert status.update("guest", 0.1) is not None
+    clock.now = 0.05
+    assert status.update("guest", 0.3) is None
+    clock.now = 0.1
+    changed = status.update("user", 0.9)
+    assert changed["speaker"] == "user"
+    assert changed["window"] == {"frames": 2, "min": 0.3, "max": 0.9, "mean": 0.6}
+
+    clock.now = 0.2
+    assert status.update("user", 0.8) is None
+    clock.now = 0.31
+    assert status.update("user", 0.7)["window"]["frames"] == 2
+
+
+def test_disabled_sends_every_frame():
+    status = StatusCoalescer("status", coalesce=False)
+    payloads = [status.update("VERIFIED", 0.9) for _ in range(3)]
+
+    assert all(p == {"type": "status", "status": "VERIFIED", "confidence": 0.9}
+               for p in payloads)
+
+
+def test_speaker_change_is_sent_immediately():
+    clock = FakeClock()
+    status = StatusCoalescer("speaker", max_rate_hz=5, clock=clock)
+
+    assert status.update("registered_user", 0.9, "alice")["speaker_id"] == "alice"
+    clock.now = 0.05
+    assert status.update("registered_user", 0.9, "alice") is None
+    assert status.update("registered_user", 0.8, "bob")["speaker_id"] == "bob"
+    assert "speaker_id" not in status.update("unregistered_user", 0.1)
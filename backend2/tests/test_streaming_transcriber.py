@@ -0,0 +1,52 @@
+import numpy as np
+
+from transcription import SAMPLE_RATE, StreamingTranscriber
+
+
+class ScriptedSTT:
+    """Returns pre-baked hypotheses; timestamps are one word per second."""
+
+    def __init__(self, hypotheses, tail="done"):
+        self.hypotheses = list(hypotheses)
+        self.tail = tail
+        self.prompts = []
+        self.lengths = []
+
+    def transcribe_words(self, pcm, trusted=True, prompt=None):
+        self.prompts.append(prompt)
+        self.lengths.append(len(pcm))
+        words = self.hypotheses.pop(0).split()
+        return [(w, float(i), float(i + 1)) for i, w in enumerate(words)]
+
+    def transcribe(self, pcm, trusted=True, prompt=None):
+        self.prompts.append(prompt)
+        self.lengths.append(len(pcm))
+        return self.tail
+
+
+def test_local_agreement_commits_stable_prefix():
+    stt = ScriptedSTT([
+        "I want",
+        "I want to go",
+        "to go home",
+    ])
+    streamer = StreamingTranscriber(stt)
+    audio = np.zeros(SAMPLE_RATE * 6, dtype=np.int16)
+
+    assert streamer.update(audio) == "I want"
+    assert streamer.committed == []
+
+    streamer.update(audio)
+    assert streamer.committed == ["I", "want"]
+    assert streamer.tentative == ["to", "go"]
+
+    streamer.update(audio)
+    assert streamer.committed == ["I", "want", "to", "go"]
+    # Re-decoding starts after the last committed word, prompted with it
+    assert stt.lengths[2] == SAMPLE_RATE * 4
+    assert stt.prompts[2] == "I want"
+    # Word times are relative to the utterance, not the re-decoded window
+    assert streamer.committed_words[2:] == [("to", 2.0, 3.0), ("go", 3.0, 4.0)]
+
+    assert streamer.finalize(audio) == "I want to go done"
+    assert stt.prompts[-1] == "I want to go"
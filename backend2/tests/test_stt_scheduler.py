@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stt_scheduler import STTScheduler
+
+
+class FakeEngine:
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_batch(self, pcms, trusted=True):
+        self.batches.append((list(pcms), trusted))
+        return [f"text-{p}" for p in pcms]
+
+
+def test_batches_across_sessions_with_trusted_first():
+    async def run():
+        engine = FakeEngine()
+        scheduler = STTScheduler(engine, window_ms=20, max_batch=8)
+        results = await asyncio.gather(
+            scheduler.transcribe("guest1", trusted=False),
+            scheduler.transcribe("user1", trusted=True),
+            scheduler.transcribe("user2", trusted=True),
+            scheduler.transcribe("guest2", trusted=False),
+        )
+        return engine, scheduler, results
+
+    engine, scheduler, results = asyncio.run(run())
+
+    assert results == ["text-guest1", "text-user1", "text-user2", "text-guest2"]
+    # Guests are decoded one at a time on the regular path
+    assert engine.batches == [
+        (["user1", "user2"], True),
+        (["guest1"], False),
+        (["guest2"], False),
+    ]
+    stats = scheduler.stats()
+    assert stats["batches"] == 3
+    assert stats["max_batch_size"] == 2
+    assert stats["queue_depth"] == 0
+
+
+class SlowEngine:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def transcribe_batch(self, pcms, trusted=True):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        return [f"text-{p}" for p in pcms]
+
+
+def test_batches_decode_in_parallel_up_to_max_in_flight():
+    engine = SlowEngine(0.1)
+    executor = ThreadPoolExecutor(4)
+
+    async def run():
+        scheduler = STTScheduler(engine, executor, window_ms=0, max_batch=8, max_in_flight=2)
+
+        async def arrive(i):
+            await asyncio.sleep(i * 0.03)
+            return await scheduler.transcribe(f"u{i}")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(arrive(i) for i in range(4)))
+        return results, time.perf_counter() - start, scheduler.stats()
+
+    results, elapsed, stats = asyncio.run(run())
+    executor.shutdown()
+
+    assert results == ["text-u0", "text-u1", "text-u2", "text-u3"]
+    assert engine.peak == 2
+    # u0 and u1 decode side by side; u2 and u3 wait and share a batch
+    assert stats["batches"] == 3 and stats["max_batch_size"] == 2
+    assert elapsed < 0.3
@@ -0,0 +1,40 @@
+import numpy as np
+
+from vad_engine import SpeechGate
+
+
+class ThresholdDetector:
+    """Speech when any sample in the sub-frame reaches 10."""
+
+    def __init__(self, frame_samples=None):
+        self.frame_samples = frame_samples
+
+    def is_speech(self, pcm):
+        return bool((pcm >= 10).any())
+
+
+def frames(*values, length=4):
+    return [np.full(length, v, dtype=np.int16) for v in values]
+
+
+def test_hangover_and_preroll():
+    gate = SpeechGate(ThresholdDetector(), frame_length=4, sample_rate=1000,
+                      hangover_ms=8, preroll_ms=8)  # 2 frames each
+
+    results = [gate.process(f) for f in frames(1, 2, 3, 10, 0, 0, 0, 0)]
+    speech = [s for s, _ in results]
+
+    assert speech == [False, False, False, True, True, True, False, False]
+    onset_preroll = results[3][1]
+    assert [f[0] for f in onset_preroll] == [2, 3]
+    assert all(not p for _, p in results[4:])
+
+
+def test_reframes_for_detector_frame_size():
+    # Detector wants 3-sample frames; gate is fed 4-sample frames
+    gate = SpeechGate(ThresholdDetector(frame_samples=3), frame_length=4,
+                      sample_rate=1000, hangover_ms=0, preroll_ms=0)
+
+    speech = [gate.process(f)[0] for f in frames(0, 50, 0, 0)]
+
+    assert speech == [False, True, True, False]
@@ -1,35 +1,64 @@
 # transcription.py
 
+import re
+from typing import List, Optional, Tuple
+
 import numpy as np
-from faster_whisper import WhisperModel
-from config import WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE
+from config import GUEST_BEAM_SIZE, SAMPLE_RATE, STREAMING_MAX_WINDOW_SEC
+from metrics import metrics
+from model_pool import get_guest_whisper, get_whisper
+
+BATCH_MAX_SAMPLES = 30 * SAMPLE_RATE
+
+# (word, start_sec, end_sec) relative to the decoded audio
+Word = Tuple[str, float, float]
 
 
 class RealtimeSTT:
-    def __init__(self):
-        self.model = WhisperModel(
-            WHISPER_MODEL_SIZE,
-            device=WHISPER_DEVICE,
-            compute_type=WHISPER_COMPUTE,
-        )
+    """Per-session handle; the Whisper model itself is shared process-wide."""
+
+    @property
+    def model(self):
+        return get_whisper()
 
-    def transcribe(self, pcm_int16: np.ndarray, trusted: bool = True) -> str:
+    def model_for(self, trusted: bool):
+        return self.model if trusted else get_guest_whisper()
+
+    def _segments(
+        self,
+        pcm_int16: np.ndarray,
+        trusted: bool,
+        prompt: Optional[str] = None,
+        word_timestamps: bool = False,
+    ):
         audio = pcm_int16.astype(np.float32) / 32768.0
 
-        segments, _ = self.model.transcribe(
+        segments, _ = self.model_for(trusted).transcribe(
             audio,
             language="en",
-            beam_size=5 if trusted else 3,
-            best_of=5 if trusted else 3,
+            beam_size=5 if trusted else GUEST_BEAM_SIZE,
+            best_of=5 if trusted else GUEST_BEAM_SIZE,
             temperature=0.0 if trusted else 0.2,
-            vad_filter=not trusted,                    
-            condition_on_previous_text=trusted,        
+            vad_filter=not trusted,
+            condition_on_previous_text=trusted,
             no_speech_threshold=0.6 if trusted else 0.85,
             log_prob_threshold=-1.0 if trusted else -0.2,
             compression_ratio_threshold=2.0,
+            initial_prompt=prompt or None,
+            word_timestamps=word_timestamps,
         )
+        return segments
 
-        text = " ".join(s.text.strip() for s in segments).strip()
+    def transcribe(
+        self,
+        pcm_int16: np.ndarray,
+        trusted: bool = True,
+        prompt: Optional[str] = None,
+    ) -> str:
+        # segments is lazy: decoding happens while joining
+        with metrics.span("stt"):
+            segments = self._segments(pcm_int16, trusted, prompt)
+            text = " ".join(s.text.strip() for s in segments).strip()
 
         # FINAL SAFETY: kill hallucinated loops
         if not trusted:
@@ -38,3 +67,164 @@ class RealtimeSTT:
                 return ""
 
         return text
+
+    def transcribe_batch(self, pcms: List[np.ndarray], trusted: bool = True) -> List[str]:
+        """
+        Decode several short registered-speaker utterances in one batched
+        encoder/decoder pass.
+
+        Guest audio, anything over Whisper's 30 s window, or a batch of one
+        falls back to the regular per-utterance path; guests need its VAD
+        filter, temperature fallback and compression-ratio check.
+        """
+        if not trusted or len(pcms) == 1 or any(len(p) > BATCH_MAX_SAMPLES for p in pcms):
+            return [self.transcribe(p, trusted) for p in pcms]
+
+        with metrics.span("stt_batch"):
+            return self._transcribe_batch(pcms)
+
+    def _transcribe_batch(self, pcms: List[np.ndarray]) -> List[str]:
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_suppressed_tokens
+
+        model = self.model
+        features = np.stack([
+            pad_or_trim(
+                model.feature_extractor(p.astype(np.float32) / 32768.0)[..., :-1]
+            )
+            for p in pcms
+        ])
+
+        tokenizer = Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language="en",
+        )
+        prompt = model.get_prompt(tokenizer, [], without_timestamps=True)
+
+        results = model.model.generate(
+            model.encode(features),
+            [list(prompt) for _ in pcms],
+            beam_size=5,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+            return_scores=True,
+            return_no_speech_prob=True,
+        )
+
+        texts = []
+        for result in results:
+            tokens = result.sequences_ids[0]
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            # Same no-speech thresholds as the trusted regular path
+            if result.no_speech_prob > 0.6 and avg_logprob < -1.0:
+                texts.append("")
+                continue
+
+            texts.append(tokenizer.decode(tokens).strip())
+        return texts
+
+    def transcribe_words(
+        self,
+        pcm_int16: np.ndarray,
+        trusted: bool = True,
+        prompt: Optional[str] = None,
+    ) -> List[Word]:
+        with metrics.span("stt_partial"):
+            segments = self._segments(pcm_int16, trusted, prompt, word_timestamps=True)
+            return [
+                (w.word.strip(), w.start, w.end)
+                for s in segments
+                for w in (s.words or [])
+                if w.word.strip()
+            ]
+
+
+def _norm(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of one in-progress utterance.
+
+    Each `update()` re-decodes the audio after the last committed word and
+    commits the longest prefix on which this hypothesis and the previous
+    one agree (local agreement), so partial text never flickers once
+    committed. Committed text is passed to Whisper as the prompt, and
+    `finalize()` only has to decode the uncommitted tail.
+
+    Not thread-safe: callers must not overlap `update()`/`finalize()`.
+    """
+
+    def __init__(
+        self,
+        stt: RealtimeSTT,
+        trusted: bool = True,
+        max_window_sec: float = STREAMING_MAX_WINDOW_SEC,
+    ):
+        self.stt = stt
+        self.trusted = trusted
+        self.max_window = int(max_window_sec * SAMPLE_RATE)
+
+        self.committed: List[str] = []
+        self.committed_words: List[Word] = []  # with times from utterance start
+        self.tentative: List[str] = []
+        self._offset = 0  # first sample not covered by committed words
+        self._previous: List[str] = []
+        self.decodes = 0
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self.committed)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.committed + self.tentative)
+
+    def _prompt(self) -> Optional[str]:
+        # Whisper only looks at the last ~224 prompt tokens anyway
+        return self.committed_text[-400:] or None
+
+    def update(self, pcm_int16: np.ndarray) -> str:
+        """Decode the utterance-so-far; returns committed + tentative text."""
+        chunk = pcm_int16[self._offset:]
+        if len(chunk) == 0:
+            return self.text
+
+        words = self.stt.transcribe_words(chunk, self.trusted, self._prompt())
+        self.decodes += 1
+        current = [_norm(w) for w, _, _ in words]
+
+        agreed = 0
+        for prev, cur in zip(self._previous, current):
+            if prev != cur:
+                break
+            agreed += 1
+
+        # Never let the re-decoded window grow without bound
+        if agreed == 0 and len(chunk) > self.max_window and len(words) > 1:
+            agreed = len(words) - 1
+
+        if agreed:
+            self.committed.extend(w for w, _, _ in words[:agreed])
+            base = self._offset / SAMPLE_RATE
+            self.committed_words.extend((w, base + s, base + e) for w, s, e in words[:agreed])
+            last_end = words[agreed - 1][2]
+            self._offset += min(int(last_end * SAMPLE_RATE), len(chunk))
+
+        self._previous = current[agreed:]
+        self.tentative = [w for w, _, _ in words[agreed:]]
+        return self.text
+
+    def finalize(self, pcm_int16: np.ndarray) -> str:
+        """Decode whatever follows the committed prefix and return the full text."""
+        tail = pcm_int16[self._offset:]
+        tail_text = ""
+        if len(tail) >= SAMPLE_RATE // 4:
+            tail_text = self.stt.transcribe(tail, self.trusted, self._prompt())
+            self.decodes += 1
+        return " ".join(t for t in (self.committed_text, tail_text) if t).strip()
@@ -0,0 +1,173 @@
+# vad_engine.py
+
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    ENERGY_VAD_THRESHOLD,
+    SAMPLE_RATE,
+    VAD_AGGRESSIVENESS,
+    VAD_BACKEND,
+    VAD_FRAME_MS,
+    VAD_HANGOVER_MS,
+    VAD_PREROLL_MS,
+)
+
+
+class EnergyVAD:
+    """RMS threshold on whatever frame it is given (the old behaviour)."""
+
+    frame_samples: Optional[int] = None
+
+    def __init__(self, threshold: float = ENERGY_VAD_THRESHOLD):
+        self.threshold = threshold
+
+    def is_speech(self, pcm_int16: np.ndarray) -> bool:
+        x = pcm_int16.astype(np.float32)
+        rms = np.sqrt(np.dot(x, x) / len(x)) / 32768.0
+        return rms > self.threshold
+
+
+class WebRtcVAD:
+    """webrtcvad on fixed 10/20/30 ms frames."""
+
+    def __init__(
+        self,
+        aggressiveness: int = VAD_AGGRESSIVENESS,
+        frame_ms: int = VAD_FRAME_MS,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        import webrtcvad
+
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad supports 10, 20 or 30 ms frames")
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+
+    def is_speech(self, pcm_int16: np.ndarray) -> bool:
+        return self.vad.is_speech(pcm_int16.tobytes(), self.sample_rate)
+
+
+def create_vad(backend: str = VAD_BACKEND):
+    if backend == "webrtc":
+        return WebRtcVAD()
+    if backend == "energy":
+        return EnergyVAD()
+    if backend == "off":
+        return None
+    raise ValueError(f"Unknown VAD backend: {backend}")
+
+
+class SpeechGate:
+    """
+    Per-session VAD stage in front of Eagle and STT.
+
+    Takes Eagle-sized frames, re-frames them for the detector, and smooths
+    the result: a hangover keeps the gate open for a few frames after
+    speech stops, and the last few non-speech frames are held back as
+    pre-roll so the caller can prepend them when speech starts.
+    """
+
+    def __init__(
+        self,
+        detector,
+        frame_length: int,
+        sample_rate: int = SAMPLE_RATE,
+        hangover_ms: float = VAD_HANGOVER_MS,
+        preroll_ms: float = VAD_PREROLL_MS,
+    ):
+        self.detector = detector
+        self.frame_length = frame_length
+
+        frame_sec = frame_length / sample_rate
+        self.hangover_frames = int(round(hangover_ms / 1000 / frame_sec))
+        self.preroll_frames = int(round(preroll_ms / 1000 / frame_sec))
+        self._preroll: deque = deque(maxlen=self.preroll_frames)
+
+        sub = detector.frame_samples if detector is not None else None
+        self._sub = sub
+        if sub:
+            self._residual = np.zeros(sub + frame_length, dtype=np.int16)
+            self._res_len = 0
+
+        self._last_raw = False
+        self._hang = 0
+        self._open = False
+
+        self.frames = 0
+        self.speech_frames = 0
+
+    def _classify(self, frame: np.ndarray, rms: Optional[float]) -> bool:
+        if self.detector is None:
+            return True
+        if not self._sub:
+            if rms is not None and isinstance(self.detector, EnergyVAD):
+                # Reuse the RMS the feature stage already computed
+                return rms > self.detector.threshold
+            return self.detector.is_speech(frame)
+
+        # Re-frame into detector-sized chunks; keep the remainder
+        sub = self._sub
+        res = self._residual
+        n = self._res_len
+        res[n:n + len(frame)] = frame
+        n += len(frame)
+
+        decided = False
+        speech = False
+        pos = 0
+        while n - pos >= sub:
+            decided = True
+            if self.detector.is_speech(res[pos:pos + sub]):
+                speech = True
+            pos += sub
+        if pos:
+            res[:n - pos] = res[pos:n]
+        self._res_len = n - pos
+
+        if decided:
+            self._last_raw = speech
+        return self._last_raw
+
+    def process(
+        self, frame: np.ndarray, rms: Optional[float] = None
+    ) -> Tuple[bool, List[np.ndarray]]:
+        """
+        Classify one frame. Returns (is_speech, preroll) where preroll holds
+        the buffered frames preceding a speech onset (empty otherwise).
+        `rms` (normalised) may be passed in if already known.
+        """
+        self.frames += 1
+        raw = self._classify(frame, rms)
+
+        if raw:
+            self._hang = self.hangover_frames
+            speech = True
+        elif self._hang > 0:
+            self._hang -= 1
+            speech = True
+        else:
+            speech = False
+
+        preroll: List[np.ndarray] = []
+        if speech:
+            self.speech_frames += 1
+            if not self._open:
+                preroll = list(self._preroll)
+                self._preroll.clear()
+        elif self._preroll.maxlen:
+            self._preroll.append(frame.copy())
+
+        self._open = speech
+        return speech, preroll
+
+    def reset(self):
+        self._hang = 0
+        self._open = False
+        self._last_raw = False
+        self._preroll.clear()
+        if self._sub:
+            self._res_len = 0
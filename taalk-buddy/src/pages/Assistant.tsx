@@ -28,7 +28,13 @@ class AudioProcessor extends AudioWorkletProcessor {
     const input = inputs[0];
     if (input && input.length > 0) {
       const channelData = input[0];
-      this.port.postMessage(new Float32Array(channelData));
+      // int16 on the wire: half the bandwidth of float32
+      const pcm = new Int16Array(channelData.length);
+      for (let i = 0; i < channelData.length; i++) {
+        const s = Math.max(-1, Math.min(1, channelData[i]));
+        pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+      }
+      this.port.postMessage(pcm, [pcm.buffer]);
     }
     return true;
   }
@@ -60,6 +66,7 @@ const AssistantPage: React.FC = () => {
   const [userName, setUserName] = useState<string>('You');
   const [realtimeStatus, setRealtimeStatus] = useState<RealtimeStatus>({ speaker: 'idle', confidence: 0 });
   const [suggestion, setSuggestion] = useState<CoachSuggestion | null>(null);
+  const coachStreamingRef = useRef(false);
 
   const wsRef = useRef<WebSocket | null>(null);
   const audioContextRef = useRef<AudioContext | null>(null);
@@ -127,7 +134,9 @@ const AssistantPage: React.FC = () => {
     if (wsRef.current) return;
 
     // Connect to the conversation endpoint for multi-speaker tracking
-    const ws = new WebSocket('ws://localhost:8000/ws/conversation');
+    const user = encodeURIComponent(localStorage.getItem('voxsentinel_user') || '');
+    const rate = audioContextRef.current?.sampleRate ?? 16000;
+    const ws = new WebSocket(`ws://localhost:8000/ws/conversation?user=${user}&encoding=int16&rate=${rate}`);
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -169,7 +178,17 @@ const AssistantPage: React.FC = () => {
             }
           ]);
         }
-        else if (data.type === 'coach') {
+        else if (data.type === 'response_delta' && data.kind === 'coach') {
+          // Streamed coach hint: show the first words as soon as they arrive
+          const continuing = coachStreamingRef.current;
+          coachStreamingRef.current = true;
+          setSuggestion(prev => ({
+            text: (continuing && prev ? prev.text : '') + data.text,
+            timestamp: Date.now()
+          }));
+        }
+        else if (data.type === 'coach' || (data.type === 'response_done' && data.kind === 'coach')) {
+          coachStreamingRef.current = false;
           console.log("Received coach suggestion:", data.text);
           setSuggestion({
             text: data.text,
@@ -214,7 +233,8 @@ const AssistantPage: React.FC = () => {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       streamRef.current = stream;
 
-      const audioCtx = new (window.AudioContext || (window as any).webkitAudioContext)({ sampleRate: 16000 });
+      // Native device rate; the server resamples
+      const audioCtx = new (window.AudioContext || (window as any).webkitAudioContext)();
       audioContextRef.current = audioCtx;
 
       const blob = new Blob([WORKLET_CODE], { type: 'application/javascript' });
@@ -27,7 +27,13 @@ class AudioProcessor extends AudioWorkletProcessor {
     const input = inputs[0];
     if (input && input.length > 0) {
       const channelData = input[0];
-      this.port.postMessage(new Float32Array(channelData));
+      // int16 on the wire: half the bandwidth of float32
+      const pcm = new Int16Array(channelData.length);
+      for (let i = 0; i < channelData.length; i++) {
+        const s = Math.max(-1, Math.min(1, channelData[i]));
+        pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+      }
+      this.port.postMessage(pcm, [pcm.buffer]);
     }
     return true;
   }
@@ -65,6 +71,7 @@ const CoachPage: React.FC = () => {
 
   const verificationRef = useRef(verification);
   const isAiThinkingRef = useRef(isAiThinking);
+  const streamingIdRef = useRef<string | null>(null);
 
   useEffect(() => { verificationRef.current = verification; }, [verification]);
   useEffect(() => { isAiThinkingRef.current = isAiThinking; }, [isAiThinking]);
@@ -173,7 +180,9 @@ const CoachPage: React.FC = () => {
   const startWebSocket = useCallback(() => {
     if (wsRef.current) return;
 
-    const ws = new WebSocket('ws://localhost:8000/ws/talk');
+    const user = encodeURIComponent(localStorage.getItem('voxsentinel_user') || '');
+    const rate = audioContextRef.current?.sampleRate ?? 16000;
+    const ws = new WebSocket(`ws://localhost:8000/ws/talk?user=${user}&encoding=int16&rate=${rate}`);
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -211,6 +220,40 @@ const CoachPage: React.FC = () => {
             }
           ]);
         }
+        else if (data.type === 'response_delta' && data.kind === 'response') {
+          // Streamed reply: grow a single AI bubble as chunks arrive
+          const streamId = streamingIdRef.current;
+          if (streamId === null) {
+            const id = generateId();
+            streamingIdRef.current = id;
+            setMessages(prev => [
+              ...prev,
+              { id, role: 'ai', text: data.text, isVerified: true, timestamp: new Date() }
+            ]);
+          } else {
+            setMessages(prev => prev.map(m =>
+              m.id === streamId ? { ...m, text: m.text + data.text } : m
+            ));
+          }
+        }
+        else if (data.type === 'response_done' && data.kind === 'response') {
+          setIsAiThinking(false);
+          const streamId = streamingIdRef.current;
+          streamingIdRef.current = null;
+
+          speakResponse(data.text);
+
+          if (streamId === null) {
+            setMessages(prev => [
+              ...prev,
+              { id: generateId(), role: 'ai', text: data.text, isVerified: true, timestamp: new Date() }
+            ]);
+          } else {
+            setMessages(prev => prev.map(m =>
+              m.id === streamId ? { ...m, text: data.text } : m
+            ));
+          }
+        }
         else if (data.type === 'response') {
           setIsAiThinking(false); // AI is done thinking
 
@@ -255,7 +298,8 @@ const CoachPage: React.FC = () => {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       streamRef.current = stream;
 
-      const audioCtx = new (window.AudioContext || (window as any).webkitAudioContext)({ sampleRate: 16000 });
+      // Native device rate; the server resamples
+      const audioCtx = new (window.AudioContext || (window as any).webkitAudioContext)();
       audioContextRef.current = audioCtx;
 
       const blob = new Blob([WORKLET_CODE], { type: 'application/javascript' });
@@ -153,6 +153,16 @@ const RegisterPage: React.FC = () => {
         body: formData,
       });
       if (response.ok) {
+        // Enrollment runs as a background job; poll until it settles
+        let job = await response.json();
+        while (job.status === 'queued' || job.status === 'running') {
+          await new Promise((resolve) => setTimeout(resolve, 500));
+          const poll = await fetch(`http://localhost:8000/api/enroll-voice/${job.job_id}`);
+          job = await poll.json();
+        }
+        if (job.status !== 'done') {
+          throw new Error(job.error || job.detail || "Enrollment failed. Ensure clear audio delivery.");
+        }
         localStorage.setItem('voxsentinel_user', name);
         window.dispatchEvent(new Event('storage'));
         setStep('SUCCESS');